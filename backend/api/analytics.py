@@ -0,0 +1,153 @@
+"""
+Columnar spending analytics.
+
+A user's expense records are loaded once into NumPy arrays (epoch days,
+amounts, category codes) and every aggregate - monthly, weekly, per category,
+trailing averages and year-over-year - is computed with vectorized
+bincounts instead of per-expense Python loops.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .records import ExpenseRecord
+
+
+@dataclass
+class ExpenseColumns:
+    days: np.ndarray            # int64 days since 1970-01-01
+    amounts: np.ndarray         # float64 holding integer cents, so sums are exact
+    category_codes: np.ndarray  # int64 index into categories
+    categories: List[str]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+
+def load_columns(expenses: List[ExpenseRecord]) -> ExpenseColumns:
+    """Convert expense records into columns"""
+    count = len(expenses)
+    days = np.fromiter((expense.timestamp for expense in expenses), dtype=np.int64, count=count) // 86400
+    amounts = np.fromiter((expense.cents for expense in expenses), dtype=np.float64, count=count)
+    # Dictionary-encode categories in first-seen order
+    codes: Dict[str, int] = {}
+    category_codes = np.fromiter(
+        (codes.setdefault(expense.category, len(codes)) for expense in expenses),
+        dtype=np.int64,
+        count=count
+    )
+    return ExpenseColumns(
+        days=days,
+        amounts=amounts,
+        category_codes=category_codes,
+        categories=list(codes)
+    )
+
+
+def month_index(year: int, month: int) -> int:
+    """Months since 1970-01"""
+    return (year - 1970) * 12 + month - 1
+
+
+def _month_label(index: int) -> str:
+    return f"{1970 + index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _dollars(cents: float) -> float:
+    return float(cents) / 100
+
+
+def history_start(end_year: int, end_month: int, months: int) -> str:
+    """First day that compute_trends needs data from (one extra year for YoY)"""
+    first = month_index(end_year, end_month) - months + 1 - 12
+    return f"{_month_label(first)}-01"
+
+
+def compute_trends(
+    columns: ExpenseColumns,
+    end_year: int,
+    end_month: int,
+    months: int,
+    trailing: int = 3
+) -> Dict[str, Any]:
+    """Aggregate spending for the `months` months ending at end_year/end_month.
+
+    Columns should cover the window plus the 12 months before it so that
+    year-over-year comparisons are complete (see history_start).
+    """
+    last = month_index(end_year, end_month)
+    # The window plus the preceding year, for YoY and trailing averages
+    first = last - months + 1 - 12
+    span = months + 12
+
+    month_of_day = columns.days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    relative = month_of_day - first
+    in_span = (relative >= 0) & (relative < span)
+    relative = relative[in_span]
+    amounts = columns.amounts[in_span]
+    codes = columns.category_codes[in_span]
+    days = columns.days[in_span]
+
+    monthly_totals = np.bincount(relative, weights=amounts, minlength=span)
+    monthly_counts = np.bincount(relative, minlength=span)
+
+    # Trailing average over the last `trailing` months, including the current one
+    cumulative = np.concatenate(([0.0], np.cumsum(monthly_totals)))
+    window_ends = np.arange(12, span) + 1
+    trailing_average = (cumulative[window_ends] - cumulative[np.maximum(window_ends - trailing, 0)]) / trailing
+
+    window_totals = monthly_totals[12:]
+    previous_year = monthly_totals[:months]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yoy_change = np.where(previous_year > 0, (window_totals - previous_year) / previous_year * 100, np.nan)
+
+    # Category totals, overall and per month, for the window only
+    in_window = relative >= 12
+    category_count = len(columns.categories)
+    category_totals = np.bincount(codes[in_window], weights=amounts[in_window], minlength=category_count)
+    category_by_month = np.bincount(
+        (relative[in_window] - 12) * category_count + codes[in_window],
+        weights=amounts[in_window],
+        minlength=months * category_count
+    ).reshape(months, category_count)
+
+    # Weeks start on Monday; 1970-01-01 was a Thursday
+    week_of_day = (days[in_window] + 3) // 7
+    first_week = (np.datetime64(f"{_month_label(first + 12)}-01").astype(np.int64) + 3) // 7
+    last_week = (np.datetime64(f"{_month_label(last + 1)}-01").astype(np.int64) - 1 + 3) // 7
+    weekly_totals = np.bincount(week_of_day - first_week, weights=amounts[in_window],
+                                minlength=last_week - first_week + 1)
+
+    active = category_totals != 0
+    return {
+        'months': [
+            {
+                'month': _month_label(first + 12 + i),
+                'total': _dollars(window_totals[i]),
+                'count': int(monthly_counts[12 + i]),
+                'trailing_average': _dollars(trailing_average[i]),
+                'previous_year_total': _dollars(previous_year[i]),
+                'yoy_change': None if np.isnan(yoy_change[i]) else float(yoy_change[i]),
+            }
+            for i in range(months)
+        ],
+        'weeks': [
+            {
+                'week_start': str(np.datetime64(int((first_week + i) * 7 - 3), 'D')),
+                'total': _dollars(total),
+            }
+            for i, total in enumerate(weekly_totals)
+        ],
+        'categories': {
+            category: _dollars(total)
+            for category, total, keep in zip(columns.categories, category_totals, active) if keep
+        },
+        'category_by_month': {
+            category: [_dollars(value) for value in category_by_month[:, code]]
+            for code, category in enumerate(columns.categories) if active[code]
+        },
+        'total': _dollars(window_totals.sum()),
+        'average_monthly': _dollars(window_totals.mean()) if months else 0.0,
+    }
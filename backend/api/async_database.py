@@ -0,0 +1,94 @@
+"""
+Async facade over the storage engine.
+
+Both storage engines (boto3 and sqlite3, see `api.storage`) are blocking, so
+every function here runs its counterpart in the selected engine on a
+dedicated, bounded thread pool and awaits the result. Route handlers stay
+`async def` without stalling the event loop for a database round trip, and
+DYNAMODB_MAX_CONCURRENCY caps how many calls are in flight per worker.
+Streamed reads go through the same pool one page at a time
+(`iter_expense_pages`).
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+from .storage import engine
+
+DYNAMODB_MAX_CONCURRENCY = int(os.getenv('DYNAMODB_MAX_CONCURRENCY', '32'))
+
+_executor = ThreadPoolExecutor(
+    max_workers=DYNAMODB_MAX_CONCURRENCY,
+    thread_name_prefix='dynamodb'
+)
+
+
+def _offload(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a blocking data-layer function so it runs on the DynamoDB thread pool"""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        # Carry context variables (request-scoped state) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            _executor,
+            functools.partial(context.run, func, *args, **kwargs)
+        )
+    return wrapper
+
+
+# User operations
+get_user_by_email = _offload(engine.get_user_by_email)
+get_user_by_id = _offload(engine.get_user_by_id)
+create_user = _offload(engine.create_user)
+update_user_password = _offload(engine.update_user_password)
+get_tokens_valid_after = _offload(engine.get_tokens_valid_after)
+revoke_user_tokens = _offload(engine.revoke_user_tokens)
+is_token_revoked = _offload(engine.is_token_revoked)
+revoke_token = _offload(engine.revoke_token)
+get_data_version = _offload(engine.get_data_version)
+
+# Expense operations
+async def iter_expense_pages(*args: Any, **kwargs: Any) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the engine's expense pages, fetching each one on the thread pool"""
+    pages = engine.iter_expense_pages(*args, **kwargs)
+    next_page = _offload(functools.partial(next, pages, None))
+    while True:
+        page = await next_page()
+        if page is None:
+            break
+        yield page
+
+
+get_expense_page = _offload(engine.get_expense_page)
+get_expenses_by_user = _offload(engine.get_expenses_by_user)
+get_recent_expenses = _offload(engine.get_recent_expenses)
+get_expenses_by_date_range = _offload(engine.get_expenses_by_date_range)
+get_expense_records_by_date_range = _offload(engine.get_expense_records_by_date_range)
+get_expense = _offload(engine.get_expense)
+create_expense = _offload(engine.create_expense)
+batch_create_expenses = _offload(engine.batch_create_expenses)
+update_expense = _offload(engine.update_expense)
+delete_expense = _offload(engine.delete_expense)
+bulk_edit_expenses = _offload(engine.bulk_edit_expenses)
+
+# Recurring cost operations
+get_recurring_costs_by_user = _offload(engine.get_recurring_costs_by_user)
+get_recurring_cost = _offload(engine.get_recurring_cost)
+create_recurring_cost = _offload(engine.create_recurring_cost)
+update_recurring_cost = _offload(engine.update_recurring_cost)
+delete_recurring_cost = _offload(engine.delete_recurring_cost)
+
+# Budget operations
+get_budget_settings = _offload(engine.get_budget_settings)
+save_budget_settings = _offload(engine.save_budget_settings)
+
+# Monthly rollup operations
+get_monthly_rollup = _offload(engine.get_monthly_rollup)
+
+# Change log operations
+get_changes = _offload(engine.get_changes)
@@ -1,14 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from passlib.hash import bcrypt
+from fastapi import APIRouter, HTTPException, Depends
 from .models import UserRegister, UserLogin, Token
-from .database import (
+from .database import generate_id, get_current_timestamp, DuplicateUserError
+from .async_database import (
     get_user_by_email,
-    get_user_by_username,
     create_user,
-    generate_id,
-    get_current_timestamp
+    update_user_password
 )
-from .middleware import generate_token
+from .middleware import generate_token, get_current_user, revoke_token
+from .passwords import hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -16,18 +15,8 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/register", response_model=Token)
 async def register(user_data: UserRegister):
     """Register a new user"""
-    # Check if user exists by email
-    existing_user = get_user_by_email(user_data.email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User already exists")
-
-    # Check if username is taken
-    existing_username = get_user_by_username(user_data.username)
-    if existing_username:
-        raise HTTPException(status_code=400, detail="Username already taken")
-
     # Hash password
-    hashed_password = bcrypt.hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
 
     # Create user
     user_id = generate_id()
@@ -39,7 +28,14 @@ async def register(user_data: UserRegister):
         'created_at': get_current_timestamp()
     }
 
-    create_user(user)
+    # Email and username uniqueness is enforced atomically with the write
+    try:
+        # The user is saved under a new ID if this one turns out to be taken
+        user_id = (await create_user(user))['id']
+    except DuplicateUserError as exc:
+        if exc.field == 'email':
+            raise HTTPException(status_code=400, detail="User already exists")
+        raise HTTPException(status_code=400, detail="Username already taken")
 
     # Generate token
     token = generate_token(user_id, user_data.email)
@@ -58,14 +54,19 @@ async def register(user_data: UserRegister):
 async def login(login_data: UserLogin):
     """Login user"""
     # Find user by email
-    user = get_user_by_email(login_data.email)
+    user = await get_user_by_email(login_data.email)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Verify password
-    if not bcrypt.verify(login_data.password, user['password']):
+    is_valid, new_hash = await verify_password(login_data.password, user['password'])
+    if not is_valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # Upgrade hashes made with a different cost factor
+    if new_hash:
+        await update_user_password(user['id'], user['email'], new_hash)
+
     # Generate token
     token = generate_token(user['id'], user['email'])
 
@@ -77,3 +78,10 @@ async def login(login_data: UserLogin):
             'email': user['email']
         }
     }
+
+
+@router.post("/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    """Revoke the token this request was made with; other sessions stay signed in"""
+    await revoke_token(current_user)
+    return {"message": "Logged out successfully"}
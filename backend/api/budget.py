@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
-from typing import Dict, Any
-from .database import (
+from typing import Dict, Any, List, Optional
+import asyncio
+import calendar
+from .database import get_current_timestamp, month_date_range
+from .async_database import (
     get_budget_settings,
     save_budget_settings,
-    get_expenses_by_user,
+    get_monthly_rollup,
     get_recurring_costs_by_user,
-    get_current_timestamp
+    get_expense_records_by_date_range
 )
+from .records import to_cents
 from .middleware import get_current_user
+from .etags import current_data_version, data_etag
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/budget", tags=["budget"])
@@ -24,21 +30,30 @@ class BudgetSettingsResponse(BaseModel):
     updated_at: str
 
 
+def budget_response(budget: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape stored budget settings for the frontend"""
+    # Convert monthly_budget to monthly_limit for frontend compatibility
+    return {
+        'user_id': budget['user_id'],
+        'monthly_limit': budget.get('monthly_budget', budget.get('monthly_limit', 0)),
+        'updated_at': budget['updated_at']
+    }
+
+
 @router.get("", response_model=BudgetSettingsResponse)
-async def get_budget(current_user: dict = Depends(get_current_user)):
+async def get_budget(
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag),
+    version: int = Depends(current_data_version)
+):
     """Get budget settings for the authenticated user"""
     user_id = current_user['user_id']
-    budget = get_budget_settings(user_id)
+    budget = await get_budget_settings(user_id, version)
 
     if not budget:
         raise HTTPException(status_code=404, detail="Budget settings not found")
 
-    # Convert monthly_budget to monthly_limit for frontend compatibility
-    return {
-        'user_id': budget['user_id'],
-        'monthly_limit': budget.get('monthly_budget', budget.get('monthly_limit', 0)),
-        'updated_at': budget['updated_at']
-    }
+    return budget_response(budget)
 
 
 @router.put("", response_model=BudgetSettingsResponse)
@@ -56,7 +71,7 @@ async def update_budget(
         'updated_at': get_current_timestamp()
     }
 
-    saved_budget = save_budget_settings(budget)
+    saved_budget = await save_budget_settings(budget)
 
     return {
         'user_id': saved_budget['user_id'],
@@ -65,64 +80,36 @@ async def update_budget(
     }
 
 
-@router.get("/summary/{year}/{month}")
-async def get_spending_summary(
+def build_spending_summary(
     year: int,
     month: int,
-    current_user: dict = Depends(get_current_user)
+    rollup: Dict[str, Any],
+    budget: Optional[Dict[str, Any]],
+    recurring_costs: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
-    """Get spending summary for a specific month"""
-    user_id = current_user['user_id']
-
-    # Get all expenses for the user
-    expenses = get_expenses_by_user(user_id)
-
-    # Filter expenses for the specified month
-    month_expenses = []
-    for expense in expenses:
-        expense_date = datetime.fromisoformat(expense['date'].replace('Z', '+00:00'))
-        if expense_date.year == year and expense_date.month == month:
-            month_expenses.append(expense)
-
-    # Calculate total spending
-    total_spent = sum(exp['amount'] for exp in month_expenses)
-
-    # Get budget settings
-    budget = get_budget_settings(user_id)
+    """Combine a monthly rollup, budget settings and recurring costs into a summary"""
+    # Sums are exact in integer cents; amounts become floats only in the response
+    total_spent = rollup['total_cents'] / 100
+    expense_count = rollup['expense_count']
     monthly_budget = budget.get('monthly_budget', budget.get('monthly_limit', 0)) if budget else 0
 
-    # Calculate category breakdown
-    category_totals = {}
-    for expense in month_expenses:
-        category = expense['category']
-        category_totals[category] = category_totals.get(category, 0) + expense['amount']
-
-    # Get recurring costs
-    recurring_costs = get_recurring_costs_by_user(user_id)
-
     # Calculate monthly recurring total
-    monthly_recurring = 0
+    monthly_cents = 0
+    annual_cents = 0
     for cost in recurring_costs:
         if cost['frequency'] == 'monthly':
-            monthly_recurring += cost['amount']
+            monthly_cents += to_cents(cost['amount'])
         elif cost['frequency'] == 'annual':
-            monthly_recurring += cost['amount'] / 12
-
-    # Calculate daily spending for chart
-    daily_spending = {}
-    for expense in month_expenses:
-        expense_date = datetime.fromisoformat(expense['date'].replace('Z', '+00:00'))
-        day = expense_date.day
-        daily_spending[day] = daily_spending.get(day, 0) + expense['amount']
+            annual_cents += to_cents(cost['amount'])
+    monthly_recurring = (monthly_cents + annual_cents / 12) / 100
 
     # Build daily data for chart
-    import calendar
     days_in_month = calendar.monthrange(year, month)[1]
     daily_data = []
     for day in range(1, days_in_month + 1):
         daily_data.append({
             'day': day,
-            'amount': daily_spending.get(day, 0)
+            'amount': rollup['daily'].get(day, 0) / 100
         })
 
     return {
@@ -131,14 +118,63 @@ async def get_spending_summary(
         'budget_limit': monthly_budget,  # Frontend expects this name
         'remaining': monthly_budget - total_spent - monthly_recurring if monthly_budget else 0,  # Account for recurring costs
         'percentage_used': ((total_spent + monthly_recurring) / monthly_budget * 100) if monthly_budget > 0 else 0,  # Include recurring in percentage
-        'category_breakdown': category_totals,
+        'category_breakdown': {category: cents / 100 for category, cents in rollup['categories'].items()},
         'monthly_recurring': monthly_recurring,
         'recurring_costs': monthly_recurring,  # Frontend expects this name (as a number)
         'total_with_recurring': total_spent + monthly_recurring,
-        'expense_count': len(month_expenses),
-        'transaction_count': len(month_expenses),  # Frontend expects this name
+        'expense_count': expense_count,
+        'transaction_count': expense_count,  # Frontend expects this name
         'is_over_budget': (total_spent + monthly_recurring) > monthly_budget if monthly_budget > 0 else False,  # Include recurring in budget check
         'daily_spending': daily_data,
-        'expenses': month_expenses,
         'recurring_costs_list': recurring_costs  # The actual array of recurring costs
     }
+
+
+@router.get("/summary/{year}/{month}")
+async def get_spending_summary(
+    year: int,
+    month: int,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag),
+    version: int = Depends(current_data_version)
+) -> Dict[str, Any]:
+    """Get spending summary for a specific month"""
+    user_id = current_user['user_id']
+
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Invalid month")
+
+    # Totals come from the precomputed monthly rollup
+    rollup, budget, recurring_costs = await asyncio.gather(
+        get_monthly_rollup(user_id, year, month),
+        get_budget_settings(user_id, version),
+        get_recurring_costs_by_user(user_id, version)
+    )
+
+    return build_spending_summary(year, month, rollup, budget, recurring_costs)
+
+
+@router.get("/trends")
+async def get_spending_trends(
+    months: int = Query(12, ge=1, le=120, description="Number of months to report, ending this month"),
+    trailing: int = Query(3, ge=1, le=12, description="Months in the trailing average"),
+    current_user: dict = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Get monthly, weekly, category, trailing-average and year-over-year spending"""
+    # Imported here so NumPy stays out of cold starts that never need it
+    from .analytics import load_columns, compute_trends, history_start
+
+    user_id = current_user['user_id']
+
+    now = datetime.utcnow()
+    expenses = await get_expense_records_by_date_range(
+        user_id,
+        history_start(now.year, now.month, months),
+        month_date_range(now.year, now.month)[1]
+    )
+
+    def analyze() -> Dict[str, Any]:
+        return compute_trends(load_columns(expenses), now.year, now.month, months, trailing)
+
+    # Aggregation is CPU-bound; keep it off the event loop
+    return await run_in_threadpool(analyze)
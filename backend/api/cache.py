@@ -0,0 +1,176 @@
+"""
+Per-user read-through cache for data that changes rarely (budget settings,
+recurring costs).
+
+Entries are keyed by the user's data version (see `api.etags`), which every
+write bumps, so a write never needs to invalidate anything: readers at the
+new version simply miss. Callers without a version bypass the cache.
+Superseded entries expire after CACHE_TTL_SECONDS. The backend is pluggable:
+
+- memory (default): size-bounded LRU per process (CACHE_MAX_ENTRIES)
+- redis: any Redis-protocol server at CACHE_REDIS_URL, shared across workers
+  (requires the optional `redis` package); size is bounded by the server's
+  maxmemory policy
+- none: caching disabled
+
+Values are stored as JSON in every backend, so callers always get a fresh
+copy they can safely mutate.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', '300'))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend:
+    """Cache stored on a Redis-protocol server.
+
+    Pass `client` to use any redis-py compatible client (e.g. a local
+    stand-in such as fakeredis) instead of connecting to `url`.
+    """
+
+    def __init__(self, url: str = CACHE_REDIS_URL, client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    """Build the configured cache backend (None disables caching)"""
+    if name == 'memory':
+        return MemoryCacheBackend()
+    if name == 'redis':
+        return RedisCacheBackend()
+    if name == 'none':
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+# Metrics hook, called as hook(namespace, event) with event 'hit' or 'miss'
+_metrics_hook: Optional[Callable[[str, str], None]] = None
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def set_metrics_hook(hook: Optional[Callable[[str, str], None]]) -> None:
+    """Register a callback that receives every cache hit and miss"""
+    global _metrics_hook
+    _metrics_hook = hook
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters and hit rate per cache namespace"""
+    with _stats_lock:
+        return {
+            namespace: {
+                **counts,
+                'hit_rate': counts['hits'] / (counts['hits'] + counts['misses'])
+                if counts['hits'] + counts['misses'] else 0.0
+            }
+            for namespace, counts in _stats.items()
+        }
+
+
+def _record(namespace: str, event: str) -> None:
+    with _stats_lock:
+        counts = _stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+        counts['hits' if event == 'hit' else 'misses'] += 1
+    if _metrics_hook is not None:
+        _metrics_hook(namespace, event)
+
+
+class ReadThroughCache:
+    """Caches one value per user and data version under a namespace, loading it on a miss"""
+
+    def __init__(self, namespace: str, backend=None, ttl: int = CACHE_TTL_SECONDS):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, user_id: int, version: int) -> str:
+        return f"budgify:{self.namespace}:{user_id}:{version}"
+
+    def get_or_load(self, user_id: int, version: Optional[int], loader: Callable[[], Any]) -> Any:
+        """Return the cached value for a user at a data version, calling loader() on a miss.
+
+        loader() must read at least as new as `version` (a consistent read),
+        or an older value could be cached under the newer version.
+        """
+        if self.backend is None or version is None:
+            return loader()
+
+        key = self._key(user_id, version)
+        try:
+            cached = self.backend.get(key)
+        except Exception as exc:
+            logger.warning(f"Cache read failed for {key}: {exc}")
+            return loader()
+
+        if cached is not None:
+            _record(self.namespace, 'hit')
+            return json.loads(cached)['value']
+
+        _record(self.namespace, 'miss')
+        value = loader()
+        try:
+            self.backend.set(key, json.dumps({'value': value}), self.ttl)
+        except Exception as exc:
+            logger.warning(f"Cache write failed for {key}: {exc}")
+        return value
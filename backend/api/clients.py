@@ -0,0 +1,138 @@
+"""
+boto3 client factory.
+
+botocore's defaults (10 pooled connections, legacy retries, 60 second
+timeouts) suit scripts, not an API serving many requests at once. Every
+client built here uses `client_config()`: pool size, connect/read timeouts,
+retry mode and attempts, and TCP keepalive all come from DYNAMODB_* settings,
+with `adaptive` retries so throttling slows the client down instead of
+burning attempts.
+
+Low-level clients are thread-safe but boto3 resources (and Sessions) are
+not. `ThreadLocalResource` gives each thread - the event loop thread and
+every DynamoDB worker thread - its own Session, resource and client, built
+on first use, and `LazyTable` resolves a table name to that thread's Table
+object on each call. Module-level table handles can then be shared freely.
+Hooks added with `add_client_hook` run on every client, including ones
+created later by new threads.
+
+boto3 takes ~100ms to import, so it is imported when the first resource is
+built rather than with this module; cold starts that never reach DynamoDB
+(CORS preflights, /health) skip it.
+"""
+
+import os
+import threading
+import weakref
+from typing import Any, Callable, List
+
+# Connections pooled per client; each thread owns a client, so this only
+# bounds calls a single thread makes concurrently (e.g. a batch writer)
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '10'))
+DYNAMODB_CONNECT_TIMEOUT = float(os.getenv('DYNAMODB_CONNECT_TIMEOUT', '1'))
+DYNAMODB_READ_TIMEOUT = float(os.getenv('DYNAMODB_READ_TIMEOUT', '5'))
+# standard or adaptive (client-side rate limiting once DynamoDB throttles)
+DYNAMODB_RETRY_MODE = os.getenv('DYNAMODB_RETRY_MODE', 'adaptive')
+DYNAMODB_MAX_ATTEMPTS = int(os.getenv('DYNAMODB_MAX_ATTEMPTS', '5'))
+DYNAMODB_TCP_KEEPALIVE = os.getenv('DYNAMODB_TCP_KEEPALIVE', 'true').lower() == 'true'
+
+
+def client_config() -> Any:
+    """botocore Config shared by every DynamoDB client the API creates"""
+    from botocore.config import Config
+    return Config(
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        retries={'mode': DYNAMODB_RETRY_MODE, 'max_attempts': DYNAMODB_MAX_ATTEMPTS},
+        tcp_keepalive=DYNAMODB_TCP_KEEPALIVE,
+    )
+
+
+# Service models are loaded from disk once and shared by every thread's
+# session, which cuts building a resource from ~75ms to ~15ms
+_loader: Any = None
+_loader_lock = threading.Lock()
+
+
+def _session() -> Any:
+    import boto3.session
+    import botocore.session
+    from botocore.loaders import create_loader
+
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = create_loader()
+    core = botocore.session.get_session()
+    core.register_component('data_loader', _loader)
+    return boto3.session.Session(botocore_session=core)
+
+
+def _connection_params() -> dict:
+    return {
+        'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
+        'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
+        'endpoint_url': os.getenv('DYNAMODB_ENDPOINT_URL'),  # e.g. http://localhost:8001 for DynamoDB Local
+        'config': client_config(),
+    }
+
+
+class ThreadLocalResource:
+    """A boto3 service resource per thread, created on first use.
+
+    Attribute access (`meta`, `Table`, `batch_write_item`, ...) is forwarded
+    to the calling thread's resource.
+    """
+
+    def __init__(self, service: str = 'dynamodb'):
+        self._service = service
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[Any], None]] = []
+        self._clients: 'weakref.WeakSet[Any]' = weakref.WeakSet()
+
+    def _resource(self) -> Any:
+        resource = getattr(self._local, 'resource', None)
+        if resource is None:
+            resource = _session().resource(self._service, **_connection_params())
+            with self._lock:
+                for hook in self._hooks:
+                    hook(resource.meta.client)
+                self._clients.add(resource.meta.client)
+            self._local.resource = resource
+            self._local.tables = {}
+        return resource
+
+    def table(self, name: str) -> Any:
+        """This thread's Table object for a table name"""
+        resource = self._resource()
+        table = self._local.tables.get(name)
+        if table is None:
+            table = self._local.tables[name] = resource.Table(name)
+        return table
+
+    def add_client_hook(self, hook: Callable[[Any], None]) -> None:
+        """Run hook(client) on every client, existing and future"""
+        with self._lock:
+            self._hooks.append(hook)
+            for client in list(self._clients):
+                hook(client)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resource(), name)
+
+
+class LazyTable:
+    """A DynamoDB table handle that resolves to the calling thread's Table"""
+
+    def __init__(self, resource: ThreadLocalResource, name: str):
+        self._resource = resource
+        self.name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resource.table(self.name), attr)
+
+    def __repr__(self) -> str:
+        return f"LazyTable({self.name!r})"
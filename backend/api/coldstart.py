@@ -0,0 +1,20 @@
+"""
+Import-time work that has to happen before FastAPI is imported.
+
+FastAPI declares its OpenAPI document models when it is imported, and
+building their pydantic validators is about a third of a cold start. They
+are only needed to serve /openapi.json, so they are declared with
+defer_build and pydantic builds them on first use. The default is restored
+straight afterwards, so our own models build as usual (FastAPI builds the
+route models when the routers are included anyway).
+
+`api.index` imports this module first.
+"""
+
+import pydantic
+
+pydantic.BaseModel.model_config['defer_build'] = True
+try:
+    import fastapi  # noqa: F401
+finally:
+    pydantic.BaseModel.model_config.pop('defer_build', None)
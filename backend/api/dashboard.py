@@ -0,0 +1,47 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
+from .models import Dashboard, RecurringCost, project
+from .database import build_monthly_rollups, parse_rollup, month_date_range
+from .async_database import (
+    get_expense_records_by_date_range,
+    get_recurring_costs_by_user,
+    get_budget_settings
+)
+from .budget import build_spending_summary
+from .middleware import get_current_user
+from .etags import current_data_version, data_etag, cache_headers
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/{year}/{month}", response_model=Dashboard)
+async def get_dashboard(
+    year: int,
+    month: int,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag),
+    version: int = Depends(current_data_version)
+):
+    """Get the month's expenses, recurring costs and spending summary in one call"""
+    user_id = current_user['user_id']
+
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Invalid month")
+
+    # Each read runs once, concurrently
+    expenses, recurring_costs, budget = await asyncio.gather(
+        get_expense_records_by_date_range(user_id, *month_date_range(year, month)),
+        get_recurring_costs_by_user(user_id, version),
+        get_budget_settings(user_id, version)
+    )
+
+    # The month's expenses are already loaded, so aggregate them directly
+    month_key = f"{year:04d}-{month:02d}"
+    rollup = parse_rollup(month_key, build_monthly_rollups(expenses).get(month_key, {}))
+
+    return ORJSONResponse({
+        'expenses': [expense.to_dict() for expense in expenses],
+        'recurring_costs': [project(RecurringCost, cost) for cost in recurring_costs],
+        'summary': build_spending_summary(year, month, rollup, budget, recurring_costs)
+    }, headers=cache_headers(etag))
@@ -1,64 +1,304 @@
 import os
-import boto3
-from boto3.dynamodb.conditions import Key
+import json
+import base64
+import binascii
+import calendar
+from botocore.exceptions import ClientError
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, Tuple
 from decimal import Decimal
 import time
 import random
+from .cache import ReadThroughCache, create_backend
+from .clients import LazyTable, ThreadLocalResource
+from .records import ExpenseRecord, parse_timestamp, format_date_key, to_cents
+from .ids import IdGenerator, default_worker_id
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource(
-    'dynamodb',
-    region_name=os.getenv('AWS_REGION', 'us-east-1'),
-    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
-)
+# DynamoDB resource, one per thread (boto3 resources are not thread-safe)
+dynamodb = ThreadLocalResource('dynamodb')
 
 # Table names
 TABLES = {
     'users': os.getenv('DYNAMODB_USERS_TABLE', 'budgify-users'),
+    'user_lookups': os.getenv('DYNAMODB_USER_LOOKUPS_TABLE', 'budgify-user-lookups'),
     'expenses': os.getenv('DYNAMODB_EXPENSES_TABLE', 'budgify-expenses'),
     'recurring': os.getenv('DYNAMODB_RECURRING_TABLE', 'budgify-recurring-costs'),
     'budget': os.getenv('DYNAMODB_BUDGET_TABLE', 'budgify-budget-settings'),
+    'rollups': os.getenv('DYNAMODB_ROLLUPS_TABLE', 'budgify-monthly-rollups'),
+    'changes': os.getenv('DYNAMODB_CHANGES_TABLE', 'budgify-changes'),
+    'revoked_tokens': os.getenv('DYNAMODB_REVOKED_TOKENS_TABLE', 'budgify-revoked-tokens'),
 }
 
-# Get table references
-users_table = dynamodb.Table(TABLES['users'])
-expenses_table = dynamodb.Table(TABLES['expenses'])
-recurring_table = dynamodb.Table(TABLES['recurring'])
-budget_table = dynamodb.Table(TABLES['budget'])
-
-
-def python_to_dynamodb(obj: Any) -> Any:
-    """Convert Python types to DynamoDB compatible types (float -> Decimal)"""
-    if isinstance(obj, float):
-        return Decimal(str(obj))
-    elif isinstance(obj, dict):
-        return {k: python_to_dynamodb(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [python_to_dynamodb(v) for v in obj]
-    return obj
-
-
-def dynamodb_to_python(obj: Any) -> Any:
-    """Convert DynamoDB types to Python types (Decimal -> int or float)"""
-    if isinstance(obj, Decimal):
-        # If it's a whole number (like IDs), convert to int
-        if obj % 1 == 0:
-            return int(obj)
-        # Otherwise convert to float for amounts with decimals
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {k: dynamodb_to_python(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [dynamodb_to_python(v) for v in obj]
-    return obj
+# TransactWriteItems accepts at most this many operations per call
+TRANSACT_WRITE_MAX_ITEMS = 100
+# Transactions cancelled by concurrent writes are rebuilt and retried with
+# exponential backoff and jitter
+TRANSACT_WRITE_MAX_RETRIES = 5
+TRANSACT_WRITE_BACKOFF_BASE = 0.05  # seconds
+TRANSACT_WRITE_BACKOFF_MAX = 2.0
+
+# Expenses per batch create: each needs its item and change log entry, plus
+# at most one rollup month, and the batch one data version bump
+BATCH_WRITE_SIZE = 25
+# A bulk edit writes each expense, its change log entry and up to two rollup
+# months per expense, plus one data version bump
+BULK_EDIT_MAX_EXPENSES = (TRANSACT_WRITE_MAX_ITEMS - 1) // 4
+
+# Local secondary index on the expenses table, sorted by normalized date
+EXPENSES_DATE_INDEX = 'user-date-index'
+
+# Change log entries expire (DynamoDB TTL on expires_at) after this long
+CHANGE_LOG_TTL_SECONDS = int(os.getenv('CHANGE_LOG_TTL_DAYS', '30')) * 86400
+
+# Get table references (resolved to the calling thread's Table on use)
+users_table = LazyTable(dynamodb, TABLES['users'])
+user_lookups_table = LazyTable(dynamodb, TABLES['user_lookups'])
+expenses_table = LazyTable(dynamodb, TABLES['expenses'])
+recurring_table = LazyTable(dynamodb, TABLES['recurring'])
+budget_table = LazyTable(dynamodb, TABLES['budget'])
+rollups_table = LazyTable(dynamodb, TABLES['rollups'])
+changes_table = LazyTable(dynamodb, TABLES['changes'])
+revoked_tokens_table = LazyTable(dynamodb, TABLES['revoked_tokens'])
+
+# Read-through caches for rarely changing per-user data
+_cache_backend = create_backend()
+recurring_cache = ReadThroughCache('recurring', _cache_backend)
+budget_cache = ReadThroughCache('budget', _cache_backend)
+
+
+class ItemCodec:
+    """Converts one entity between API dicts and DynamoDB items by attribute name.
+
+    Money attributes are stored as integer cents under `<name>_cents` and
+    exposed as floats; integer attributes come back as int. Everything else
+    is a string and passes through untouched.
+    """
+
+    def __init__(self, ints: Iterable[str] = (), money: Iterable[str] = ()):
+        self.ints = frozenset(ints)
+        self.money = frozenset(money)
+        self._stored_money = {f"{name}_cents": name for name in self.money}
+
+    def encode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """API dict -> DynamoDB item"""
+        return {
+            f"{key}_cents" if key in self.money else key: to_cents(value) if key in self.money else value
+            for key, value in data.items()
+        }
+
+    def decode(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """DynamoDB item -> API dict"""
+        data = {}
+        for key, value in item.items():
+            if key in self.ints:
+                data[key] = int(value)
+            elif key in self._stored_money:
+                data[self._stored_money[key]] = int(value) / 100
+            elif key in self.money:
+                # Stored as a decimal amount before the cents migration
+                data.setdefault(key, float(value))
+            else:
+                data[key] = value
+        return data
+
+
+USER_CODEC = ItemCodec(ints=('id',))
+EXPENSE_CODEC = ItemCodec(ints=('id', 'user_id', 'date_ts'), money=('amount',))
+RECURRING_CODEC = ItemCodec(ints=('id', 'user_id'), money=('amount',))
+BUDGET_CODEC = ItemCodec(ints=('user_id',), money=('monthly_budget', 'monthly_limit'))
+
+# Entities recorded in the change log
+CHANGE_CODECS = {'expense': EXPENSE_CODEC, 'recurring': RECURRING_CODEC, 'budget': BUDGET_CODEC}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class ItemNotFoundError(LookupError):
+    """Raised when an update or delete targets an item that does not exist"""
+
+
+class WriteConflictError(RuntimeError):
+    """Raised when a transaction keeps losing to concurrent writes"""
+
+
+class DuplicateUserError(ValueError):
+    """Raised when a new user's email or username is already registered"""
+
+    def __init__(self, field: str):
+        super().__init__(f"{field} already registered")
+        self.field = field
+
+
+def _key(name: str) -> Any:
+    """Key condition builder; boto3 is imported on first use, not at startup"""
+    from boto3.dynamodb.conditions import Key
+    return Key(name)
+
+
+def _is_condition_failure(exc: ClientError) -> bool:
+    return exc.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+
+def _update_expression(
+    item: Dict[str, Any],
+    remove: Iterable[str] = ()
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Build a SET (and optional REMOVE) expression, its attribute names and values"""
+    # Every attribute goes through a placeholder, so reserved words need no special casing
+    names = {f"#attr{i}": key for i, key in enumerate(item)}
+    values = {f":val{i}": value for i, value in enumerate(item.values())}
+    expression = 'SET ' + ', '.join(f"#attr{i} = :val{i}" for i in range(len(item)))
+
+    remove = list(remove)
+    if remove:
+        names.update({f"#rm{i}": key for i, key in enumerate(remove)})
+        expression += ' REMOVE ' + ', '.join(f"#rm{i}" for i in range(len(remove)))
+    return expression, names, values
+
+
+def _transact_write(operations: List[Dict[str, Dict[str, Any]]]) -> None:
+    """Run TransactWriteItems with keys, items and values as plain Python, like the Table API"""
+    # The resource's client carries boto3's type (de)serialization hooks
+    dynamodb.meta.client.transact_write_items(TransactItems=operations)
+
+
+# Cancellation reasons of a throttled transaction. botocore retries throttled
+# single-item calls, but not a TransactionCanceledException, so these are
+# retried here with the same backoff as lost races.
+THROTTLING_REASONS = {'ThrottlingError', 'ProvisionedThroughputExceeded'}
+# Reasons that never mean a bad request: the operation that was not at fault
+# ('None'), a lost race, or throttling
+RETRYABLE_REASONS = {'None', 'ConditionalCheckFailed', 'TransactionConflict'} | THROTTLING_REASONS
+
+
+def _cancellation_reasons(exc: ClientError) -> List[str]:
+    """A cancelled transaction's reason codes, in operation order"""
+    return [reason.get('Code', 'None') for reason in exc.response.get('CancellationReasons', [])]
+
+
+def _should_retry(exc: ClientError) -> bool:
+    """Whether a transaction lost to concurrent writes or was throttled, rather than being a bad request"""
+    code = exc.response['Error']['Code']
+    return code == 'TransactionConflictException' or (
+        code == 'TransactionCanceledException' and
+        set(_cancellation_reasons(exc)) <= RETRYABLE_REASONS
+    )
+
+
+def _transact_with_retries(
+    build: Callable[[], Tuple[List[Dict[str, Dict[str, Any]]], Any]],
+    conflict_message: str,
+    on_cancel: Optional[Callable[[List[str]], None]] = None
+) -> Any:
+    """Run the transaction build() describes, rebuilding it after each lost race or throttle.
+
+    build() returns (operations, result) and runs again for every attempt,
+    so it can re-read what changed. on_cancel(reasons) sees the cancellation
+    reason codes, in operation order, before the retry and may raise its own
+    error instead. When the retries run out, raises WriteConflictError, or
+    the last ClientError if that attempt was throttled.
+    """
+    for attempt in range(TRANSACT_WRITE_MAX_RETRIES + 1):
+        if attempt:
+            delay = min(TRANSACT_WRITE_BACKOFF_BASE * 2 ** (attempt - 1), TRANSACT_WRITE_BACKOFF_MAX)
+            time.sleep(delay * random.uniform(0.5, 1))
+        operations, result = build()
+        try:
+            _transact_write(operations)
+        except ClientError as exc:
+            if not _should_retry(exc):
+                raise
+            reasons = _cancellation_reasons(exc)
+            if on_cancel:
+                on_cancel(reasons)
+            if attempt == TRANSACT_WRITE_MAX_RETRIES and THROTTLING_REASONS & set(reasons):
+                raise
+            continue
+        return result
+    raise WriteConflictError(conflict_message)
+
+
+def _put_new(table: str, item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Transaction operation that creates an item, failing if its ID is taken"""
+    return {'Put': {'TableName': TABLES[table], 'Item': item, 'ConditionExpression': 'attribute_not_exists(id)'}}
+
+
+def _new_ids_on_collision(records: List[Dict[str, Any]]) -> Callable[[List[str]], None]:
+    """on_cancel hook for a transaction whose first operations are _put_new
+    of each record, in order: a failed put means another worker drew the same
+    ID (see api.ids), so the record gets a new one for the retry"""
+    def on_cancel(reasons: List[str]) -> None:
+        for record, reason in zip(records, reasons):
+            if reason == 'ConditionalCheckFailed':
+                record['id'] = generate_id()
+    return on_cancel
+
+
+def _data_version_bump(user_id: int) -> Dict[str, Dict[str, Any]]:
+    """Transaction operation that invalidates a user's ETags (see bump_data_version)"""
+    return {'Update': {
+        'TableName': TABLES['users'],
+        'Key': {'id': user_id},
+        'UpdateExpression': 'ADD data_version :one',
+        'ExpressionAttributeValues': {':one': 1}
+    }}
+
+
+def _change_put(
+    user_id: int,
+    entity: str,
+    entity_id: int,
+    data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Transaction operation that appends a write to the user's change log"""
+    return {'Put': {'TableName': TABLES['changes'], 'Item': _change_item(user_id, entity, entity_id, data)}}
+
+
+def encode_cursor(last_evaluated_key: Dict[str, Any]) -> str:
+    """Encode a DynamoDB LastEvaluatedKey as an opaque URL-safe token"""
+    key = {name: int(value) if isinstance(value, Decimal) else value for name, value in last_evaluated_key.items()}
+    raw = json.dumps(key, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a token produced by encode_cursor back into an ExclusiveStartKey"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError('Invalid cursor')
+    # Keys only ever hold numbers and strings
+    if not isinstance(key, dict) or not all(
+        isinstance(value, (int, str)) and not isinstance(value, bool) for value in key.values()
+    ):
+        raise InvalidCursorError('Invalid cursor')
+    return key
+
+
+def iter_query_pages(
+    table,
+    codec: ItemCodec,
+    **kwargs
+) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Run a query page by page, yielding (decoded items, last_evaluated_key) until exhausted"""
+    while True:
+        response = table.query(**kwargs)
+        last_key = response.get('LastEvaluatedKey')
+        yield [codec.decode(item) for item in response.get('Items', [])], last_key
+        if not last_key:
+            break
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+_id_generator = IdGenerator(default_worker_id())
 
 
 def generate_id() -> int:
-    """Generate a unique ID using timestamp and random number"""
-    return int(time.time() * 1000) + random.randint(0, 999)
+    """Generate a unique, creation-ordered ID (see api.ids)"""
+    return _id_generator.next_id()
 
 
 def get_current_timestamp() -> str:
@@ -66,188 +306,746 @@ def get_current_timestamp() -> str:
     return datetime.utcnow().isoformat() + 'Z'
 
 
+def normalize_date_key(value: str) -> str:
+    """Normalize an ISO date/datetime string to a sortable UTC key (YYYY-MM-DDTHH:MM:SS)"""
+    return format_date_key(parse_timestamp(value))
+
+
+def date_attributes(value: str) -> Dict[str, Any]:
+    """Normalized forms of an expense date stored alongside it: the index key and epoch seconds"""
+    timestamp = parse_timestamp(value)
+    return {'date_key': format_date_key(timestamp), 'date_ts': timestamp}
+
+
+def month_date_range(year: int, month: int) -> Tuple[str, str]:
+    """Get the first and last instant of a calendar month as ISO strings"""
+    days_in_month = calendar.monthrange(year, month)[1]
+    return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{days_in_month:02d}T23:59:59"
+
+
 # User operations
-def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    """Get user by email using GSI"""
-    response = users_table.query(
-        IndexName='email-index',
-        KeyConditionExpression=Key('email').eq(email),
-        Limit=1
-    )
-    items = response.get('Items', [])
-    return dynamodb_to_python(items[0]) if items else None
+#
+# Emails and usernames are kept unique by marker items in the lookups table,
+# keyed EMAIL#<email> and USERNAME#<username> and written in the same
+# transaction as the user. The email marker also carries what login needs,
+# so signing in is a single strongly consistent get_item.
+def email_lookup_key(email: str) -> str:
+    return f"EMAIL#{email}"
+
 
+def username_lookup_key(username: str) -> str:
+    return f"USERNAME#{username}"
 
-def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
-    """Get user by username using GSI"""
-    response = users_table.query(
-        IndexName='username-index',
-        KeyConditionExpression=Key('username').eq(username),
-        Limit=1
+
+def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Get a user's login details (id, username, email, password hash) by email"""
+    response = user_lookups_table.get_item(
+        Key={'key': email_lookup_key(email)},
+        # A user who just registered must be able to sign in straight away
+        ConsistentRead=True
     )
-    items = response.get('Items', [])
-    return dynamodb_to_python(items[0]) if items else None
+    item = response.get('Item')
+    if not item:
+        return None
+    return {
+        'id': int(item['user_id']),
+        'username': item['username'],
+        'email': item['email'],
+        'password': item['password'],
+    }
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     """Get user by ID"""
     response = users_table.get_item(Key={'id': user_id})
     item = response.get('Item')
-    return dynamodb_to_python(item) if item else None
+    return USER_CODEC.decode(item) if item else None
 
 
 def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new user"""
-    dynamodb_data = python_to_dynamodb(user_data)
-    users_table.put_item(Item=dynamodb_data)
-    return user_data
+    """Create a new user and claim their email and username in one transaction.
+
+    Raises DuplicateUserError (field 'email' or 'username') if either is taken.
+    If the user's ID is taken, the user is created under a new one; the
+    returned user holds the ID it was saved under.
+    """
+    user_data = dict(user_data)
+    fields = ('email', 'username')
+
+    def build():
+        user_id = user_data['id']
+        markers = [
+            {
+                'key': email_lookup_key(user_data['email']),
+                'user_id': user_id,
+                'username': user_data['username'],
+                'email': user_data['email'],
+                'password': user_data['password'],
+            },
+            {'key': username_lookup_key(user_data['username']), 'user_id': user_id},
+        ]
+        operations = [_put_new('users', USER_CODEC.encode(user_data))]
+        operations.extend({'Put': {
+            'TableName': TABLES['user_lookups'],
+            'Item': marker,
+            'ConditionExpression': 'attribute_not_exists(#key)',
+            'ExpressionAttributeNames': {'#key': 'key'}
+        }} for marker in markers)
+        return operations, user_data
+
+    new_id_on_collision = _new_ids_on_collision([user_data])
+
+    def on_cancel(reasons: List[str]) -> None:
+        # Reasons line up with the operations: the user item, then the markers
+        for field, reason in zip(fields, reasons[1:]):
+            if reason == 'ConditionalCheckFailed':
+                raise DuplicateUserError(field)
+        new_id_on_collision(reasons)
+
+    return _transact_with_retries(build, 'User could not be created', on_cancel)
+
+
+def update_user_password(user_id: int, email: str, password_hash: str) -> None:
+    """Replace a user's password hash on the user and their email marker"""
+    _transact_write([
+        {'Update': {
+            'TableName': TABLES['users'],
+            'Key': {'id': user_id},
+            'UpdateExpression': 'SET password = :password',
+            'ExpressionAttributeValues': {':password': password_hash}
+        }},
+        {'Update': {
+            'TableName': TABLES['user_lookups'],
+            'Key': {'key': email_lookup_key(email)},
+            'UpdateExpression': 'SET password = :password',
+            'ConditionExpression': 'user_id = :user_id',
+            'ExpressionAttributeValues': {':password': password_hash, ':user_id': user_id}
+        }},
+    ])
+
+
+def get_tokens_valid_after(user_id: int) -> float:
+    """Get the time (epoch seconds) before which the user's tokens are revoked; 0 if never"""
+    response = users_table.get_item(
+        Key={'id': user_id},
+        ProjectionExpression='tokens_valid_after',
+        ConsistentRead=True
+    )
+    return float(response.get('Item', {}).get('tokens_valid_after', 0))
+
+
+def revoke_user_tokens(user_id: int, issued_before: float) -> None:
+    """Revoke every token issued to a user before issued_before (epoch seconds)"""
+    try:
+        users_table.update_item(
+            Key={'id': user_id},
+            UpdateExpression='SET tokens_valid_after = :time',
+            # Don't leave a stub item behind for a user that no longer exists
+            ConditionExpression='attribute_exists(id)',
+            ExpressionAttributeValues={':time': Decimal(str(issued_before))}
+        )
+    except ClientError as exc:
+        if exc.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+
+def is_token_revoked(jti: str) -> bool:
+    """Whether the token with this ID (the jti claim) has been revoked"""
+    response = revoked_tokens_table.get_item(Key={'jti': jti}, ConsistentRead=True)
+    return 'Item' in response
+
+
+def revoke_token(jti: str, expires_at: float) -> None:
+    """Revoke one token by its ID; the entry expires (DynamoDB TTL) with the token"""
+    revoked_tokens_table.put_item(Item={'jti': jti, 'expires_at': int(expires_at)})
+
+
+def get_data_version(user_id: int) -> int:
+    """Get the counter that changes whenever any of a user's data changes"""
+    response = users_table.get_item(
+        Key={'id': user_id},
+        ProjectionExpression='data_version',
+        # A stale read could confirm a cached response that a write just invalidated
+        ConsistentRead=True
+    )
+    return int(response.get('Item', {}).get('data_version', 0))
+
+
+def bump_data_version(user_id: int) -> None:
+    """Mark a user's data as changed, invalidating their ETags"""
+    users_table.update_item(
+        Key={'id': user_id},
+        UpdateExpression='ADD data_version :one',
+        ExpressionAttributeValues={':one': 1}
+    )
 
 
 # Expense operations
+#
+# Every write commits the item, its rollup deltas, its change log entry and
+# the data version bump in one TransactWriteItems call. DynamoDB round trips
+# per write: create 1; update, delete and bulk edit 2 (a consistent read for
+# the rollup deltas, then the transaction). A failed condition costs one
+# more read-and-transaction per retry.
+def _expense_query(user_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+    """Build query arguments for a user's expenses on the date index, newest first"""
+    key_condition = _key('user_id').eq(user_id)
+    if start_date is not None and end_date is not None:
+        key_condition &= _key('date_key').between(normalize_date_key(start_date), normalize_date_key(end_date))
+    elif start_date is not None:
+        key_condition &= _key('date_key').gte(normalize_date_key(start_date))
+    elif end_date is not None:
+        key_condition &= _key('date_key').lte(normalize_date_key(end_date))
+    return {
+        'IndexName': EXPENSES_DATE_INDEX,
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': False,
+        # Responses carry an ETag from the consistently read data version; a
+        # stale read here would serve the pre-write body under the new ETag
+        # (the date index is local, so it supports consistent reads)
+        'ConsistentRead': True
+    }
+
+
+def iter_expense_pages(
+    user_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Lazily yield a user's expenses one DynamoDB page at a time, newest first"""
+    kwargs = _expense_query(user_id, start_date, end_date)
+    if page_size:
+        kwargs['Limit'] = page_size
+    for items, _ in iter_query_pages(expenses_table, EXPENSE_CODEC, **kwargs):
+        yield items
+
+
+def iter_expense_records(
+    user_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Iterator[ExpenseRecord]:
+    """Lazily yield a user's expenses as compact records, newest first"""
+    kwargs = _expense_query(user_id, start_date, end_date)
+    while True:
+        response = expenses_table.query(**kwargs)
+        # Built straight from the raw items, skipping the generic type conversion
+        for item in response.get('Items', []):
+            yield ExpenseRecord.from_item(item)
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def get_expense_page(
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of a user's expenses and the cursor for the next page"""
+    kwargs = _expense_query(user_id)
+    kwargs['Limit'] = limit
+    if cursor:
+        start_key = decode_cursor(cursor)
+        if set(start_key) != {'user_id', 'id', 'date_key'}:
+            raise InvalidCursorError('Invalid cursor')
+        # Never let a cursor reach into another user's partition
+        start_key['user_id'] = user_id
+        kwargs['ExclusiveStartKey'] = start_key
+    items, last_key = next(iter_query_pages(expenses_table, EXPENSE_CODEC, **kwargs))
+    return items, encode_cursor(last_key) if last_key else None
+
+
+def get_recent_expenses(user_id: int, limit: int, by: str = 'date') -> List[Dict[str, Any]]:
+    """Get a user's most recent expenses with one bounded query.
+
+    by='date' walks the date index newest first; by='created' walks the
+    table's id key, which is in creation order (see api.ids). Either way the
+    query reads at most `limit` items, however long the history is.
+    """
+    if by == 'created':
+        kwargs = {
+            'KeyConditionExpression': _key('user_id').eq(user_id),
+            'ScanIndexForward': False,
+            'ConsistentRead': True
+        }
+    else:
+        kwargs = _expense_query(user_id)
+    response = expenses_table.query(Limit=limit, **kwargs)
+    return [EXPENSE_CODEC.decode(item) for item in response.get('Items', [])]
+
+
 def get_expenses_by_user(user_id: int) -> List[Dict[str, Any]]:
-    """Get all expenses for a user"""
-    response = expenses_table.query(
-        KeyConditionExpression=Key('user_id').eq(user_id)
-    )
-    expenses = response.get('Items', [])
-    # Sort by date descending
-    expenses.sort(key=lambda x: x.get('date', ''), reverse=True)
-    return dynamodb_to_python(expenses)
+    """Get all expenses for a user, newest date first"""
+    return [item for page in iter_expense_pages(user_id) for item in page]
+
+
+def get_expenses_by_date_range(user_id: int, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """Get expenses dated between start_date and end_date (inclusive), newest first"""
+    return [item for page in iter_expense_pages(user_id, start_date, end_date) for item in page]
+
+
+def get_expense_records_by_date_range(user_id: int, start_date: str, end_date: str) -> List[ExpenseRecord]:
+    """Get expenses dated between start_date and end_date (inclusive) as records, newest first"""
+    return list(iter_expense_records(user_id, start_date, end_date))
 
 
 def get_expense(user_id: int, expense_id: int) -> Optional[Dict[str, Any]]:
     """Get a specific expense"""
     response = expenses_table.get_item(
-        Key={'user_id': user_id, 'id': expense_id}
+        Key={'user_id': user_id, 'id': expense_id},
+        ConsistentRead=True
     )
     item = response.get('Item')
-    return dynamodb_to_python(item) if item else None
+    return EXPENSE_CODEC.decode(item) if item else None
 
 
 def create_expense(expense_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new expense"""
-    dynamodb_data = python_to_dynamodb(expense_data)
-    expenses_table.put_item(Item=dynamodb_data)
-    return expense_data
+    """Create a new expense.
+
+    The expense, its rollup increment, its change log entry and the data
+    version bump are written in one transaction. If the expense's ID is
+    taken, it is saved under a new one, which the returned expense holds.
+    """
+    expense_data = {**expense_data, **date_attributes(expense_data['date'])}
+    user_id = expense_data['user_id']
+    deltas = {}
+    _add_rollup_deltas(deltas, EXPENSE_CODEC.encode(expense_data), 1)
+
+    def build():
+        item = EXPENSE_CODEC.encode(expense_data)
+        return [
+            _put_new('expenses', item),
+            *_rollup_operations(user_id, deltas),
+            _change_put(user_id, 'expense', expense_data['id'], item),
+            _data_version_bump(user_id),
+        ], expense_data
+
+    return _transact_with_retries(build, 'Expense could not be saved', _new_ids_on_collision([expense_data]))
+
+
+def batch_create_expenses(expenses: List[Dict[str, Any]]) -> List[int]:
+    """Create up to BATCH_WRITE_SIZE expenses of one user in one transaction.
+
+    The expenses, one rollup increment per month, their change log entries
+    and the data version bump commit together. Returns the IDs the expenses
+    were saved under, in order: an expense whose ID was taken gets a new one.
+    Raises WriteConflictError if the transaction kept losing to concurrent
+    writes; then nothing was written.
+    """
+    if not expenses:
+        return []
+    expenses = [{**expense, **date_attributes(expense['date'])} for expense in expenses]
+    user_id = expenses[0]['user_id']
+    # One rollup increment per month rather than per expense
+    rollups = build_monthly_rollups(ExpenseRecord.from_item(EXPENSE_CODEC.encode(expense)) for expense in expenses)
+
+    def build():
+        items = [EXPENSE_CODEC.encode(expense) for expense in expenses]
+        operations = [_put_new('expenses', item) for item in items]
+        operations.extend(
+            _change_put(user_id, 'expense', expense['id'], item) for expense, item in zip(expenses, items)
+        )
+        operations.extend(_rollup_operations(user_id, rollups))
+        operations.append(_data_version_bump(user_id))
+        return operations, [expense['id'] for expense in expenses]
+
+    return _transact_with_retries(build, 'Expenses could not be saved', _new_ids_on_collision(expenses))
 
 
 def update_expense(user_id: int, expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
-    """Update an expense"""
-    update_expr = "SET "
-    expr_values = {}
-    expr_names = {}
+    """Update an expense, raising ItemNotFoundError if it does not exist (see bulk_edit_expenses)"""
+    return bulk_edit_expenses(user_id, {expense_id: updates}, [])[0]
 
-    # Convert updates to DynamoDB types
-    updates_dynamodb = python_to_dynamodb(updates)
-
-    for i, (key, value) in enumerate(updates_dynamodb.items()):
-        if key in ['date', 'name']:  # Reserved keywords
-            attr_name = f"#attr{i}"
-            attr_value = f":val{i}"
-            expr_names[attr_name] = key
-            update_expr += f"{attr_name} = {attr_value}, "
+
+def delete_expense(user_id: int, expense_id: int) -> None:
+    """Delete an expense, raising ItemNotFoundError if it does not exist (see bulk_edit_expenses)"""
+    bulk_edit_expenses(user_id, {}, [expense_id])
+
+
+# Attributes an expense's rollup contribution is computed from
+ROLLUP_SOURCE_ATTRIBUTES = ('date_key', 'date_ts', 'amount', 'amount_cents', 'category')
+
+
+def _batch_get_expenses(user_id: int, expense_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Read up to 100 expenses in one BatchGetItem call, keyed by ID (missing IDs are absent)"""
+    found = {}
+    request = {TABLES['expenses']: {
+        'Keys': [{'user_id': user_id, 'id': expense_id} for expense_id in expense_ids],
+        'ConsistentRead': True
+    }}
+    while request:
+        response = dynamodb.batch_get_item(RequestItems=request)
+        for item in response.get('Responses', {}).get(TABLES['expenses'], []):
+            found[int(item['id'])] = item
+        request = response.get('UnprocessedKeys')
+    return found
+
+
+def _unchanged_condition(
+    item: Dict[str, Any],
+    attributes: Iterable[str] = ROLLUP_SOURCE_ATTRIBUTES
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Condition that the item's attributes still hold the values read"""
+    clauses, names, values = [], {}, {}
+    for i, attr in enumerate(attributes):
+        names[f"#cond{i}"] = attr
+        if attr in item:
+            values[f":cond{i}"] = item[attr]
+            clauses.append(f"#cond{i} = :cond{i}")
         else:
-            attr_value = f":val{i}"
-            update_expr += f"{key} = {attr_value}, "
-        expr_values[attr_value] = value
+            clauses.append(f"attribute_not_exists(#cond{i})")
+    return ' AND '.join(clauses), names, values
 
-    update_expr = update_expr.rstrip(', ')
 
-    kwargs = {
-        'Key': {'user_id': user_id, 'id': expense_id},
-        'UpdateExpression': update_expr,
-        'ExpressionAttributeValues': expr_values,
-        'ReturnValues': 'ALL_NEW'
-    }
+def bulk_edit_expenses(
+    user_id: int,
+    updates: Dict[int, Dict[str, Any]],
+    deletes: List[int]
+) -> List[Dict[str, Any]]:
+    """Update and delete several expenses atomically; returns the updated expenses.
 
-    if expr_names:
-        kwargs['ExpressionAttributeNames'] = expr_names
+    The current items are read with one BatchGetItem, then every expense
+    write, the rollup deltas, the change log entries and the data version
+    bump go into a single TransactWriteItems call. Each expense write is
+    conditioned on the attributes its rollup contribution came from, so a
+    concurrent edit cancels the transaction instead of skewing the rollups;
+    cancelled transactions are re-read and retried. Raises
+    ItemNotFoundError if any expense does not exist.
+    """
+    expense_ids = list(updates) + list(deletes)
 
-    response = expenses_table.update_item(**kwargs)
-    return dynamodb_to_python(response.get('Attributes', {}))
+    def build():
+        current = _batch_get_expenses(user_id, expense_ids)
+        missing = [expense_id for expense_id in expense_ids if expense_id not in current]
+        if missing:
+            raise ItemNotFoundError(f"Expenses not found: {', '.join(map(str, missing))}")
 
+        operations = []
+        deltas = {}
+        updated = []
+        for expense_id in expense_ids:
+            old = current[expense_id]
+            condition, names, values = _unchanged_condition(old)
+            key = {'user_id': user_id, 'id': expense_id}
+            _add_rollup_deltas(deltas, old, -1)
 
-def delete_expense(user_id: int, expense_id: int) -> None:
-    """Delete an expense"""
-    expenses_table.delete_item(Key={'user_id': user_id, 'id': expense_id})
+            if expense_id in updates:
+                changes = updates[expense_id]
+                if 'date' in changes:
+                    changes = {**changes, **date_attributes(changes['date'])}
+                encoded = EXPENSE_CODEC.encode(changes)
+                expression, update_names, update_values = _update_expression(
+                    encoded, remove=['amount'] if 'amount' in changes else []
+                )
+                operations.append({'Update': {
+                    'TableName': TABLES['expenses'],
+                    'Key': key,
+                    'UpdateExpression': expression,
+                    'ConditionExpression': condition,
+                    'ExpressionAttributeNames': {**names, **update_names},
+                    'ExpressionAttributeValues': {**values, **update_values}
+                }})
+                new = {**old, **encoded}
+                if 'amount' in changes:
+                    new.pop('amount', None)
+                _add_rollup_deltas(deltas, new, 1)
+                updated.append(new)
+            else:
+                new = None
+                delete = {'TableName': TABLES['expenses'], 'Key': key, 'ConditionExpression': condition,
+                          'ExpressionAttributeNames': names}
+                if values:
+                    delete['ExpressionAttributeValues'] = values
+                operations.append({'Delete': delete})
+
+            operations.append(_change_put(user_id, 'expense', expense_id, new))
+
+        operations.extend(_rollup_operations(user_id, deltas))
+        operations.append(_data_version_bump(user_id))
+        return operations, [EXPENSE_CODEC.decode(item) for item in updated]
+
+    return _transact_with_retries(build, 'Expenses kept changing during the edit')
 
 
 # Recurring cost operations
-def get_recurring_costs_by_user(user_id: int) -> List[Dict[str, Any]]:
-    """Get all recurring costs for a user"""
-    response = recurring_table.query(
-        KeyConditionExpression=Key('user_id').eq(user_id)
-    )
-    return dynamodb_to_python(response.get('Items', []))
+#
+# Round trips per write: create and delete 1 (the transaction); update 2 (a
+# consistent read for the change log's copy of the item, then the
+# transaction).
+def get_recurring_costs_by_user(user_id: int, version: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get all recurring costs for a user, cached per data version when one is given"""
+    def load() -> List[Dict[str, Any]]:
+        pages = iter_query_pages(
+            recurring_table,
+            RECURRING_CODEC,
+            KeyConditionExpression=_key('user_id').eq(user_id),
+            ConsistentRead=True
+        )
+        return [item for items, _ in pages for item in items]
+
+    return recurring_cache.get_or_load(user_id, version, load)
 
 
 def get_recurring_cost(user_id: int, recurring_id: int) -> Optional[Dict[str, Any]]:
     """Get a specific recurring cost"""
     response = recurring_table.get_item(
-        Key={'user_id': user_id, 'id': recurring_id}
+        Key={'user_id': user_id, 'id': recurring_id},
+        ConsistentRead=True
     )
     item = response.get('Item')
-    return dynamodb_to_python(item) if item else None
+    return RECURRING_CODEC.decode(item) if item else None
 
 
 def create_recurring_cost(recurring_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Create a new recurring cost"""
-    dynamodb_data = python_to_dynamodb(recurring_data)
-    recurring_table.put_item(Item=dynamodb_data)
-    return recurring_data
+    """Create a new recurring cost with its change log entry and data version bump, in one transaction.
+
+    If the recurring cost's ID is taken, it is saved under a new one, which
+    the returned recurring cost holds.
+    """
+    recurring_data = dict(recurring_data)
+    user_id = recurring_data['user_id']
+
+    def build():
+        item = RECURRING_CODEC.encode(recurring_data)
+        return [
+            _put_new('recurring', item),
+            _change_put(user_id, 'recurring', recurring_data['id'], item),
+            _data_version_bump(user_id),
+        ], recurring_data
+
+    return _transact_with_retries(build, 'Recurring cost could not be saved', _new_ids_on_collision([recurring_data]))
 
 
 def update_recurring_cost(user_id: int, recurring_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
-    """Update a recurring cost"""
-    update_expr = "SET "
-    expr_values = {}
-    expr_names = {}
+    """Update a recurring cost, raising ItemNotFoundError if it does not exist.
 
+    The change log needs the whole updated item, so the item is read first;
+    the update, conditioned on the item still holding what was read, then
+    commits with the change log entry and the data version bump.
+    """
     # Convert updates to DynamoDB types
-    updates_dynamodb = python_to_dynamodb(updates)
-
-    for i, (key, value) in enumerate(updates_dynamodb.items()):
-        if key in ['name']:  # Reserved keywords
-            attr_name = f"#attr{i}"
-            attr_value = f":val{i}"
-            expr_names[attr_name] = key
-            update_expr += f"{attr_name} = {attr_value}, "
-        else:
-            attr_value = f":val{i}"
-            update_expr += f"{key} = {attr_value}, "
-        expr_values[attr_value] = value
+    updates_dynamodb = RECURRING_CODEC.encode(updates)
+    # Drop the pre-cents decimal amount, if the item still has one
+    remove = ['amount'] if 'amount' in updates else []
+    key = {'user_id': user_id, 'id': recurring_id}
 
-    update_expr = update_expr.rstrip(', ')
+    def build():
+        old = recurring_table.get_item(Key=key, ConsistentRead=True).get('Item')
+        if not old:
+            raise ItemNotFoundError(f"Recurring cost {recurring_id} not found")
+        condition, names, values = _unchanged_condition(old, list(old))
+        expression, update_names, update_values = _update_expression(updates_dynamodb, remove=remove)
+        new = {**old, **updates_dynamodb}
+        for attr in remove:
+            new.pop(attr, None)
+        return [
+            {'Update': {
+                'TableName': TABLES['recurring'],
+                'Key': key,
+                'UpdateExpression': expression,
+                'ConditionExpression': condition,
+                'ExpressionAttributeNames': {**names, **update_names},
+                'ExpressionAttributeValues': {**values, **update_values}
+            }},
+            _change_put(user_id, 'recurring', recurring_id, new),
+            _data_version_bump(user_id),
+        ], RECURRING_CODEC.decode(new)
 
-    kwargs = {
-        'Key': {'user_id': user_id, 'id': recurring_id},
-        'UpdateExpression': update_expr,
-        'ExpressionAttributeValues': expr_values,
-        'ReturnValues': 'ALL_NEW'
-    }
+    return _transact_with_retries(build, 'Recurring cost kept changing during the update')
 
-    if expr_names:
-        kwargs['ExpressionAttributeNames'] = expr_names
 
-    response = recurring_table.update_item(**kwargs)
-    return dynamodb_to_python(response.get('Attributes', {}))
+def delete_recurring_cost(user_id: int, recurring_id: int) -> None:
+    """Delete a recurring cost, raising ItemNotFoundError if it does not exist"""
+    def build():
+        return [
+            {'Delete': {
+                'TableName': TABLES['recurring'],
+                'Key': {'user_id': user_id, 'id': recurring_id},
+                'ConditionExpression': 'attribute_exists(id)'
+            }},
+            _change_put(user_id, 'recurring', recurring_id),
+            _data_version_bump(user_id),
+        ], None
 
+    def on_cancel(reasons: List[str]) -> None:
+        # The delete is the first operation
+        if reasons[:1] == ['ConditionalCheckFailed']:
+            raise ItemNotFoundError(f"Recurring cost {recurring_id} not found")
 
-def delete_recurring_cost(user_id: int, recurring_id: int) -> None:
-    """Delete a recurring cost"""
-    recurring_table.delete_item(Key={'user_id': user_id, 'id': recurring_id})
+    _transact_with_retries(build, 'Recurring cost could not be deleted', on_cancel)
 
 
 # Budget operations
-def get_budget_settings(user_id: int) -> Optional[Dict[str, Any]]:
-    """Get budget settings for a user"""
-    response = budget_table.get_item(Key={'user_id': user_id})
-    item = response.get('Item')
-    return dynamodb_to_python(item) if item else None
+#
+# Saving is one transaction with the change log entry and version bump.
+def get_budget_settings(user_id: int, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Get budget settings for a user, cached per data version when one is given"""
+    def load() -> Optional[Dict[str, Any]]:
+        response = budget_table.get_item(Key={'user_id': user_id}, ConsistentRead=True)
+        item = response.get('Item')
+        return BUDGET_CODEC.decode(item) if item else None
+
+    return budget_cache.get_or_load(user_id, version, load)
 
 
 def save_budget_settings(budget_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Save budget settings"""
-    dynamodb_data = python_to_dynamodb(budget_data)
-    budget_table.put_item(Item=dynamodb_data)
-    return budget_data
+    """Save budget settings with their change log entry and data version bump, in one transaction"""
+    item = BUDGET_CODEC.encode(budget_data)
+    user_id = budget_data['user_id']
+
+    def build():
+        return [
+            {'Put': {'TableName': TABLES['budget'], 'Item': item}},
+            _change_put(user_id, 'budget', user_id, item),
+            _data_version_bump(user_id),
+        ], budget_data
+
+    return _transact_with_retries(build, 'Budget settings could not be saved')
+
+
+# Change log operations (incremental sync)
+def change_seq(timestamp_ms: int) -> str:
+    """Time-sortable change sequence: zero-padded epoch milliseconds and a random suffix"""
+    return f"{timestamp_ms:013d}-{os.urandom(4).hex()}"
+
+
+def _change_item(
+    user_id: int,
+    entity: str,
+    entity_id: int,
+    data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build a change log entry; data is the stored item, or None for a delete"""
+    now = time.time()
+    item = {
+        'user_id': user_id,
+        'seq': change_seq(int(now * 1000)),
+        'entity': entity,
+        'entity_id': entity_id,
+        'op': 'delete' if data is None else 'upsert',
+        'expires_at': int(now) + CHANGE_LOG_TTL_SECONDS,
+    }
+    if data is not None:
+        item['data'] = data
+    return item
+
+
+def get_changes(user_id: int, after_seq: str, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Get changes logged after after_seq, oldest first, and whether more remain"""
+    response = changes_table.query(
+        KeyConditionExpression=_key('user_id').eq(user_id) & _key('seq').gt(after_seq),
+        Limit=limit
+    )
+    changes = [
+        {
+            'seq': item['seq'],
+            'entity': item['entity'],
+            'id': int(item['entity_id']),
+            'op': item['op'],
+            'data': CHANGE_CODECS[item['entity']].decode(item['data']) if 'data' in item else None,
+        }
+        for item in response.get('Items', [])
+    ]
+    return changes, 'LastEvaluatedKey' in response
+
+
+# Monthly rollup operations (all money counters are integer cents)
+def rollup_contribution(expense: ExpenseRecord) -> Tuple[str, Dict[str, int]]:
+    """Get the rollup month and counter increments for one expense"""
+    return expense.month, {
+        'total': expense.cents,
+        'expense_count': 1,
+        f"category#{expense.category}": expense.cents,
+        f"day#{expense.day:02d}": expense.cents,
+    }
+
+
+def build_monthly_rollups(expenses: Iterable[ExpenseRecord]) -> Dict[str, Dict[str, int]]:
+    """Aggregate expenses into rollup counters keyed by month (YYYY-MM)"""
+    rollups = {}
+    for expense in expenses:
+        month, counters = rollup_contribution(expense)
+        rollup = rollups.setdefault(month, {})
+        for attr, value in counters.items():
+            rollup[attr] = rollup.get(attr, 0) + value
+    return rollups
+
+
+def rollup_update(user_id: int, month: str, counters: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    """UpdateItem parameters that add counter deltas to a monthly rollup (None if all are zero)"""
+    counters = {attr: value for attr, value in counters.items() if value != 0}
+    if not counters:
+        return None
+
+    expr_names = {}
+    expr_values = {}
+    for i, (attr, value) in enumerate(counters.items()):
+        expr_names[f"#attr{i}"] = attr
+        expr_values[f":val{i}"] = value
+
+    return {
+        'Key': {'user_id': user_id, 'month': month},
+        'UpdateExpression': 'ADD ' + ', '.join(f"#attr{i} :val{i}" for i in range(len(counters))),
+        'ExpressionAttributeNames': expr_names,
+        'ExpressionAttributeValues': expr_values
+    }
+
+
+def _rollup_operations(user_id: int, deltas: Dict[str, Dict[str, int]]) -> List[Dict[str, Dict[str, Any]]]:
+    """Transaction operations that add counter deltas to monthly rollups, by month"""
+    operations = []
+    for month, counters in deltas.items():
+        params = rollup_update(user_id, month, counters)
+        if params:
+            operations.append({'Update': {'TableName': TABLES['rollups'], **params}})
+    return operations
+
+
+def _add_rollup_deltas(
+    deltas: Dict[str, Dict[str, int]],
+    expense: Optional[Dict[str, Any]],
+    sign: int
+) -> None:
+    """Accumulate an expense item's rollup contribution by month (sign -1 takes it out)"""
+    # Items without date_key predate rollups and are left to reconciliation
+    if not expense or 'date_key' not in expense:
+        return
+    month, counters = rollup_contribution(ExpenseRecord.from_item(expense))
+    month_deltas = deltas.setdefault(month, {})
+    for attr, value in counters.items():
+        month_deltas[attr] = month_deltas.get(attr, 0) + sign * value
+
+
+def parse_rollup(month: str, counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert rollup counters into totals, category and daily breakdowns (in cents)"""
+    categories = {}
+    daily = {}
+    for attr, value in counters.items():
+        if attr.startswith('category#'):
+            if value != 0:
+                categories[attr[len('category#'):]] = int(value)
+        elif attr.startswith('day#'):
+            daily[int(attr[len('day#'):])] = int(value)
+
+    return {
+        'month': month,
+        'total_cents': int(counters.get('total', 0)),
+        'expense_count': int(counters.get('expense_count', 0)),
+        'categories': categories,
+        'daily': daily,
+    }
+
+
+def get_monthly_rollup(user_id: int, year: int, month: int) -> Dict[str, Any]:
+    """Get precomputed totals for a month, falling back to the raw expenses"""
+    month_key = f"{year:04d}-{month:02d}"
+    response = rollups_table.get_item(Key={'user_id': user_id, 'month': month_key}, ConsistentRead=True)
+    item = response.get('Item')
+    if item:
+        return parse_rollup(month_key, item)
+
+    # Months written before rollups existed have no item until reconciled
+    expenses = iter_expense_records(user_id, *month_date_range(year, month))
+    return parse_rollup(month_key, build_monthly_rollups(expenses).get(month_key, {}))
@@ -0,0 +1,73 @@
+"""
+Conditional GET support.
+
+Every write to a user's expenses, recurring costs or budget bumps a per-user
+version counter (`bump_data_version` in the storage engine). Read endpoints depend on
+`data_etag`, which derives a weak ETag from that counter and the request. A
+request whose If-None-Match already holds the ETag is answered with 304 Not
+Modified before the endpoint runs its queries.
+
+Endpoints that read cached data pass the same version
+(`Depends(current_data_version)`, read once per request) to the storage
+engine, so the body is never older than the ETag it is served under.
+"""
+
+import hashlib
+
+from fastapi import Depends, Request, Response
+
+from .async_database import get_data_version
+from .middleware import get_current_user
+
+# Clients must revalidate before reusing a response; it is never shared
+CACHE_CONTROL = 'private, no-cache'
+
+
+class NotModified(Exception):
+    """Raised to answer a conditional GET with 304 (see the handler in api.index)"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def make_etag(request: Request, user_id: int, version: int) -> str:
+    """Weak ETag for a user's view of this URL at a data version"""
+    # The representation also depends on the URL and the negotiated format
+    scope = f"{user_id}|{request.url.path}|{request.url.query}|{request.headers.get('accept', '')}"
+    digest = hashlib.blake2b(scope.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    candidates = {tag.strip() for tag in if_none_match.split(',')}
+    return '*' in candidates or etag in candidates or etag[2:] in candidates
+
+
+def cache_headers(etag: str) -> dict:
+    return {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+
+
+async def current_data_version(current_user: dict = Depends(get_current_user)) -> int:
+    """Dependency: the user's data version, read once per request"""
+    return await get_data_version(current_user['user_id'])
+
+
+async def data_etag(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    version: int = Depends(current_data_version)
+) -> str:
+    """Dependency: compute the ETag, short-circuiting with 304 when the client has it.
+
+    The version is read before the endpoint's own queries, and those queries
+    are strongly consistent, so a write racing with the request can only
+    make the ETag older than the body, never newer.
+    Endpoints that build their own Response must add cache_headers(etag).
+    """
+    etag = make_etag(request, current_user['user_id'], version)
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        raise NotModified(etag)
+    response.headers.update(cache_headers(etag))
+    return etag
@@ -1,57 +1,306 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
-from datetime import datetime
-from .models import ExpenseCreate, ExpenseUpdate, Expense
+import asyncio
+import csv
+import io
+import logging
+import orjson
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from typing import List, Optional, AsyncIterator, Dict, Any, Tuple, Union
+from .models import (
+    ExpenseCreate,
+    ExpenseUpdate,
+    Expense,
+    ExpensePage,
+    ExpenseBulkEdit,
+    ExpenseBulkEditResult,
+    BulkImportResult,
+    project,
+    dump_many
+)
 from .database import (
-    get_expenses_by_user,
+    InvalidCursorError,
+    ItemNotFoundError,
+    WriteConflictError,
+    BATCH_WRITE_SIZE,
+    BULK_EDIT_MAX_EXPENSES,
+    normalize_date_key,
+    generate_id,
+    get_current_timestamp
+)
+from .async_database import (
+    iter_expense_pages,
+    get_expense_page,
+    get_expenses_by_date_range,
+    get_recent_expenses,
     get_expense,
     create_expense,
+    batch_create_expenses,
     update_expense,
     delete_expense,
-    generate_id,
-    get_current_timestamp
+    bulk_edit_expenses
 )
+from .imports import iter_import_rows
 from .middleware import get_current_user
+from .etags import data_etag, cache_headers
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+# Items fetched per DynamoDB page when streaming a user's full history
+STREAM_PAGE_SIZE = 200
+
+# Batch writes kept in flight at once during a bulk import
+BULK_IMPORT_CONCURRENCY = 4
+
+
+async def _stream_json_array(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Serialize pages of expenses as one JSON array, a page at a time"""
+    yield b'['
+    first = True
+    async for page in pages:
+        if not page:
+            continue
+        # Drop the page array's own brackets
+        chunk = dump_many(Expense, page)[1:-1]
+        yield chunk if first else b',' + chunk
+        first = False
+    yield b']'
+
+
+async def _stream_ndjson(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Serialize pages of expenses as newline-delimited JSON"""
+    async for page in pages:
+        yield b''.join(orjson.dumps(project(Expense, item)) + b'\n' for item in page)
+
+
+EXPORT_CSV_COLUMNS = ['id', 'date', 'amount', 'category', 'description', 'created_at']
+
+
+async def _stream_csv(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    """Serialize pages of expenses as CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    async for page in pages:
+        writer.writerows(page)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
 @router.get("/range", response_model=List[Expense])
 async def get_expenses_by_range(
     start_date: str = Query(..., description="Start date in ISO format"),
     end_date: str = Query(..., description="End date in ISO format"),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag)
 ):
     """Get expenses within a date range for the authenticated user"""
     user_id = current_user['user_id']
-    all_expenses = get_expenses_by_user(user_id)
 
-    # Filter expenses by date range
-    filtered_expenses = []
-    for expense in all_expenses:
-        expense_date = datetime.fromisoformat(expense['date'].replace('Z', '+00:00'))
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+    try:
+        expenses = await get_expenses_by_date_range(user_id, start_date, end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+    # Encoded directly; response_model only documents the shape
+    return Response(content=dump_many(Expense, expenses), media_type='application/json', headers=cache_headers(etag))
+
+
+@router.get("/recent", response_model=List[Expense])
+async def get_recent(
+    n: int = Query(20, ge=1, le=100, description="Number of expenses"),
+    by: str = Query('date', pattern='^(date|created)$', description="Order by expense date or creation time"),
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag)
+):
+    """Get the authenticated user's n most recent expenses, newest first"""
+    expenses = await get_recent_expenses(current_user['user_id'], n, by)
+    return Response(content=dump_many(Expense, expenses), media_type='application/json', headers=cache_headers(etag))
+
+
+@router.get("/", response_model=Union[List[Expense], ExpensePage])
+async def get_all_expenses(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="Continuation token from a previous page"),
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag)
+):
+    """Get expenses for the authenticated user, newest first.
+
+    With `limit` or `cursor`, returns one page as `{items, next_cursor}`.
+    Otherwise the full history is streamed page by page, as a JSON array or
+    as NDJSON when the client sends `Accept: application/x-ndjson`.
+    """
+    user_id = current_user['user_id']
+
+    if limit is not None or cursor is not None:
+        try:
+            items, next_cursor = await get_expense_page(user_id, limit or STREAM_PAGE_SIZE, cursor)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return ORJSONResponse({
+            'items': [project(Expense, item) for item in items],
+            'next_cursor': next_cursor
+        }, headers=cache_headers(etag))
 
-        if start <= expense_date <= end:
-            filtered_expenses.append(expense)
+    pages = iter_expense_pages(user_id, page_size=STREAM_PAGE_SIZE)
+    if 'application/x-ndjson' in request.headers.get('accept', ''):
+        return StreamingResponse(_stream_ndjson(pages), media_type='application/x-ndjson', headers=cache_headers(etag))
+    return StreamingResponse(_stream_json_array(pages), media_type='application/json', headers=cache_headers(etag))
 
-    return filtered_expenses
 
+@router.get("/export")
+async def export_expenses(
+    export_format: str = Query('csv', alias='format', pattern='^(csv|ndjson)$'),
+    start: Optional[str] = Query(None, description="Start date in ISO format"),
+    end: Optional[str] = Query(None, description="End date in ISO format"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Export the authenticated user's expenses as CSV or NDJSON, newest first.
 
-@router.get("/", response_model=List[Expense])
-async def get_all_expenses(current_user: dict = Depends(get_current_user)):
-    """Get all expenses for the authenticated user"""
+    Rows are streamed one DynamoDB page at a time, so memory use is constant
+    and the first bytes go out before the query has finished.
+    """
     user_id = current_user['user_id']
-    expenses = get_expenses_by_user(user_id)
-    return expenses
+
+    # Validate up front; the query itself only runs once streaming starts
+    try:
+        for value in (start, end):
+            if value is not None:
+                normalize_date_key(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+
+    pages = iter_expense_pages(user_id, start, end, page_size=STREAM_PAGE_SIZE)
+    if export_format == 'ndjson':
+        body, media_type = _stream_ndjson(pages), 'application/x-ndjson'
+    else:
+        body, media_type = _stream_csv(pages), 'text/csv'
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="expenses.{export_format}"'}
+    )
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_expenses(request: Request, current_user: dict = Depends(get_current_user)):
+    """Import expenses from CSV, NDJSON or a JSON array.
+
+    Rows are validated as the body streams in and written in batches of 25;
+    the response reports the outcome of every row.
+    """
+    user_id = current_user['user_id']
+    results = []
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    in_flight: List[List[Tuple[int, Dict[str, Any]]]] = []
+
+    async def write_batch(batch: List[Tuple[int, Dict[str, Any]]]) -> Union[List[int], str]:
+        # IDs the rows were saved under, or why the batch was not written.
+        # Earlier batches are already committed, so one failed batch must not
+        # abort the import and lose the report.
+        try:
+            return await batch_create_expenses([expense for _, expense in batch])
+        except WriteConflictError:
+            return 'Write failed after retries'
+        except ClientError as exc:
+            logger.warning(f"Bulk import batch failed for user {user_id}: {exc}")
+            return f"Write failed: {exc.response['Error']['Code']}"
+
+    async def write_batches():
+        saved = await asyncio.gather(*(write_batch(batch) for batch in in_flight))
+        for batch, expense_ids in zip(in_flight, saved):
+            for index, (row_number, _) in enumerate(batch):
+                if isinstance(expense_ids, str):
+                    results.append({'row': row_number, 'status': 'error', 'error': expense_ids})
+                else:
+                    results.append({'row': row_number, 'status': 'created', 'id': expense_ids[index]})
+        in_flight.clear()
+
+    async for row_number, row in iter_import_rows(request):
+        if isinstance(row, str):
+            results.append({'row': row_number, 'status': 'error', 'error': row})
+            continue
+        try:
+            expense_data = ExpenseCreate.model_validate(row)
+        except ValidationError as exc:
+            results.append({'row': row_number, 'status': 'error', 'error': _format_validation_error(exc)})
+            continue
+
+        chunk.append((row_number, {
+            'id': generate_id(),
+            'user_id': user_id,
+            'amount': expense_data.amount,
+            'category': expense_data.category,
+            'description': expense_data.description or '',
+            'date': expense_data.date,
+            'created_at': get_current_timestamp()
+        }))
+        if len(chunk) == BATCH_WRITE_SIZE:
+            in_flight.append(chunk)
+            chunk = []
+            if len(in_flight) == BULK_IMPORT_CONCURRENCY:
+                await write_batches()
+
+    if chunk:
+        in_flight.append(chunk)
+    await write_batches()
+
+    results.sort(key=lambda result: result['row'])
+    created = sum(1 for result in results if result['status'] == 'created')
+    return {'created': created, 'failed': len(results) - created, 'results': results}
+
+
+@router.post("/bulk-edit", response_model=ExpenseBulkEditResult)
+async def bulk_edit(edit: ExpenseBulkEdit, current_user: dict = Depends(get_current_user)):
+    """Update and delete several expenses in one all-or-nothing transaction"""
+    user_id = current_user['user_id']
+
+    updates = {item.id: item.model_dump(exclude={'id'}, exclude_none=True) for item in edit.updates}
+    expense_ids = [item.id for item in edit.updates] + edit.deletes
+    if not expense_ids:
+        raise HTTPException(status_code=400, detail="No changes provided")
+    if len(expense_ids) > BULK_EDIT_MAX_EXPENSES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_EDIT_MAX_EXPENSES} expenses per bulk edit")
+    # A transaction can only touch each item once
+    if len(set(expense_ids)) != len(expense_ids):
+        raise HTTPException(status_code=400, detail="Each expense may appear only once")
+    if not all(updates.values()):
+        raise HTTPException(status_code=400, detail="No updates provided")
+
+    try:
+        updated = await bulk_edit_expenses(user_id, updates, edit.deletes)
+    except ItemNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    except WriteConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    return {'updated': updated, 'deleted': edit.deletes}
 
 
 @router.get("/{expense_id}", response_model=Expense)
-async def get_expense_by_id(expense_id: int, current_user: dict = Depends(get_current_user)):
+async def get_expense_by_id(
+    expense_id: int,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag)
+):
     """Get a specific expense"""
     user_id = current_user['user_id']
-    expense = get_expense(user_id, expense_id)
+    expense = await get_expense(user_id, expense_id)
 
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
@@ -74,7 +323,7 @@ async def create_new_expense(expense_data: ExpenseCreate, current_user: dict = D
         'created_at': get_current_timestamp()
     }
 
-    return create_expense(expense)
+    return await create_expense(expense)
 
 
 @router.put("/{expense_id}", response_model=Expense)
@@ -86,11 +335,6 @@ async def update_expense_by_id(
     """Update an expense"""
     user_id = current_user['user_id']
 
-    # Check if expense exists
-    existing_expense = get_expense(user_id, expense_id)
-    if not existing_expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-
     # Build updates dict
     updates = {}
     if expense_data.amount is not None:
@@ -105,7 +349,10 @@ async def update_expense_by_id(
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    return update_expense(user_id, expense_id, updates)
+    try:
+        return await update_expense(user_id, expense_id, updates)
+    except ItemNotFoundError:
+        raise HTTPException(status_code=404, detail="Expense not found")
 
 
 @router.delete("/{expense_id}")
@@ -113,11 +360,9 @@ async def delete_expense_by_id(expense_id: int, current_user: dict = Depends(get
     """Delete an expense"""
     user_id = current_user['user_id']
 
-    # Check if expense exists
-    existing_expense = get_expense(user_id, expense_id)
-    if not existing_expense:
+    try:
+        await delete_expense(user_id, expense_id)
+    except ItemNotFoundError:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    delete_expense(user_id, expense_id)
-
     return {"message": "Expense deleted successfully"}
@@ -0,0 +1,98 @@
+"""
+Streaming parsers for bulk expense imports.
+
+Request bodies are read incrementally and yielded as (row_number, row) pairs,
+so large bank exports never have to be held in memory as a whole. Supported
+formats, chosen by Content-Type:
+
+- text/csv: header row with amount, category, date and optional description
+- application/x-ndjson: one JSON object per line
+- application/json: a JSON array of objects (parsed in one piece)
+"""
+
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, Tuple, Union
+
+from fastapi import HTTPException, Request
+
+# A parsed row, or the error message for a row that could not be parsed
+ImportRow = Union[Dict[str, Any], str]
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    """Yield complete text lines from the request body as it arrives"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffer += decoder.decode(b'', final=True)
+    if buffer.strip():
+        yield buffer.rstrip('\r')
+
+
+async def _iter_csv(request: Request) -> AsyncIterator[Tuple[int, ImportRow]]:
+    header = None
+    record = ''
+    row_number = 0
+    async for line in _iter_lines(request):
+        # Quoted fields may span lines; wait until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        fields = next(csv.reader([record]))
+        record = ''
+
+        if header is None:
+            header = [field.strip().lower() for field in fields]
+            continue
+        if not any(field.strip() for field in fields):
+            continue
+
+        row_number += 1
+        if len(fields) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(fields)}"
+            continue
+        yield row_number, dict(zip(header, fields))
+
+    if record:
+        yield row_number + 1, "Unterminated quoted field"
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Tuple[int, ImportRow]]:
+    row_number = 0
+    async for line in _iter_lines(request):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except ValueError:
+            yield row_number, "Invalid JSON"
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[Tuple[int, ImportRow]]:
+    try:
+        rows = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of expenses")
+    for row_number, row in enumerate(rows, start=1):
+        yield row_number, row
+
+
+def iter_import_rows(request: Request) -> AsyncIterator[Tuple[int, ImportRow]]:
+    """Pick a row parser for the request's Content-Type"""
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return _iter_csv(request)
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        return _iter_ndjson(request)
+    if content_type == 'application/json':
+        return _iter_json_array(request)
+    raise HTTPException(status_code=415, detail="Unsupported import format; use CSV, NDJSON or a JSON array")
@@ -1,21 +1,32 @@
+from . import coldstart  # noqa: F401 - must run before FastAPI is imported
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import hmac
 import logging
+import os
 import time
 
 from .auth import router as auth_router
 from .expenses import router as expenses_router
 from .recurring import router as recurring_router
 from .budget import router as budget_router
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from .dashboard import router as dashboard_router
+from .sync import router as sync_router
+from .etags import NotModified, cache_headers
+from . import database, observability, passwords
+from .database import WriteConflictError
+
+# Configure logging (queued, written by a background thread)
+observability.configure_logging()
 logger = logging.getLogger(__name__)
 
+# Count and time every DynamoDB call, on each thread's client
+database.dynamodb.add_client_hook(observability.instrument_dynamodb)
+
+# Bearer token required to read /metrics; the endpoint is disabled without one
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
 app = FastAPI(title="Budgify API", version="1.0.0")
 
 # Add CORS middleware to handle preflight OPTIONS requests
@@ -25,28 +36,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods including OPTIONS
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["ETag", "Server-Timing"],  # Let the frontend read ETags (and debug timings)
 )
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
+# Route templates by endpoint, so metrics are labelled /expenses/{expense_id}, not each ID
+_route_paths = {}
 
-    # Log incoming request
-    logger.info(f"Incoming request: {request.method} {request.url.path}")
-    logger.info(f"Headers: {dict(request.headers)}")
-    logger.info(f"Query params: {dict(request.query_params)}")
 
-    # Process request
-    response = await call_next(request)
+def _route_label(request: Request) -> str:
+    endpoint = request.scope.get('endpoint')
+    if endpoint is None:
+        return 'unmatched'
+    if not _route_paths:
+        _route_paths.update({route.endpoint: route.path for route in app.routes if hasattr(route, 'endpoint')})
+    return _route_paths.get(endpoint, 'unmatched')
 
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(f"Response status: {response.status_code}")
-    logger.info(f"Process time: {process_time:.3f}s")
 
-    return response
+# Request metrics, DynamoDB cost attribution and access logging
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    start_time = time.perf_counter()
+    status = 500
+    cost = observability.start_request_cost()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if observability.DEBUG_TIMING:
+            response.headers['Server-Timing'] = cost.server_timing(time.perf_counter() - start_time)
+            response.headers['Timing-Allow-Origin'] = '*'
+        return response
+    finally:
+        # Time to the response start; streamed bodies are still being sent
+        duration = time.perf_counter() - start_time
+        route = _route_label(request)
+        cost.finish(route)
+        observability.metrics.observe_request(request.method, route, status, duration)
+        observability.log_request(
+            request.method, request.url.path, route, status, duration, request.headers.items(), cost
+        )
 
 
 # Exception handler to convert 'detail' to 'error' for frontend compatibility
@@ -55,10 +83,23 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error(f"HTTPException: {exc.status_code} - {exc.detail}")
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail}
+        content={"error": exc.detail},
+        headers=exc.headers
     )
 
 
+# Conditional GET matched the client's cached copy
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=cache_headers(exc.etag))
+
+
+# A write kept losing to concurrent writes of the same user's data
+@app.exception_handler(WriteConflictError)
+async def write_conflict_handler(request: Request, exc: WriteConflictError):
+    return JSONResponse(status_code=409, content={"error": str(exc)})
+
+
 # Catch-all exception handler
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
@@ -78,6 +119,13 @@ async def startup_event():
     logger.info("=" * 50)
 
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    passwords.shutdown()
+    observability.shutdown_logging()
+
+
 # Include routers
 logger.info("Registering routers...")
 app.include_router(auth_router)
@@ -88,6 +136,10 @@ app.include_router(recurring_router)
 logger.info(f"Recurring router registered: {recurring_router.prefix}")
 app.include_router(budget_router)
 logger.info(f"Budget router registered: {budget_router.prefix}")
+app.include_router(dashboard_router)
+logger.info(f"Dashboard router registered: {dashboard_router.prefix}")
+app.include_router(sync_router)
+logger.info(f"Sync router registered: {sync_router.prefix}")
 logger.info("All routers registered successfully")
 
 
@@ -103,7 +155,9 @@ async def root():
             "auth": "/auth",
             "expenses": "/expenses",
             "recurring": "/recurring",
-            "budget": "/budget"
+            "budget": "/budget",
+            "dashboard": "/dashboard",
+            "sync": "/sync"
         }
     }
 
@@ -111,5 +165,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    logger.info("Health check endpoint accessed")
     return {"status": "ok", "message": "Budgify API is running"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Request, DynamoDB and cache metrics in the Prometheus text format"""
+    # Per-route traffic and capacity is not public: no token, no endpoint
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get('authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(observability.render_metrics(), media_type='text/plain; version=0.0.4')
@@ -1,9 +1,16 @@
 import os
 import jwt
+import time
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict
+from typing import Dict, Tuple
+
+from . import async_database
 
 security = HTTPBearer()
 
@@ -11,31 +18,155 @@ JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key-change-this')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 7
 
+# Verified-token cache: token digest -> (payload, exp), least recently used first
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+_token_cache: OrderedDict[str, Tuple[Dict, float]] = OrderedDict()
+# Revocations are stored (per token for logout, per user as tokens_valid_after
+# for password changes) and re-read at most this often, so a revocation on one
+# worker reaches the others within it
+TOKEN_REVOCATION_CHECK_SECONDS = int(os.getenv('TOKEN_REVOCATION_CHECK_SECONDS', '60'))
+# user_id -> (tokens_valid_after, time to re-read it), least recently used first
+_valid_after_cache: OrderedDict[int, Tuple[float, float]] = OrderedDict()
+# jti -> (revoked, time to re-read it), least recently used first
+_revoked_jti_cache: OrderedDict[str, Tuple[bool, float]] = OrderedDict()
+_token_cache_stats = {'hits': 0, 'misses': 0}
+_token_cache_lock = threading.Lock()
+
 
 def generate_token(user_id: int, email: str) -> str:
     """Generate a JWT token"""
     payload = {
         'user_id': user_id,
         'email': email,
-        'exp': datetime.utcnow() + timedelta(days=JWT_EXPIRATION_DAYS)
+        'iat': time.time(),
+        'exp': datetime.utcnow() + timedelta(days=JWT_EXPIRATION_DAYS),
+        # Identifies this token in the logout denylist
+        'jti': uuid.uuid4().hex
     }
     token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return token
 
 
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def decode_token(token: str) -> Dict:
-    """Decode and verify a JWT token"""
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail='Token has expired')
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail='Invalid token')
+    """Decode and verify a JWT token, reusing cached verifications until expiry.
+
+    Revocation is not checked here; see check_not_revoked.
+    """
+    digest = _token_digest(token)
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(digest)
+        if cached and cached[1] > now:
+            _token_cache.move_to_end(digest)
+            _token_cache_stats['hits'] += 1
+            payload = cached[0]
+        else:
+            _token_cache.pop(digest, None)
+            _token_cache_stats['misses'] += 1
+            payload = None
+
+    if payload is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail='Token has expired')
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail='Invalid token')
+
+        with _token_cache_lock:
+            _token_cache[digest] = (payload, payload['exp'])
+            while len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+
+    return payload
+
+
+def _remember_valid_after(user_id: int, valid_after: float) -> None:
+    with _token_cache_lock:
+        _valid_after_cache[user_id] = (valid_after, time.time() + TOKEN_REVOCATION_CHECK_SECONDS)
+        _valid_after_cache.move_to_end(user_id)
+        while len(_valid_after_cache) > TOKEN_CACHE_SIZE:
+            _valid_after_cache.popitem(last=False)
+
+
+def _remember_jti(jti: str, revoked: bool, until: float) -> None:
+    with _token_cache_lock:
+        _revoked_jti_cache[jti] = (revoked, until)
+        _revoked_jti_cache.move_to_end(jti)
+        while len(_revoked_jti_cache) > TOKEN_CACHE_SIZE:
+            _revoked_jti_cache.popitem(last=False)
+
+
+async def check_not_revoked(payload: Dict) -> None:
+    """Reject a verified token that was logged out, or issued before its user's
+    tokens were revoked"""
+    jti = payload.get('jti')
+    if jti:
+        with _token_cache_lock:
+            cached = _revoked_jti_cache.get(jti)
+        if cached and cached[1] > time.time():
+            revoked = cached[0]
+        else:
+            revoked = await async_database.is_token_revoked(jti)
+            _remember_jti(jti, revoked, time.time() + TOKEN_REVOCATION_CHECK_SECONDS)
+        if revoked:
+            raise HTTPException(status_code=401, detail='Token has been revoked')
+
+    user_id = payload['user_id']
+    with _token_cache_lock:
+        cached = _valid_after_cache.get(user_id)
+    if cached and cached[1] > time.time():
+        valid_after = cached[0]
+    else:
+        valid_after = await async_database.get_tokens_valid_after(user_id)
+        _remember_valid_after(user_id, valid_after)
+
+    if payload.get('iat', 0) < valid_after:
+        raise HTTPException(status_code=401, detail='Token has been revoked')
+
+
+async def revoke_token(payload: Dict) -> None:
+    """Reject one verified token from now on (on logout); the user's other
+    sessions stay signed in.
+
+    Takes effect at once on this worker and within
+    TOKEN_REVOCATION_CHECK_SECONDS on the others. Tokens issued without a
+    jti cannot be told apart, so for those every token of the user is revoked.
+    """
+    jti = payload.get('jti')
+    if not jti:
+        await revoke_user_tokens(payload['user_id'])
+        return
+    await async_database.revoke_token(jti, payload['exp'])
+    # A revocation is permanent, so this worker need not re-read it
+    _remember_jti(jti, True, payload['exp'])
+
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """Reject every token issued to a user so far (on password change).
+
+    Takes effect at once on this worker and within
+    TOKEN_REVOCATION_CHECK_SECONDS on the others.
+    """
+    issued_before = time.time()
+    await async_database.revoke_user_tokens(user_id, issued_before)
+    _remember_valid_after(user_id, issued_before)
+
+
+def token_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and current size of the verified-token cache"""
+    with _token_cache_lock:
+        return {**_token_cache_stats, 'size': len(_token_cache)}
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> Dict:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> Dict:
     """Dependency to get current authenticated user"""
     token = credentials.credentials
     payload = decode_token(token)
+    await check_not_revoked(payload)
     return payload
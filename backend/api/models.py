@@ -1,6 +1,17 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import date
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import Optional, List, Dict, Any, Iterable, Type
+from datetime import date, datetime
+import orjson
+
+
+def validate_iso_date(value: Optional[str]) -> Optional[str]:
+    """Reject dates that cannot be parsed as ISO 8601"""
+    if value is not None:
+        try:
+            datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('date must be an ISO 8601 date or datetime')
+    return value
 
 
 # Auth models
@@ -27,6 +38,8 @@ class ExpenseCreate(BaseModel):
     description: Optional[str] = ""
     date: str  # ISO date string
 
+    _check_date = field_validator('date')(validate_iso_date)
+
 
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = None
@@ -34,6 +47,8 @@ class ExpenseUpdate(BaseModel):
     description: Optional[str] = None
     date: Optional[str] = None
 
+    _check_date = field_validator('date')(validate_iso_date)
+
 
 class Expense(BaseModel):
     id: int
@@ -45,6 +60,38 @@ class Expense(BaseModel):
     created_at: str
 
 
+class ExpensePage(BaseModel):
+    items: List[Expense]
+    next_cursor: Optional[str] = None  # Opaque token for the next page, None on the last page
+
+
+class ExpenseBulkUpdate(ExpenseUpdate):
+    id: int
+
+
+class ExpenseBulkEdit(BaseModel):
+    updates: List[ExpenseBulkUpdate] = []
+    deletes: List[int] = []
+
+
+class ExpenseBulkEditResult(BaseModel):
+    updated: List[Expense]
+    deleted: List[int]
+
+
+class BulkImportRowResult(BaseModel):
+    row: int
+    status: str  # 'created' or 'error'
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkImportRowResult]
+
+
 # Recurring cost models
 class RecurringCostCreate(BaseModel):
     name: str
@@ -82,3 +129,39 @@ class BudgetResponse(BaseModel):
     user_id: int
     monthly_budget: float
     updated_at: str
+
+
+# Dashboard models
+class Dashboard(BaseModel):
+    expenses: List[Expense]
+    recurring_costs: List[RecurringCost]
+    summary: Dict[str, Any]
+
+
+# Fast serialization for trusted data-layer output.
+# Items from api.database already have the right types, so list endpoints can
+# skip response_model validation and encode them directly with orjson.
+def project(model: Type[BaseModel], item: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick a model's fields out of a data-layer dict, without validating them"""
+    return {name: item.get(name) for name in model.model_fields}
+
+
+def dump_many(model: Type[BaseModel], items: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode data-layer dicts as a JSON array shaped like List[model]"""
+    fields = tuple(model.model_fields)
+    return orjson.dumps([{name: item.get(name) for name in fields} for item in items])
+
+
+# Sync models
+class SyncChange(BaseModel):
+    entity: str  # 'expense', 'recurring' or 'budget'
+    id: int
+    op: str  # 'upsert' or 'delete' (tombstone, data is None)
+    data: Optional[Dict[str, Any]] = None
+
+
+class SyncResponse(BaseModel):
+    token: str  # Pass as `since` on the next sync
+    reset: bool  # True when changes are a full snapshot that replaces local data
+    has_more: bool  # Sync again right away with the new token
+    changes: List[SyncChange]
@@ -0,0 +1,488 @@
+"""
+Request logging and in-process metrics.
+
+Logging: every record goes through a QueueHandler, and a QueueListener
+thread formats it and writes it to stdout, so the event loop never blocks
+on log I/O. Records are JSON lines by default (LOG_FORMAT=text for the
+classic format). Each request produces at most one access log line; lines
+for successful, fast requests are sampled at LOG_SAMPLE_RATE, while errors
+and requests slower than LOG_SLOW_MS are always written. Headers are only
+logged with LOG_REQUEST_HEADERS=true, and credentials in them are redacted.
+
+Metrics: per-route request latency histograms with p50/p95/p99, request
+counts by status, DynamoDB call counts and latencies (collected through
+botocore event hooks), and the cache counters, all rendered in the
+Prometheus text format by `render_metrics` for the /metrics endpoint.
+
+DynamoDB cost: the hooks also ask every call for ReturnConsumedCapacity and
+charge its duration, read/write capacity units and item count to the
+RequestCost of the request being served (a context variable, so calls
+offloaded to worker threads are attributed too). The totals are counted per
+route and operation, added to the access log line, and with
+DEBUG_TIMING=true returned in a Server-Timing header.
+"""
+
+import bisect
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from .cache import cache_stats
+from .middleware import token_cache_stats
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+# Fraction of successful, fast requests that get an access log line
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+LOG_SLOW_MS = float(os.getenv('LOG_SLOW_MS', '1000'))
+LOG_REQUEST_HEADERS = os.getenv('LOG_REQUEST_HEADERS', 'false').lower() == 'true'
+LOG_REDACT_HEADERS = frozenset(
+    name.strip().lower()
+    for name in os.getenv(
+        'LOG_REDACT_HEADERS',
+        'authorization,proxy-authorization,cookie,set-cookie,x-api-key'
+    ).split(',')
+    if name.strip()
+)
+REDACTED = '[redacted]'
+# Return each request's DynamoDB cost in a Server-Timing header
+DEBUG_TIMING = os.getenv('DEBUG_TIMING', 'false').lower() == 'true'
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Operations whose bare CapacityUnits are read units
+READ_OPERATIONS = frozenset({'GetItem', 'BatchGetItem', 'Query', 'Scan', 'TransactGetItems'})
+# Route label for DynamoDB calls made outside a request
+BACKGROUND_ROUTE = 'background'
+
+access_logger = logging.getLogger('api.access')
+
+
+# Logging
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={'fields': {...}}` adds structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+JsonFormatter.converter = time.gmtime
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Route all logging through a queue drained by a background thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def redact_headers(headers: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    return {
+        name: REDACTED if name.lower() in LOG_REDACT_HEADERS else value
+        for name, value in headers
+    }
+
+
+def log_request(
+    method: str,
+    path: str,
+    route: str,
+    status: int,
+    duration: float,
+    headers: Optional[Iterable[Tuple[str, str]]] = None,
+    cost: Optional['RequestCost'] = None
+) -> None:
+    """Write the access log line for a request, subject to sampling"""
+    duration_ms = duration * 1000
+    always = status >= 500 or duration_ms >= LOG_SLOW_MS
+    if not always and random.random() >= LOG_SAMPLE_RATE:
+        return
+    fields: Dict[str, Any] = {
+        'method': method,
+        'path': path,
+        'route': route,
+        'status': status,
+        'duration_ms': round(duration_ms, 2),
+    }
+    if not always and LOG_SAMPLE_RATE < 1:
+        # Lets log queries scale sampled lines back up
+        fields['sample_rate'] = LOG_SAMPLE_RATE
+    if cost is not None and cost.calls:
+        fields.update(cost.log_fields())
+    if LOG_REQUEST_HEADERS and headers is not None:
+        fields['headers'] = redact_headers(headers)
+    level = logging.ERROR if status >= 500 else logging.INFO
+    access_logger.log(level, f"{method} {path} {status}", extra={'fields': fields})
+
+
+# Metrics
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated quantiles"""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                if i == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe request and DynamoDB metrics for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.request_counts: Dict[Tuple[str, str, int], int] = {}
+        self.dynamodb_latency: Dict[str, LatencyHistogram] = {}
+        self.dynamodb_calls: Dict[Tuple[str, str], int] = {}
+        # (route, operation) -> [calls, seconds, read units, write units, items]
+        self.dynamodb_cost: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            histogram = self.request_latency.get((method, route))
+            if histogram is None:
+                histogram = self.request_latency[(method, route)] = LatencyHistogram()
+            histogram.observe(seconds)
+            key = (method, route, status)
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def observe_dynamodb(self, operation: str, outcome: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.dynamodb_latency.get(operation)
+            if histogram is None:
+                histogram = self.dynamodb_latency[operation] = LatencyHistogram()
+            histogram.observe(seconds)
+            key = (operation, outcome)
+            self.dynamodb_calls[key] = self.dynamodb_calls.get(key, 0) + 1
+
+    def observe_dynamodb_cost(self, route: str, usage: Dict[str, List[float]]) -> None:
+        """Add per-operation usage ([calls, seconds, rcu, wcu, items]) to a route"""
+        with self._lock:
+            for operation, values in usage.items():
+                totals = self.dynamodb_cost.get((route, operation))
+                if totals is None:
+                    totals = self.dynamodb_cost[(route, operation)] = [0, 0.0, 0.0, 0.0, 0]
+                for i, value in enumerate(values):
+                    totals[i] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the current values, taken under the lock"""
+        with self._lock:
+            return {
+                'request_latency': {key: _copy(h) for key, h in self.request_latency.items()},
+                'request_counts': dict(self.request_counts),
+                'dynamodb_latency': {key: _copy(h) for key, h in self.dynamodb_latency.items()},
+                'dynamodb_calls': dict(self.dynamodb_calls),
+                'dynamodb_cost': {key: list(values) for key, values in self.dynamodb_cost.items()},
+            }
+
+
+def _copy(histogram: LatencyHistogram) -> LatencyHistogram:
+    clone = LatencyHistogram()
+    clone.counts = list(histogram.counts)
+    clone.count = histogram.count
+    clone.total = histogram.total
+    return clone
+
+
+metrics = MetricsRegistry()
+
+
+# Per-request DynamoDB cost
+class RequestCost:
+    """DynamoDB calls, time, capacity and items used while serving one request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.route: Optional[str] = None
+        self.calls = 0
+        self.seconds = 0.0
+        self.read_units = 0.0
+        self.write_units = 0.0
+        self.items = 0
+        self.by_operation: Dict[str, List[float]] = {}
+
+    def add(self, operation: str, seconds: float, read_units: float, write_units: float, items: int) -> None:
+        values = [1, seconds, read_units, write_units, items]
+        with self._lock:
+            if self.route is not None:
+                # The request already finished (a streamed body is still
+                # being produced): count the call against its route directly
+                metrics.observe_dynamodb_cost(self.route, {operation: values})
+                return
+            self.calls += 1
+            self.seconds += seconds
+            self.read_units += read_units
+            self.write_units += write_units
+            self.items += items
+            totals = self.by_operation.setdefault(operation, [0, 0.0, 0.0, 0.0, 0])
+            for i, value in enumerate(values):
+                totals[i] += value
+
+    def finish(self, route: str) -> None:
+        """Charge the usage so far to a route in the metrics registry"""
+        with self._lock:
+            self.route = route
+            usage = self.by_operation
+        if usage:
+            metrics.observe_dynamodb_cost(route, usage)
+
+    def log_fields(self) -> Dict[str, Any]:
+        return {
+            'db_calls': self.calls,
+            'db_ms': round(self.seconds * 1000, 2),
+            'db_rcu': round(self.read_units, 2),
+            'db_wcu': round(self.write_units, 2),
+            'db_items': self.items,
+        }
+
+    def server_timing(self, duration: float) -> str:
+        """Server-Timing header value: DynamoDB time and cost, and the total"""
+        desc = (
+            f"{self.calls} calls, {self.read_units:g} RCU, "
+            f"{self.write_units:g} WCU, {self.items} items"
+        )
+        return f'db;dur={self.seconds * 1000:.2f};desc="{desc}", total;dur={duration * 1000:.2f}'
+
+
+_request_cost: ContextVar[Optional[RequestCost]] = ContextVar('request_cost', default=None)
+
+
+def start_request_cost() -> RequestCost:
+    """Start attributing DynamoDB calls in the current context to a new request"""
+    cost = RequestCost()
+    _request_cost.set(cost)
+    return cost
+
+
+def _consumed_units(operation: str, consumed: Any) -> Tuple[float, float]:
+    """(read units, write units) from a ConsumedCapacity entry or list of them"""
+    entries = consumed if isinstance(consumed, list) else [consumed] if consumed else []
+    read_units = write_units = 0.0
+    for entry in entries:
+        if 'ReadCapacityUnits' in entry or 'WriteCapacityUnits' in entry:
+            read_units += entry.get('ReadCapacityUnits', 0)
+            write_units += entry.get('WriteCapacityUnits', 0)
+        elif operation in READ_OPERATIONS:
+            read_units += entry.get('CapacityUnits', 0)
+        else:
+            write_units += entry.get('CapacityUnits', 0)
+    return read_units, write_units
+
+
+def _items_read(parsed: Dict[str, Any]) -> int:
+    if 'Count' in parsed:
+        return parsed['Count']
+    if 'Item' in parsed:
+        return 1
+    responses = parsed.get('Responses')
+    if isinstance(responses, dict):  # BatchGetItem
+        return sum(len(items) for items in responses.values())
+    if isinstance(responses, list):  # TransactGetItems
+        return sum(1 for response in responses if response.get('Item'))
+    return 0
+
+
+def _items_written(operation: str, params: Dict[str, Any]) -> int:
+    if operation == 'BatchWriteItem':
+        return sum(len(requests) for requests in params.get('RequestItems', {}).values())
+    if operation == 'TransactWriteItems':
+        return len(params.get('TransactItems', []))
+    if operation in ('PutItem', 'UpdateItem', 'DeleteItem'):
+        return 1
+    return 0
+
+
+# DynamoDB instrumentation
+def _request_capacity(params: Dict[str, Any], model: Any, context: Dict[str, Any], **kwargs: Any) -> None:
+    if 'ReturnConsumedCapacity' in model.input_shape.members:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    context['observability_items_written'] = _items_written(model.name, params)
+
+
+def _before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+    context['observability_start'] = time.perf_counter()
+
+
+def _after_call(model: Any, parsed: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+    start = context.get('observability_start')
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    outcome = parsed.get('Error', {}).get('Code', 'ok') if isinstance(parsed, dict) else 'ok'
+    metrics.observe_dynamodb(model.name, outcome, seconds)
+    if outcome != 'ok':
+        return
+
+    read_units, write_units = _consumed_units(model.name, parsed.get('ConsumedCapacity'))
+    if model.name in READ_OPERATIONS:
+        items = _items_read(parsed)
+    else:
+        items = context.get('observability_items_written', 0)
+    cost = _request_cost.get()
+    if cost is None:
+        metrics.observe_dynamodb_cost(BACKGROUND_ROUTE, {model.name: [1, seconds, read_units, write_units, items]})
+    else:
+        cost.add(model.name, seconds, read_units, write_units, items)
+
+
+def _after_call_error(event_name: str, context: Dict[str, Any], exception: Exception, **kwargs: Any) -> None:
+    # Connection failures and timeouts never reach after-call. This event
+    # carries no operation model, so the operation comes from its name
+    # (after-call-error.dynamodb.<Operation>)
+    start = context.get('observability_start')
+    if start is not None:
+        operation = event_name.rsplit('.', 1)[-1]
+        metrics.observe_dynamodb(operation, type(exception).__name__, time.perf_counter() - start)
+
+
+def instrument_dynamodb(client: Any) -> None:
+    """Count, time and cost every call a botocore DynamoDB client makes"""
+    events = client.meta.events
+    events.register('provide-client-params.dynamodb', _request_capacity, unique_id='observability-capacity')
+    events.register('before-call.dynamodb', _before_call, unique_id='observability-before-call')
+    events.register('after-call.dynamodb', _after_call, unique_id='observability-after-call')
+    events.register('after-call-error.dynamodb', _after_call_error, unique_id='observability-after-call-error')
+
+
+# Prometheus text exposition
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: Any) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _summary(lines: List[str], name: str, help_text: str, series: Dict[Any, LatencyHistogram], label_names: Tuple[str, ...]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} summary")
+    for key, histogram in sorted(series.items()):
+        labels = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+        for q in QUANTILES:
+            lines.append(f"{name}{_labels(**labels, quantile=q)} {histogram.quantile(q):.6f}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.total:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def _counter(lines: List[str], name: str, help_text: str, series: Dict[Any, int], label_names: Tuple[str, ...]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(series.items()):
+        labels = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+        lines.append(f"{name}{_labels(**labels)} {value}")
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    snapshot = metrics.snapshot()
+    lines: List[str] = []
+    _summary(lines, 'budgify_http_request_duration_seconds', 'Request latency by route',
+             snapshot['request_latency'], ('method', 'route'))
+    _counter(lines, 'budgify_http_requests_total', 'Requests by route and status',
+             snapshot['request_counts'], ('method', 'route', 'status'))
+    _summary(lines, 'budgify_dynamodb_call_duration_seconds', 'DynamoDB call latency by operation',
+             snapshot['dynamodb_latency'], ('operation',))
+    _counter(lines, 'budgify_dynamodb_calls_total', 'DynamoDB calls by operation and outcome',
+             snapshot['dynamodb_calls'], ('operation', 'outcome'))
+
+    cost = snapshot['dynamodb_cost']
+    labels = ('route', 'operation')
+    _counter(lines, 'budgify_dynamodb_route_calls_total', 'Successful DynamoDB calls by route and operation',
+             {key: values[0] for key, values in cost.items()}, labels)
+    _counter(lines, 'budgify_dynamodb_route_seconds_total', 'DynamoDB time by route and operation',
+             {key: round(values[1], 6) for key, values in cost.items()}, labels)
+    _counter(lines, 'budgify_dynamodb_consumed_read_units_total', 'Consumed read capacity units by route and operation',
+             {key: values[2] for key, values in cost.items()}, labels)
+    _counter(lines, 'budgify_dynamodb_consumed_write_units_total', 'Consumed write capacity units by route and operation',
+             {key: values[3] for key, values in cost.items()}, labels)
+    _counter(lines, 'budgify_dynamodb_items_total', 'Items read or written by route and operation',
+             {key: values[4] for key, values in cost.items()}, labels)
+
+    caches = cache_stats()
+    _counter(lines, 'budgify_cache_hits_total', 'Read-through cache hits',
+             {name: counts['hits'] for name, counts in caches.items()}, ('cache',))
+    _counter(lines, 'budgify_cache_misses_total', 'Read-through cache misses',
+             {name: counts['misses'] for name, counts in caches.items()}, ('cache',))
+
+    tokens = token_cache_stats()
+    lines.append('# HELP budgify_token_cache_hits_total Verified-token cache hits')
+    lines.append('# TYPE budgify_token_cache_hits_total counter')
+    lines.append(f"budgify_token_cache_hits_total {tokens['hits']}")
+    lines.append('# HELP budgify_token_cache_misses_total Verified-token cache misses')
+    lines.append('# TYPE budgify_token_cache_misses_total counter')
+    lines.append(f"budgify_token_cache_misses_total {tokens['misses']}")
+    lines.append('# HELP budgify_token_cache_size Tokens in the verified-token cache')
+    lines.append('# TYPE budgify_token_cache_size gauge')
+    lines.append(f"budgify_token_cache_size {tokens['size']}")
+    return '\n'.join(lines) + '\n'
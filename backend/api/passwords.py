@@ -0,0 +1,113 @@
+"""
+Password hashing off the event loop.
+
+bcrypt costs hundreds of milliseconds of CPU per call, so hashing and
+verification run on a dedicated worker pool instead of inside the async
+handlers. Admission is bounded: once PASSWORD_HASH_QUEUE_SIZE operations are
+running or waiting, new ones are rejected with 503 and a Retry-After header
+rather than queueing behind a login burst.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Worker pool size and kind ('process', or 'thread' where multiprocessing is unavailable)
+PASSWORD_HASH_WORKERS = max(1, int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1))))
+PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'process')
+# Max hash/verify operations running or waiting before new ones get a 503
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '64'))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', '1'))
+# bcrypt cost factor for new hashes; logins rehash stored hashes with a different cost
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+_executor: Optional[Executor] = None
+_pending = 0
+
+
+def _get_executor() -> Executor:
+    """Create the worker pool on first use"""
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == 'process':
+            try:
+                _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            except (OSError, NotImplementedError) as exc:
+                # e.g. serverless runtimes without /dev/shm
+                logger.warning(f"Process pool unavailable ({exc}), hashing passwords on threads")
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix='password-hash'
+            )
+    return _executor
+
+
+def _hash_cost(hashed: str) -> int:
+    """Read the cost factor from a modular-crypt bcrypt hash ($2b$<cost>$...)"""
+    return int(hashed.split('$')[2])
+
+
+# passlib is imported inside the worker functions: only hashing needs it, and
+# keeping it out of module import shortens cold starts
+
+
+def _hash(password: str, rounds: int) -> str:
+    from passlib.hash import bcrypt
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """Verify a password, rehashing it in the same worker trip if its cost is stale"""
+    from passlib.hash import bcrypt
+    if not bcrypt.verify(password, hashed):
+        return False, None
+    if _hash_cost(hashed) != rounds:
+        return True, _hash(password, rounds)
+    return True, None
+
+
+async def _submit(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a hashing function on the pool, rejecting work once the queue is full"""
+    global _pending
+    if _pending >= PASSWORD_HASH_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, please retry",
+            headers={'Retry-After': str(PASSWORD_HASH_RETRY_AFTER)}
+        )
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password with the configured cost factor"""
+    return await _submit(_hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password against a stored hash.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash used a
+    different cost factor and should be replaced.
+    """
+    return await _submit(_verify, password, hashed, BCRYPT_ROUNDS)
+
+
+def shutdown() -> None:
+    """Stop the worker pool"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,113 @@
+"""
+Compact internal expense record.
+
+Expense items are parsed once, in the data layer, into an ExpenseRecord that
+holds the date as a UTC epoch timestamp and the amount as integer cents.
+Filtering and aggregation (rollups, trends) run on these records, so nothing
+downstream re-parses an ISO date string or does Decimal arithmetic per expense.
+"""
+
+import calendar
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Optional
+
+DATE_KEY_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def parse_timestamp(value: str) -> int:
+    """Parse an ISO date/datetime string to UTC epoch seconds (naive values are UTC)"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return calendar.timegm(parsed.timetuple())
+
+
+def format_date_key(timestamp: int) -> str:
+    """Format epoch seconds as the canonical sortable key (YYYY-MM-DDTHH:MM:SS)"""
+    return time.strftime(DATE_KEY_FORMAT, time.gmtime(timestamp))
+
+
+def to_cents(amount: Any) -> int:
+    """Convert a Decimal, float or int amount to integer cents"""
+    if isinstance(amount, Decimal):
+        return int(amount.scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+    return round(amount * 100)
+
+
+class ExpenseRecord:
+    """One expense with its date and amount in machine-friendly form"""
+
+    __slots__ = ('id', 'user_id', 'timestamp', 'cents', 'category', 'description', 'date', 'created_at')
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        timestamp: int,
+        cents: int,
+        category: str,
+        description: Optional[str] = None,
+        date: Optional[str] = None,
+        created_at: Optional[str] = None
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.timestamp = timestamp
+        self.cents = cents
+        self.category = category
+        self.description = description
+        self.date = date
+        self.created_at = created_at
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'ExpenseRecord':
+        """Build a record from a stored expense item (raw DynamoDB or converted)"""
+        timestamp = item.get('date_ts')
+        if timestamp is None:
+            # Written before date_ts existed
+            timestamp = parse_timestamp(item.get('date_key') or item['date'])
+        return cls(
+            int(item['id']),
+            int(item['user_id']),
+            int(timestamp),
+            int(item['amount_cents']) if 'amount_cents' in item else to_cents(item['amount']),
+            item['category'],
+            item.get('description'),
+            item.get('date'),
+            item.get('created_at')
+        )
+
+    @property
+    def amount(self) -> float:
+        return self.cents / 100
+
+    @property
+    def date_key(self) -> str:
+        return format_date_key(self.timestamp)
+
+    @property
+    def month(self) -> str:
+        """Calendar month as YYYY-MM"""
+        return time.strftime('%Y-%m', time.gmtime(self.timestamp))
+
+    @property
+    def day(self) -> int:
+        """Day of the month"""
+        return time.gmtime(self.timestamp).tm_mday
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The expense as returned by the API"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'amount': self.amount,
+            'category': self.category,
+            'description': self.description,
+            'date': self.date if self.date is not None else self.date_key,
+            'created_at': self.created_at,
+        }
+
+    def __repr__(self) -> str:
+        return f"ExpenseRecord(id={self.id}, date_key={self.date_key!r}, cents={self.cents}, category={self.category!r})"
@@ -1,33 +1,47 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import Response
 from typing import List
-from .models import RecurringCostCreate, RecurringCostUpdate, RecurringCost
-from .database import (
+from .models import RecurringCostCreate, RecurringCostUpdate, RecurringCost, dump_many
+from .database import generate_id, get_current_timestamp, ItemNotFoundError
+from .async_database import (
     get_recurring_costs_by_user,
     get_recurring_cost,
     create_recurring_cost,
     update_recurring_cost,
-    delete_recurring_cost,
-    generate_id,
-    get_current_timestamp
+    delete_recurring_cost
 )
 from .middleware import get_current_user
+from .etags import current_data_version, data_etag, cache_headers
 
 router = APIRouter(prefix="/recurring", tags=["recurring"])
 
 
 @router.get("/", response_model=List[RecurringCost])
-async def get_all_recurring_costs(current_user: dict = Depends(get_current_user)):
+async def get_all_recurring_costs(
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag),
+    version: int = Depends(current_data_version)
+):
     """Get all recurring costs for the authenticated user"""
     user_id = current_user['user_id']
-    recurring_costs = get_recurring_costs_by_user(user_id)
-    return recurring_costs
+    recurring_costs = await get_recurring_costs_by_user(user_id, version)
+    # Encoded directly; response_model only documents the shape
+    return Response(
+        content=dump_many(RecurringCost, recurring_costs),
+        media_type='application/json',
+        headers=cache_headers(etag)
+    )
 
 
 @router.get("/{recurring_id}", response_model=RecurringCost)
-async def get_recurring_cost_by_id(recurring_id: int, current_user: dict = Depends(get_current_user)):
+async def get_recurring_cost_by_id(
+    recurring_id: int,
+    current_user: dict = Depends(get_current_user),
+    etag: str = Depends(data_etag)
+):
     """Get a specific recurring cost"""
     user_id = current_user['user_id']
-    recurring_cost = get_recurring_cost(user_id, recurring_id)
+    recurring_cost = await get_recurring_cost(user_id, recurring_id)
 
     if not recurring_cost:
         raise HTTPException(status_code=404, detail="Recurring cost not found")
@@ -57,7 +71,7 @@ async def create_new_recurring_cost(
         'created_at': get_current_timestamp()
     }
 
-    return create_recurring_cost(recurring)
+    return await create_recurring_cost(recurring)
 
 
 @router.put("/{recurring_id}", response_model=RecurringCost)
@@ -69,11 +83,6 @@ async def update_recurring_cost_by_id(
     """Update a recurring cost"""
     user_id = current_user['user_id']
 
-    # Check if recurring cost exists
-    existing_recurring = get_recurring_cost(user_id, recurring_id)
-    if not existing_recurring:
-        raise HTTPException(status_code=404, detail="Recurring cost not found")
-
     # Build updates dict
     updates = {}
     if recurring_data.name is not None:
@@ -90,7 +99,10 @@ async def update_recurring_cost_by_id(
     if not updates:
         raise HTTPException(status_code=400, detail="No updates provided")
 
-    return update_recurring_cost(user_id, recurring_id, updates)
+    try:
+        return await update_recurring_cost(user_id, recurring_id, updates)
+    except ItemNotFoundError:
+        raise HTTPException(status_code=404, detail="Recurring cost not found")
 
 
 @router.delete("/{recurring_id}")
@@ -98,11 +110,9 @@ async def delete_recurring_cost_by_id(recurring_id: int, current_user: dict = De
     """Delete a recurring cost"""
     user_id = current_user['user_id']
 
-    # Check if recurring cost exists
-    existing_recurring = get_recurring_cost(user_id, recurring_id)
-    if not existing_recurring:
+    try:
+        await delete_recurring_cost(user_id, recurring_id)
+    except ItemNotFoundError:
         raise HTTPException(status_code=404, detail="Recurring cost not found")
 
-    delete_recurring_cost(user_id, recurring_id)
-
     return {"message": "Recurring cost deleted successfully"}
@@ -0,0 +1,632 @@
+"""
+SQLite storage engine (STORAGE_BACKEND=sqlite).
+
+Implements the same operations as the DynamoDB engine in `api.database` on
+a single SQLite file at SQLITE_PATH, for single-node deployments and for
+integration tests without AWS. Rows use the DynamoDB attribute names
+(`amount_cents`, `date_key`, ...), so the item codecs and ExpenseRecord
+work unchanged and both engines return identical dicts.
+
+- The database runs in WAL mode: readers never block the writer, and
+  commits only fsync the log (synchronous=NORMAL).
+- Each thread gets its own connection. Writes run in BEGIN IMMEDIATE
+  transactions that also append the change log entry and bump the user's
+  data version, so a write and its side effects commit together.
+- Expenses are indexed on (user_id, date_key, id) and listed newest first
+  with keyset pagination, which also keeps streamed pages independent of
+  the thread that produced the previous one.
+- There are no rollup items: monthly totals for the summary endpoint are
+  aggregated in SQL from the date index.
+
+Tables are created on first use. Needs SQLite 3.35 or newer (RETURNING and
+row values), checked at import.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .database import (
+    USER_CODEC,
+    EXPENSE_CODEC,
+    RECURRING_CODEC,
+    BUDGET_CODEC,
+    CHANGE_CODECS,
+    CHANGE_LOG_TTL_SECONDS,
+    DuplicateUserError,
+    InvalidCursorError,
+    ItemNotFoundError,
+    change_seq,
+    date_attributes,
+    decode_cursor,
+    encode_cursor,
+    generate_id,
+    month_date_range,
+    normalize_date_key,
+    parse_rollup,
+)
+from .records import ExpenseRecord
+
+# RETURNING (3.35) and row-value comparisons (3.15)
+SQLITE_MIN_VERSION = (3, 35, 0)
+if sqlite3.sqlite_version_info < SQLITE_MIN_VERSION:
+    raise RuntimeError(
+        f"STORAGE_BACKEND=sqlite needs SQLite {'.'.join(map(str, SQLITE_MIN_VERSION))} or newer; "
+        f"Python is linked against {sqlite3.sqlite_version}"
+    )
+
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'budgify.db')
+# Seconds a writer waits for the write lock before failing
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5'))
+# Rows per page when streaming expenses without an explicit page size
+SQLITE_PAGE_SIZE = 1000
+# Expired change log entries are deleted at most this often
+CHANGE_LOG_PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    created_at TEXT,
+    data_version INTEGER NOT NULL DEFAULT 0,
+    tokens_valid_after REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS expenses (
+    user_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT,
+    date TEXT NOT NULL,
+    date_key TEXT NOT NULL,
+    date_ts INTEGER NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (user_id, id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS expenses_user_date ON expenses (user_id, date_key, id);
+
+CREATE TABLE IF NOT EXISTS recurring_costs (
+    user_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    frequency TEXT NOT NULL,
+    start_date TEXT,
+    created_at TEXT,
+    PRIMARY KEY (user_id, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS budget_settings (
+    user_id INTEGER PRIMARY KEY,
+    monthly_budget_cents INTEGER,
+    monthly_limit_cents INTEGER,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    user_id INTEGER NOT NULL,
+    seq TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    data TEXT,
+    expires_at INTEGER NOT NULL,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS changes_expiry ON changes (expires_at);
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Writable columns per table; item keys are checked against these before
+# they are interpolated into SQL
+COLUMNS = {
+    'users': ('id', 'username', 'email', 'password', 'created_at'),
+    'expenses': ('user_id', 'id', 'amount_cents', 'category', 'description', 'date', 'date_key', 'date_ts', 'created_at'),
+    'recurring_costs': ('user_id', 'id', 'name', 'amount_cents', 'category', 'frequency', 'start_date', 'created_at'),
+    'budget_settings': ('user_id', 'monthly_budget_cents', 'monthly_limit_cents', 'updated_at'),
+}
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+_next_prune = 0.0
+
+
+def _connection() -> sqlite3.Connection:
+    """This thread's connection, opened (and the schema created) on first use"""
+    global _schema_ready
+    db = getattr(_local, 'db', None)
+    if db is None:
+        # Autocommit mode: transactions are explicit (see _transaction)
+        db = sqlite3.connect(SQLITE_PATH, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('PRAGMA temp_store=MEMORY')
+        with _schema_lock:
+            if not _schema_ready:
+                db.executescript(SCHEMA)
+                _schema_ready = True
+        _local.db = db
+    return db
+
+
+@contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    """Run a block as one write transaction, taking the write lock up front"""
+    db = _connection()
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield db
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    db.execute('COMMIT')
+
+
+def _item(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    """A row as a stored item; NULL columns are absent, as in DynamoDB"""
+    if row is None:
+        return None
+    return {key: row[key] for key in row.keys() if row[key] is not None}
+
+
+def _checked_columns(table: str, item: Dict[str, Any]) -> List[str]:
+    unknown = set(item) - set(COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(sorted(unknown))}")
+    return list(item)
+
+
+def _insert(db: sqlite3.Connection, table: str, item: Dict[str, Any], replace: bool = False) -> None:
+    columns = _checked_columns(table, item)
+    verb = 'INSERT OR REPLACE' if replace else 'INSERT'
+    db.execute(
+        f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [item[column] for column in columns]
+    )
+
+
+def _insert_new(db: sqlite3.Connection, table: str, record: Dict[str, Any], codec: Any) -> Dict[str, Any]:
+    """Insert a record, giving it a new ID while its ID is taken (two workers
+    drew the same one, see api.ids); returns the item written"""
+    while True:
+        item = codec.encode(record)
+        try:
+            _insert(db, table, item)
+            return item
+        except sqlite3.IntegrityError as exc:
+            if not str(exc).endswith(f"{table}.id"):
+                raise
+            record['id'] = generate_id()
+
+
+def _update(
+    db: sqlite3.Connection,
+    table: str,
+    key: Dict[str, Any],
+    changes: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Update one row by key; returns the new item, or None if there is no such row"""
+    columns = _checked_columns(table, changes)
+    # fetchall: the statement must finish before the transaction can commit
+    rows = db.execute(
+        f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} "
+        f"WHERE {' AND '.join(f'{name} = ?' for name in key)} RETURNING *",
+        [changes[column] for column in columns] + list(key.values())
+    ).fetchall()
+    return _item(rows[0]) if rows else None
+
+
+# User operations
+def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Get a user's login details (id, username, email, password hash) by email"""
+    row = _connection().execute(
+        'SELECT id, username, email, password FROM users WHERE email = ?', (email,)
+    ).fetchone()
+    return USER_CODEC.decode(_item(row)) if row else None
+
+
+def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+    """Get user by ID"""
+    row = _connection().execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    return USER_CODEC.decode(_item(row)) if row else None
+
+
+def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a new user, raising DuplicateUserError if the email or username is taken"""
+    user_data = dict(user_data)
+    with _transaction() as db:
+        for field in ('email', 'username'):
+            if db.execute(f"SELECT 1 FROM users WHERE {field} = ?", (user_data[field],)).fetchone():
+                raise DuplicateUserError(field)
+        _insert_new(db, 'users', user_data, USER_CODEC)
+    return user_data
+
+
+def update_user_password(user_id: int, email: str, password_hash: str) -> None:
+    """Replace a user's password hash"""
+    _connection().execute('UPDATE users SET password = ? WHERE id = ?', (password_hash, user_id))
+
+
+def get_tokens_valid_after(user_id: int) -> float:
+    """Get the time (epoch seconds) before which the user's tokens are revoked; 0 if never"""
+    row = _connection().execute('SELECT tokens_valid_after FROM users WHERE id = ?', (user_id,)).fetchone()
+    return row['tokens_valid_after'] if row else 0.0
+
+
+def revoke_user_tokens(user_id: int, issued_before: float) -> None:
+    """Revoke every token issued to a user before issued_before (epoch seconds)"""
+    _connection().execute('UPDATE users SET tokens_valid_after = ? WHERE id = ?', (issued_before, user_id))
+
+
+def is_token_revoked(jti: str) -> bool:
+    """Whether the token with this ID (the jti claim) has been revoked"""
+    return _connection().execute('SELECT 1 FROM revoked_tokens WHERE jti = ?', (jti,)).fetchone() is not None
+
+
+def revoke_token(jti: str, expires_at: float) -> None:
+    """Revoke one token by its ID, dropping entries for tokens that have expired"""
+    with _transaction() as db:
+        db.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (int(time.time()),))
+        db.execute('INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)', (jti, int(expires_at)))
+
+
+def get_data_version(user_id: int) -> int:
+    """Get the counter that changes whenever any of a user's data changes"""
+    row = _connection().execute('SELECT data_version FROM users WHERE id = ?', (user_id,)).fetchone()
+    return row['data_version'] if row else 0
+
+
+def bump_data_version(user_id: int) -> None:
+    """Mark a user's data as changed, invalidating their ETags"""
+    with _transaction() as db:
+        _bump_data_version(db, user_id)
+
+
+def _bump_data_version(db: sqlite3.Connection, user_id: int) -> None:
+    db.execute('UPDATE users SET data_version = data_version + 1 WHERE id = ?', (user_id,))
+
+
+# Expense operations
+def _date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, List[Any]]:
+    """SQL conditions and parameters restricting expenses to a date range"""
+    clauses, params = [], []
+    if start_date is not None:
+        clauses.append('date_key >= ?')
+        params.append(normalize_date_key(start_date))
+    if end_date is not None:
+        clauses.append('date_key <= ?')
+        params.append(normalize_date_key(end_date))
+    return ''.join(f" AND {clause}" for clause in clauses), params
+
+
+def _expense_rows(
+    user_id: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: int,
+    after: Optional[Tuple[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """One page of stored expense items, newest date first, after an optional (date_key, id)"""
+    conditions, params = _date_range(start_date, end_date)
+    if after is not None:
+        conditions += ' AND (date_key, id) < (?, ?)'
+        params.extend(after)
+    rows = _connection().execute(
+        f"SELECT * FROM expenses WHERE user_id = ?{conditions} ORDER BY date_key DESC, id DESC LIMIT ?",
+        [user_id, *params, limit]
+    ).fetchall()
+    return [_item(row) for row in rows]
+
+
+def _iter_expense_items(
+    user_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    page_size = page_size or SQLITE_PAGE_SIZE
+    after = None
+    while True:
+        items = _expense_rows(user_id, start_date, end_date, page_size, after)
+        if items:
+            yield items
+        if len(items) < page_size:
+            break
+        after = (items[-1]['date_key'], items[-1]['id'])
+
+
+def iter_expense_pages(
+    user_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Lazily yield a user's expenses a page at a time, newest first"""
+    for items in _iter_expense_items(user_id, start_date, end_date, page_size):
+        yield [EXPENSE_CODEC.decode(item) for item in items]
+
+
+def get_expense_page(
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one page of a user's expenses and the cursor for the next page"""
+    after = None
+    if cursor:
+        start_key = decode_cursor(cursor)
+        if set(start_key) != {'date_key', 'id'}:
+            raise InvalidCursorError('Invalid cursor')
+        after = (start_key['date_key'], start_key['id'])
+    # One extra row tells whether there is a next page
+    items = _expense_rows(user_id, None, None, limit + 1, after)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({'date_key': items[-1]['date_key'], 'id': items[-1]['id']})
+    return [EXPENSE_CODEC.decode(item) for item in items], next_cursor
+
+
+def get_recent_expenses(user_id: int, limit: int, by: str = 'date') -> List[Dict[str, Any]]:
+    """Get a user's most recent expenses by date, or by creation (id) with by='created'"""
+    order = 'id DESC' if by == 'created' else 'date_key DESC, id DESC'
+    rows = _connection().execute(
+        f"SELECT * FROM expenses WHERE user_id = ? ORDER BY {order} LIMIT ?", (user_id, limit)
+    ).fetchall()
+    return [EXPENSE_CODEC.decode(_item(row)) for row in rows]
+
+
+def get_expenses_by_user(user_id: int) -> List[Dict[str, Any]]:
+    """Get all expenses for a user, newest date first"""
+    return [item for page in iter_expense_pages(user_id) for item in page]
+
+
+def get_expenses_by_date_range(user_id: int, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """Get expenses dated between start_date and end_date (inclusive), newest first"""
+    return [item for page in iter_expense_pages(user_id, start_date, end_date) for item in page]
+
+
+def get_expense_records_by_date_range(user_id: int, start_date: str, end_date: str) -> List[ExpenseRecord]:
+    """Get expenses dated between start_date and end_date (inclusive) as records, newest first"""
+    return [
+        ExpenseRecord.from_item(item)
+        for items in _iter_expense_items(user_id, start_date, end_date)
+        for item in items
+    ]
+
+
+def get_expense(user_id: int, expense_id: int) -> Optional[Dict[str, Any]]:
+    """Get a specific expense"""
+    row = _connection().execute(
+        'SELECT * FROM expenses WHERE user_id = ? AND id = ?', (user_id, expense_id)
+    ).fetchone()
+    return EXPENSE_CODEC.decode(_item(row)) if row else None
+
+
+def create_expense(expense_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a new expense"""
+    expense_data = {**expense_data, **date_attributes(expense_data['date'])}
+    with _transaction() as db:
+        item = _insert_new(db, 'expenses', expense_data, EXPENSE_CODEC)
+        _record_change(db, expense_data['user_id'], 'expense', expense_data['id'], item)
+    return expense_data
+
+
+def batch_create_expenses(expenses: List[Dict[str, Any]]) -> List[int]:
+    """Create several expenses in one transaction; returns the IDs they were saved under"""
+    if not expenses:
+        return []
+    expenses = [{**expense, **date_attributes(expense['date'])} for expense in expenses]
+    user_id = expenses[0]['user_id']
+    with _transaction() as db:
+        for expense in expenses:
+            item = _insert_new(db, 'expenses', expense, EXPENSE_CODEC)
+            _record_change(db, user_id, 'expense', expense['id'], item, bump=False)
+        _bump_data_version(db, user_id)
+    return [expense['id'] for expense in expenses]
+
+
+def _update_expense(db: sqlite3.Connection, user_id: int, expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+    if 'date' in updates:
+        updates = {**updates, **date_attributes(updates['date'])}
+    new = _update(db, 'expenses', {'user_id': user_id, 'id': expense_id}, EXPENSE_CODEC.encode(updates))
+    if new is None:
+        raise ItemNotFoundError(f"Expense {expense_id} not found")
+    return new
+
+
+def _delete_expense(db: sqlite3.Connection, user_id: int, expense_id: int) -> None:
+    deleted = db.execute('DELETE FROM expenses WHERE user_id = ? AND id = ?', (user_id, expense_id)).rowcount
+    if not deleted:
+        raise ItemNotFoundError(f"Expense {expense_id} not found")
+
+
+def update_expense(user_id: int, expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Update an expense, raising ItemNotFoundError if it does not exist"""
+    with _transaction() as db:
+        new = _update_expense(db, user_id, expense_id, updates)
+        _record_change(db, user_id, 'expense', expense_id, new)
+    return EXPENSE_CODEC.decode(new)
+
+
+def delete_expense(user_id: int, expense_id: int) -> None:
+    """Delete an expense, raising ItemNotFoundError if it does not exist"""
+    with _transaction() as db:
+        _delete_expense(db, user_id, expense_id)
+        _record_change(db, user_id, 'expense', expense_id)
+
+
+def bulk_edit_expenses(
+    user_id: int,
+    updates: Dict[int, Dict[str, Any]],
+    deletes: List[int]
+) -> List[Dict[str, Any]]:
+    """Update and delete several expenses in one transaction; returns the updated expenses.
+
+    Raises ItemNotFoundError (and changes nothing) if any expense does not exist.
+    """
+    updated = []
+    with _transaction() as db:
+        for expense_id, changes in updates.items():
+            new = _update_expense(db, user_id, expense_id, changes)
+            _record_change(db, user_id, 'expense', expense_id, new, bump=False)
+            updated.append(new)
+        for expense_id in deletes:
+            _delete_expense(db, user_id, expense_id)
+            _record_change(db, user_id, 'expense', expense_id, bump=False)
+        _bump_data_version(db, user_id)
+    return [EXPENSE_CODEC.decode(item) for item in updated]
+
+
+# Recurring cost operations
+def get_recurring_costs_by_user(user_id: int, version: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get all recurring costs for a user (version is accepted for the protocol; reads are local)"""
+    rows = _connection().execute(
+        'SELECT * FROM recurring_costs WHERE user_id = ? ORDER BY id', (user_id,)
+    ).fetchall()
+    return [RECURRING_CODEC.decode(_item(row)) for row in rows]
+
+
+def get_recurring_cost(user_id: int, recurring_id: int) -> Optional[Dict[str, Any]]:
+    """Get a specific recurring cost"""
+    row = _connection().execute(
+        'SELECT * FROM recurring_costs WHERE user_id = ? AND id = ?', (user_id, recurring_id)
+    ).fetchone()
+    return RECURRING_CODEC.decode(_item(row)) if row else None
+
+
+def create_recurring_cost(recurring_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a new recurring cost"""
+    recurring_data = dict(recurring_data)
+    with _transaction() as db:
+        item = _insert_new(db, 'recurring_costs', recurring_data, RECURRING_CODEC)
+        _record_change(db, recurring_data['user_id'], 'recurring', recurring_data['id'], item)
+    return recurring_data
+
+
+def update_recurring_cost(user_id: int, recurring_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Update a recurring cost, raising ItemNotFoundError if it does not exist"""
+    with _transaction() as db:
+        new = _update(db, 'recurring_costs', {'user_id': user_id, 'id': recurring_id}, RECURRING_CODEC.encode(updates))
+        if new is None:
+            raise ItemNotFoundError(f"Recurring cost {recurring_id} not found")
+        _record_change(db, user_id, 'recurring', recurring_id, new)
+    return RECURRING_CODEC.decode(new)
+
+
+def delete_recurring_cost(user_id: int, recurring_id: int) -> None:
+    """Delete a recurring cost, raising ItemNotFoundError if it does not exist"""
+    with _transaction() as db:
+        deleted = db.execute(
+            'DELETE FROM recurring_costs WHERE user_id = ? AND id = ?', (user_id, recurring_id)
+        ).rowcount
+        if not deleted:
+            raise ItemNotFoundError(f"Recurring cost {recurring_id} not found")
+        _record_change(db, user_id, 'recurring', recurring_id)
+
+
+# Budget operations
+def get_budget_settings(user_id: int, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Get budget settings for a user (version is accepted for the protocol; reads are local)"""
+    row = _connection().execute('SELECT * FROM budget_settings WHERE user_id = ?', (user_id,)).fetchone()
+    return BUDGET_CODEC.decode(_item(row)) if row else None
+
+
+def save_budget_settings(budget_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Save budget settings"""
+    item = BUDGET_CODEC.encode(budget_data)
+    with _transaction() as db:
+        _insert(db, 'budget_settings', item, replace=True)
+        _record_change(db, budget_data['user_id'], 'budget', budget_data['user_id'], item)
+    return budget_data
+
+
+# Change log operations (incremental sync)
+def _record_change(
+    db: sqlite3.Connection,
+    user_id: int,
+    entity: str,
+    entity_id: int,
+    data: Optional[Dict[str, Any]] = None,
+    bump: bool = True
+) -> None:
+    """Append a write to the user's change log (and by default bump their data version)"""
+    global _next_prune
+    now = time.time()
+    db.execute(
+        'INSERT INTO changes (user_id, seq, entity, entity_id, op, data, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (
+            user_id,
+            change_seq(int(now * 1000)),
+            entity,
+            entity_id,
+            'delete' if data is None else 'upsert',
+            None if data is None else json.dumps(data),
+            int(now) + CHANGE_LOG_TTL_SECONDS,
+        )
+    )
+    if bump:
+        _bump_data_version(db, user_id)
+    # The counterpart of the DynamoDB table's TTL
+    if now >= _next_prune:
+        _next_prune = now + CHANGE_LOG_PRUNE_INTERVAL
+        db.execute('DELETE FROM changes WHERE expires_at < ?', (int(now),))
+
+
+def get_changes(user_id: int, after_seq: str, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Get changes logged after after_seq, oldest first, and whether more remain"""
+    rows = _connection().execute(
+        'SELECT * FROM changes WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?',
+        (user_id, after_seq, limit + 1)
+    ).fetchall()
+    changes = [
+        {
+            'seq': row['seq'],
+            'entity': row['entity'],
+            'id': row['entity_id'],
+            'op': row['op'],
+            'data': CHANGE_CODECS[row['entity']].decode(json.loads(row['data'])) if row['data'] else None,
+        }
+        for row in rows[:limit]
+    ]
+    return changes, len(rows) > limit
+
+
+# Monthly totals, aggregated in SQL (all money in integer cents)
+def get_monthly_rollup(user_id: int, year: int, month: int) -> Dict[str, Any]:
+    """Get totals for a month by category and day, in the format of api.database.parse_rollup"""
+    start_date, end_date = month_date_range(year, month)
+    rows = _connection().execute(
+        """
+        SELECT category, CAST(substr(date_key, 9, 2) AS INTEGER) AS day,
+               SUM(amount_cents) AS cents, COUNT(*) AS count
+        FROM expenses
+        WHERE user_id = ? AND date_key BETWEEN ? AND ?
+        GROUP BY category, day
+        """,
+        (user_id, normalize_date_key(start_date), normalize_date_key(end_date))
+    ).fetchall()
+
+    counters: Dict[str, int] = {'total': 0, 'expense_count': 0}
+    for row in rows:
+        counters['total'] += row['cents']
+        counters['expense_count'] += row['count']
+        for attr in (f"category#{row['category']}", f"day#{row['day']:02d}"):
+            counters[attr] = counters.get(attr, 0) + row['cents']
+    return parse_rollup(f"{year:04d}-{month:02d}", counters)
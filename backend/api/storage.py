@@ -0,0 +1,101 @@
+"""
+Pluggable storage.
+
+All data access goes through one storage engine, chosen with STORAGE_BACKEND:
+
+- dynamodb (default): `api.database`, the production engine
+- sqlite: `api.sqlite_database`, a single SQLite file (SQLITE_PATH) for
+  single-node deployments, integration tests without AWS, and as a
+  baseline to benchmark the DynamoDB path against
+
+An engine is a module with the functions in `StorageEngine`, taking and
+returning plain API dicts (money as floats, IDs as ints). Engines raise the
+error types defined in `api.database` (ItemNotFoundError,
+DuplicateUserError, InvalidCursorError, WriteConflictError), which also
+holds the engine-neutral helpers (IDs, timestamps, date keys, cursors,
+rollup parsing). `api.async_database` wraps the selected engine for the
+routers.
+"""
+
+import importlib
+import os
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple, runtime_checkable
+
+from .records import ExpenseRecord
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'dynamodb')
+
+ENGINES = {
+    'dynamodb': '.database',
+    'sqlite': '.sqlite_database',
+}
+
+
+@runtime_checkable
+class StorageEngine(Protocol):
+    """Operations every storage engine implements"""
+
+    # Users
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]: ...
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]: ...
+    def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]: ...
+    def update_user_password(self, user_id: int, email: str, password_hash: str) -> None: ...
+    def get_tokens_valid_after(self, user_id: int) -> float: ...
+    def revoke_user_tokens(self, user_id: int, issued_before: float) -> None: ...
+    def is_token_revoked(self, jti: str) -> bool: ...
+    def revoke_token(self, jti: str, expires_at: float) -> None: ...
+    def get_data_version(self, user_id: int) -> int: ...
+    def bump_data_version(self, user_id: int) -> None: ...
+
+    # Expenses (listed newest date first)
+    def iter_expense_pages(
+        self,
+        user_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]: ...
+    def get_expense_page(
+        self, user_id: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]: ...
+    def get_recent_expenses(self, user_id: int, limit: int, by: str = 'date') -> List[Dict[str, Any]]: ...
+    def get_expenses_by_user(self, user_id: int) -> List[Dict[str, Any]]: ...
+    def get_expenses_by_date_range(self, user_id: int, start_date: str, end_date: str) -> List[Dict[str, Any]]: ...
+    def get_expense_records_by_date_range(self, user_id: int, start_date: str, end_date: str) -> List[ExpenseRecord]: ...
+    def get_expense(self, user_id: int, expense_id: int) -> Optional[Dict[str, Any]]: ...
+    def create_expense(self, expense_data: Dict[str, Any]) -> Dict[str, Any]: ...
+    def batch_create_expenses(self, expenses: List[Dict[str, Any]]) -> List[int]: ...
+    def update_expense(self, user_id: int, expense_id: int, updates: Dict[str, Any]) -> Dict[str, Any]: ...
+    def delete_expense(self, user_id: int, expense_id: int) -> None: ...
+    def bulk_edit_expenses(
+        self, user_id: int, updates: Dict[int, Dict[str, Any]], deletes: List[int]
+    ) -> List[Dict[str, Any]]: ...
+
+    # Recurring costs
+    def get_recurring_costs_by_user(self, user_id: int, version: Optional[int] = None) -> List[Dict[str, Any]]: ...
+    def get_recurring_cost(self, user_id: int, recurring_id: int) -> Optional[Dict[str, Any]]: ...
+    def create_recurring_cost(self, recurring_data: Dict[str, Any]) -> Dict[str, Any]: ...
+    def update_recurring_cost(self, user_id: int, recurring_id: int, updates: Dict[str, Any]) -> Dict[str, Any]: ...
+    def delete_recurring_cost(self, user_id: int, recurring_id: int) -> None: ...
+
+    # Budget
+    def get_budget_settings(self, user_id: int, version: Optional[int] = None) -> Optional[Dict[str, Any]]: ...
+    def save_budget_settings(self, budget_data: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    # Monthly totals (see api.database.parse_rollup) and the sync change log
+    def get_monthly_rollup(self, user_id: int, year: int, month: int) -> Dict[str, Any]: ...
+    def get_changes(self, user_id: int, after_seq: str, limit: int) -> Tuple[List[Dict[str, Any]], bool]: ...
+
+
+def load_engine(name: str = STORAGE_BACKEND) -> ModuleType:
+    """Import the named storage engine and check it implements StorageEngine"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {name}")
+    module = importlib.import_module(ENGINES[name], __package__)
+    if not isinstance(module, StorageEngine):
+        raise RuntimeError(f"Storage engine {name} does not implement every StorageEngine operation")
+    return module
+
+
+engine = load_engine()
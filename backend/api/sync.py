@@ -0,0 +1,145 @@
+"""
+Incremental sync.
+
+Every write in the storage engine appends an entry to the user's change log,
+keyed by a time-sortable sequence, with a snapshot of the item (or a
+tombstone for deletes). `GET /sync?since=<token>` replays the log after the
+token so clients only download what changed; without a token, or with one
+older than the log's retention, it returns a full snapshot with `reset`.
+Snapshots are streamed one expense page at a time, so a long history never
+has to fit in memory.
+
+Sequences come from each writer's clock, so an entry can become visible
+slightly after a later-numbered one. Tokens from a completed sync therefore
+re-read the last SYNC_OVERLAP_MS of the log; changes are full snapshots
+applied in order, so replaying them is harmless.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from .models import Expense, RecurringCost, SyncResponse, project
+from .database import (
+    CHANGE_LOG_TTL_SECONDS,
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor
+)
+from .async_database import (
+    get_changes,
+    get_data_version,
+    iter_expense_pages,
+    get_recurring_costs_by_user,
+    get_budget_settings
+)
+from .budget import budget_response
+from .middleware import get_current_user
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+# Changes returned per response; clients call again while has_more is set
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', '500'))
+# How far back a new sync re-reads to catch entries from lagging writers
+SYNC_OVERLAP_MS = int(os.getenv('SYNC_OVERLAP_MS', '5000'))
+
+
+def _encode_token(seq: str, exact: bool) -> str:
+    # exact: resume strictly after seq (mid-drain) instead of re-reading the overlap
+    return encode_cursor({'seq': seq, 'exact': int(exact)})
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    key = decode_cursor(token)
+    if set(key) != {'seq', 'exact'} or not isinstance(key['seq'], str) or not key['seq'][:13].isdigit():
+        raise InvalidCursorError('Invalid sync token')
+    return key
+
+
+def _shape(change: Dict[str, Any]) -> Dict[str, Any]:
+    """Present a change's snapshot the way the regular endpoints do"""
+    data = change['data']
+    if data is not None:
+        if change['entity'] == 'expense':
+            data = project(Expense, data)
+        elif change['entity'] == 'recurring':
+            data = project(RecurringCost, data)
+        else:
+            data = budget_response(data)
+    return {'entity': change['entity'], 'id': change['id'], 'op': change['op'], 'data': data}
+
+
+def _upsert(entity: str, item_id: int, data: Dict[str, Any]) -> bytes:
+    return orjson.dumps({'entity': entity, 'id': item_id, 'op': 'upsert', 'data': data})
+
+
+async def _stream_snapshot(user_id: int, token: str) -> AsyncIterator[bytes]:
+    """Every current item as an upsert, serialized as a SyncResponse one
+    expense page at a time"""
+    version = await get_data_version(user_id)
+    recurring_costs, budget = await asyncio.gather(
+        get_recurring_costs_by_user(user_id, version),
+        get_budget_settings(user_id, version)
+    )
+    yield b'{"token":' + orjson.dumps(token) + b',"reset":true,"has_more":false,"changes":['
+    first = True
+    async for page in iter_expense_pages(user_id, page_size=SYNC_PAGE_SIZE):
+        for expense in page:
+            change = _upsert('expense', expense['id'], project(Expense, expense))
+            yield change if first else b',' + change
+            first = False
+    for cost in recurring_costs:
+        change = _upsert('recurring', cost['id'], project(RecurringCost, cost))
+        yield change if first else b',' + change
+        first = False
+    if budget:
+        change = _upsert('budget', user_id, budget_response(budget))
+        yield change if first else b',' + change
+    yield b']}'
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full snapshot"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get changes to the user's expenses, recurring costs and budget since a sync token"""
+    user_id = current_user['user_id']
+    now_ms = int(time.time() * 1000)
+
+    token = None
+    if since:
+        try:
+            token = _decode_token(since)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+        # Entries this old may already have expired from the log
+        if int(token['seq'][:13]) < now_ms - CHANGE_LOG_TTL_SECONDS * 1000 + SYNC_OVERLAP_MS:
+            token = None
+
+    if token is None:
+        # The watermark is taken before reading, so writes during the read are replayed next time
+        snapshot = _stream_snapshot(user_id, _encode_token(f"{now_ms:013d}", exact=False))
+        return StreamingResponse(snapshot, media_type='application/json')
+
+    after = token['seq']
+    if not token['exact']:
+        after = f"{max(int(after[:13]) - SYNC_OVERLAP_MS, 0):013d}"
+    changes, has_more = await get_changes(user_id, after, SYNC_PAGE_SIZE)
+
+    next_seq = changes[-1]['seq'] if changes else token['seq']
+    if not has_more:
+        # The log was read up to now: move the watermark there, like a snapshot
+        # does, so idle clients do not fall behind the retention window
+        next_seq = max(next_seq, f"{now_ms:013d}")
+    return ORJSONResponse({
+        'token': _encode_token(next_seq, exact=has_more),
+        'reset': False,
+        'has_more': has_more,
+        'changes': [_shape(change) for change in changes]
+    })
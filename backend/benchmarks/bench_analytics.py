@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-expense Python loop vs the vectorized trends engine.
+
+Generates synthetic expenses spread over the last three years and computes
+the same 24-month report (monthly totals, weekly totals, category totals,
+trailing averages, year-over-year) two ways, both starting from raw
+DynamoDB items: EXPENSE_CODEC decoding to API dicts followed by the
+dict-bucketing loop the summary endpoint used to run, which parses each
+expense date with datetime.fromisoformat, and `api.analytics` (load_columns + compute_trends)
+over ExpenseRecords. Building the records from stored items (the once-per-read
+parse in the data layer), loading columns and computing are reported
+separately for the vectorized engine.
+
+Usage:
+    python benchmarks/bench_analytics.py [--sizes 1000 100000 1000000] [--months 24]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.analytics import load_columns, compute_trends, month_index  # noqa: E402
+from api.database import date_attributes, EXPENSE_CODEC  # noqa: E402
+from api.records import ExpenseRecord  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Other']
+END_YEAR, END_MONTH = 2026, 6
+
+
+def make_expenses(count, seed=42):
+    rng = random.Random(seed)
+    end = datetime(END_YEAR, END_MONTH, 28)
+    span_seconds = 3 * 365 * 86400
+    expenses = []
+    for i in range(count):
+        when = (end - timedelta(seconds=rng.randrange(span_seconds))).strftime('%Y-%m-%dT%H:%M:%S')
+        expenses.append({
+            'id': i,
+            'user_id': 1,
+            # Stored items come back from DynamoDB with Decimal numbers
+            'amount_cents': Decimal(rng.randrange(100, 25000)),
+            'date_ts': Decimal(date_attributes(when)['date_ts']),
+            'date_key': date_attributes(when)['date_key'],
+            'category': rng.choice(CATEGORIES),
+            'date': when,
+        })
+    return expenses
+
+
+def legacy_trends(expenses, end_year, end_month, months, trailing=3):
+    """Per-expense loop: parse each date, bucket into dicts"""
+    last = month_index(end_year, end_month)
+    first = last - months + 1 - 12
+    monthly = defaultdict(float)
+    counts = defaultdict(int)
+    weekly = defaultdict(float)
+    categories = defaultdict(float)
+    category_by_month = defaultdict(lambda: defaultdict(float))
+
+    for expense in expenses:
+        when = datetime.fromisoformat(expense['date'].replace('Z', '+00:00'))
+        index = month_index(when.year, when.month)
+        if not first <= index <= last:
+            continue
+        amount = float(expense['amount'])
+        monthly[index] += amount
+        counts[index] += 1
+        if index > last - months:
+            week_start = (when - timedelta(days=when.weekday())).date()
+            weekly[week_start] += amount
+            categories[expense['category']] += amount
+            category_by_month[expense['category']][index] += amount
+
+    report = []
+    for index in range(last - months + 1, last + 1):
+        window = [monthly[i] for i in range(index - trailing + 1, index + 1)]
+        previous = monthly[index - 12]
+        report.append({
+            'month': index,
+            'total': monthly[index],
+            'count': counts[index],
+            'trailing_average': sum(window) / trailing,
+            'previous_year_total': previous,
+            'yoy_change': (monthly[index] - previous) / previous * 100 if previous else None,
+        })
+    return {'months': report, 'weeks': dict(weekly), 'categories': dict(categories)}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--months', type=int, default=24)
+    args = parser.parse_args()
+
+    print(f"{'expenses':>10} {'loop':>10} {'records':>10} {'load':>10} {'compute':>10} {'vector':>10} {'speedup':>8}")
+    for size in args.sizes:
+        expenses = make_expenses(size)
+
+        legacy, loop_seconds = timed(
+            lambda: legacy_trends([EXPENSE_CODEC.decode(item) for item in expenses], END_YEAR, END_MONTH, args.months)
+        )
+        records, record_seconds = timed(lambda: [ExpenseRecord.from_item(item) for item in expenses])
+        columns, load_seconds = timed(load_columns, records)
+        trends, compute_seconds = timed(compute_trends, columns, END_YEAR, END_MONTH, args.months)
+
+        # Both paths must agree before their timings mean anything
+        for old, new in zip(legacy['months'], trends['months']):
+            assert abs(old['total'] - new['total']) < 0.01 * max(1.0, old['total']), (old, new)
+
+        vector_seconds = record_seconds + load_seconds + compute_seconds
+        print(f"{size:>10} {loop_seconds * 1000:>8.1f}ms {record_seconds * 1000:>8.1f}ms {load_seconds * 1000:>8.1f}ms "
+              f"{compute_seconds * 1000:>8.1f}ms {vector_seconds * 1000:>8.1f}ms "
+              f"{loop_seconds / vector_seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
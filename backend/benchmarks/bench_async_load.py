@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: blocking boto3 calls vs the async data-access facade.
+
+Simulates N concurrent clients, each issuing a stream of requests to a
+handler that reads budget settings. In "blocking" mode the handler calls
+`api.database` directly inside the coroutine (the old behaviour); in "async"
+mode it awaits `api.async_database`. Reports throughput and p50/p99 latency
+at 50/200/500 concurrent clients. Blocking-mode latencies look flat because
+each call freezes the loop for everyone else; compare throughput.
+
+By default DynamoDB is replaced with a stub that sleeps for --latency-ms per
+call, so the benchmark needs no AWS access. Set DYNAMODB_ENDPOINT_URL (e.g.
+DynamoDB Local with tables from setup_dynamodb.py) to measure real calls.
+
+Usage:
+    python benchmarks/bench_async_load.py [--latency-ms 20] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api import database, async_database  # noqa: E402
+
+CONCURRENCY_LEVELS = (50, 200, 500)
+USER_ID = 1
+
+
+class SimulatedTable:
+    """Stand-in for a boto3 Table whose get_item blocks like a network call"""
+
+    def __init__(self, latency_seconds):
+        self.latency_seconds = latency_seconds
+
+    def get_item(self, Key, ConsistentRead=False):
+        time.sleep(self.latency_seconds)
+        return {'Item': {'user_id': Key['user_id'], 'monthly_budget': 1000, 'updated_at': ''}}
+
+
+async def blocking_handler():
+    return database.get_budget_settings(USER_ID)
+
+
+async def async_handler():
+    return await async_database.get_budget_settings(USER_ID)
+
+
+async def run_clients(handler, concurrency, requests_per_client):
+    """Run concurrent clients and collect per-request latencies"""
+    latencies = []
+
+    async def client():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await handler()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Blocking vs async DynamoDB access under load')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated DynamoDB latency')
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    args = parser.parse_args()
+
+    # The handlers pass no data version, so every call skips the budget
+    # settings cache and measures the DynamoDB call itself
+    if not os.getenv('DYNAMODB_ENDPOINT_URL'):
+        database.budget_table = SimulatedTable(args.latency_ms / 1000)
+        print(f"Simulated DynamoDB latency: {args.latency_ms:.0f} ms")
+    print(f"Async pool size (DYNAMODB_MAX_CONCURRENCY): {async_database.DYNAMODB_MAX_CONCURRENCY}\n")
+
+    print(f"{'clients':>8} {'mode':>9} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for concurrency in CONCURRENCY_LEVELS:
+        for mode, handler in (('blocking', blocking_handler), ('async', async_handler)):
+            elapsed, latencies = asyncio.run(run_clients(handler, concurrency, args.requests))
+            print(
+                f"{concurrency:>8} {mode:>9} {len(latencies) / elapsed:>10.0f} "
+                f"{statistics.median(latencies) * 1000:>10.1f} {percentile(latencies, 0.99) * 1000:>10.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
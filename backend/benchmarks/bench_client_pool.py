@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: default boto3 setup vs the tuned per-thread clients.
+
+Drives GetItem against a scratch budget settings table from 32, 128 and
+256 threads, two ways:
+
+- default: one module-level `boto3.resource` with botocore's default config
+  shared by every thread (how `api.database` used to work: 10 pooled
+  connections, legacy retries)
+- tuned: `api.database.budget_table`, which resolves to a per-thread
+  resource built by `api.clients` with the DYNAMODB_* pool, timeout, retry
+  and keepalive settings
+
+Reports throughput, p50/p99 latency and errors. With the default setup,
+threads beyond the pool size queue for a connection (and urllib3 logs
+"Connection pool is full" as it discards the extras).
+
+Needs DynamoDB Local: point DYNAMODB_ENDPOINT_URL at it. The scratch table
+is deleted afterwards unless --keep is given.
+
+Usage:
+    DYNAMODB_ENDPOINT_URL=http://localhost:8001 \\
+        python benchmarks/bench_client_pool.py [--threads 32 128 256] [--requests 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The data layer must point at the scratch table before it is imported
+os.environ.setdefault('DYNAMODB_BUDGET_TABLE', 'budgify-bench-client-pool')
+
+import boto3  # noqa: E402
+from api import database  # noqa: E402
+from setup_dynamodb import client, create_budget_table  # noqa: E402
+
+DEFAULT_THREADS = (32, 128, 256)
+USERS = 1_000
+
+
+def default_table():
+    """The old setup: one resource with botocore defaults, shared by all threads"""
+    resource = boto3.resource(
+        'dynamodb',
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        endpoint_url=os.getenv('DYNAMODB_ENDPOINT_URL')
+    )
+    return resource.Table(database.TABLES['budget'])
+
+
+def load_budgets():
+    with database.budget_table.batch_writer() as batch:
+        for user_id in range(USERS):
+            batch.put_item(Item={'user_id': user_id, 'monthly_budget_cents': 100000, 'updated_at': ''})
+
+
+def run(table, threads, requests_per_thread):
+    """Return (requests/s, p50 ms, p99 ms, errors)"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    started = []
+    # Timing starts once every thread has made its warm-up call
+    start_barrier = threading.Barrier(threads, action=lambda: started.append(time.perf_counter()))
+
+    def worker(offset):
+        nonlocal errors
+        local = []
+        failed = 0
+        # Untimed first call: builds the thread's resource in the tuned setup
+        table.get_item(Key={'user_id': offset % USERS})
+        start_barrier.wait()
+        for i in range(requests_per_thread):
+            start = time.perf_counter()
+            try:
+                table.get_item(Key={'user_id': (offset + i) % USERS})
+            except Exception:
+                failed += 1
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started[0]
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies), p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=DEFAULT_THREADS)
+    parser.add_argument('--requests', type=int, default=50, help='GetItem calls per thread')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch table')
+    args = parser.parse_args()
+
+    if not os.getenv('DYNAMODB_ENDPOINT_URL'):
+        sys.exit("Set DYNAMODB_ENDPOINT_URL to a DynamoDB Local endpoint")
+
+    table_name = database.TABLES['budget']
+    create_budget_table()
+    client.get_waiter('table_exists').wait(TableName=table_name)
+
+    try:
+        load_budgets()
+        setups = [('default', default_table()), ('tuned', database.budget_table)]
+        print(f"{'threads':>7} {'setup':<8} {'req/s':>9} {'p50':>9} {'p99':>9} {'errors':>6}")
+        for threads in args.threads:
+            for name, table in setups:
+                throughput, p50, p99, errors = run(table, threads, args.requests)
+                print(f"{threads:>7} {name:<8} {throughput:>9.0f} {p50:>7.2f}ms {p99:>7.2f}ms {errors:>6}")
+    finally:
+        if not args.keep:
+            client.delete_table(TableName=table_name)
+
+
+if __name__ == '__main__':
+    main()
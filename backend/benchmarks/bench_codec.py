@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: item conversion cost per 10k expenses.
+
+Compares the generic recursive walkers the data layer used to run on every
+item (floats -> Decimal on write; every Decimal checked with `% 1` and turned
+into int or float on read) with the schema-aware EXPENSE_CODEC, which knows
+which attributes are integers and stores amounts as integer cents. Building
+ExpenseRecords from the raw items is timed as well. Items are shaped like
+what boto3 returns: numbers as Decimal.
+
+Usage:
+    python benchmarks/bench_codec.py [--items 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.database import EXPENSE_CODEC, date_attributes  # noqa: E402
+from api.records import ExpenseRecord  # noqa: E402
+
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Other']
+
+
+# The walkers EXPENSE_CODEC replaced, kept here as the baseline
+def legacy_encode(obj):
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    elif isinstance(obj, dict):
+        return {k: legacy_encode(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_encode(v) for v in obj]
+    return obj
+
+
+def legacy_decode(obj):
+    if isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        return float(obj)
+    elif isinstance(obj, dict):
+        return {k: legacy_decode(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_decode(v) for v in obj]
+    return obj
+
+
+def make_expenses(count, seed=42):
+    """API-side expense dicts"""
+    rng = random.Random(seed)
+    expenses = []
+    for i in range(count):
+        date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        expenses.append({
+            'id': 1_700_000_000_000 + i,
+            'user_id': 1_700_000_000_000,
+            'amount': round(rng.uniform(1, 250), 2),
+            'category': rng.choice(CATEGORIES),
+            'description': 'Benchmark expense',
+            'date': date,
+            'created_at': '2025-01-01T00:00:00Z',
+            **date_attributes(date),
+        })
+    return expenses
+
+
+def as_stored(item):
+    """What boto3 hands back for an item: every number is a Decimal"""
+    return {key: Decimal(str(value)) if isinstance(value, (int, float)) else value for key, value in item.items()}
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    expenses = make_expenses(args.items)
+    legacy_items = [as_stored(legacy_encode(expense)) for expense in expenses]
+    codec_items = [as_stored(EXPENSE_CODEC.encode(expense)) for expense in expenses]
+
+    # Both decoders must agree before their timings mean anything
+    for old, new in zip(legacy_items, codec_items):
+        assert legacy_decode(old)['amount'] == EXPENSE_CODEC.decode(new)['amount']
+
+    rows = [
+        ('legacy encode', lambda: [legacy_encode(expense) for expense in expenses]),
+        ('codec encode', lambda: [EXPENSE_CODEC.encode(expense) for expense in expenses]),
+        ('legacy decode', lambda: [legacy_decode(item) for item in legacy_items]),
+        ('codec decode', lambda: [EXPENSE_CODEC.decode(item) for item in codec_items]),
+        ('records', lambda: [ExpenseRecord.from_item(item) for item in codec_items]),
+    ]
+
+    per = 10_000 / args.items
+    print(f"{'operation':<16} {'per 10k items':>14} {'per item':>10}")
+    for name, func in rows:
+        seconds = best_of(args.repeat, func)
+        print(f"{name:<16} {seconds * per * 1000:>12.2f}ms {seconds / args.items * 1e6:>8.2f}us")
+
+
+if __name__ == '__main__':
+    main()
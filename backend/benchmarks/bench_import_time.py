@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start import time of the API.
+
+Vercel imports `api/index.py` on every cold start, so its import time is
+paid by the first request of each new function instance. This runs
+`python -X importtime -c "import api.index"` in fresh interpreters and
+reports the fastest run: total import time and the slowest top-level
+modules.
+
+The result is checked against benchmarks/import_budget.json:
+
+- total_ms: budget for importing api.index (fastest of --runs)
+- deferred: modules that must not be imported at startup (they are
+  imported on first use by the code that needs them)
+
+Exits with status 1 when the budget is exceeded, so it can run in CI.
+Timings depend on the machine; raise total_ms deliberately, in the same
+change that adds the import cost.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+
+# "import time:  self [us] | cumulative | imported package" lines
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_times():
+    """Import api.index in a fresh interpreter; return [(module, depth, cumulative ms)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import api.index'],
+        cwd=BACKEND_DIR,
+        env={**os.environ, 'LOG_LEVEL': 'WARNING'},
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            modules.append((name, (len(indent) - 1) // 2, int(cumulative) / 1000))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to time (fastest is reported)')
+    parser.add_argument('--top', type=int, default=15, help='slowest modules to list')
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    # The first run also warms the bytecode cache
+    runs = [import_times() for _ in range(args.runs + 1)][1:]
+    fastest = min(runs, key=lambda modules: dict((m[0], m[2]) for m in modules)['api.index'])
+    total_ms = dict((name, ms) for name, _, ms in fastest)['api.index']
+
+    # Modules imported directly by api.index or its api.* imports
+    print(f"{'module':<40} {'cumulative':>10}")
+    shown = sorted((m for m in fastest if m[1] <= 1), key=lambda m: -m[2])[:args.top]
+    for name, _, ms in shown:
+        print(f"{name:<40} {ms:>8.1f}ms")
+
+    failures = []
+    print(f"\nimport api.index: {total_ms:.1f}ms (budget {budget['total_ms']}ms)")
+    if total_ms > budget['total_ms']:
+        failures.append(f"import time {total_ms:.1f}ms is over the {budget['total_ms']}ms budget")
+    imported = {name for name, _, _ in fastest}
+    for module in budget['deferred']:
+        if module in imported:
+            failures.append(f"{module} is imported at startup but should be deferred")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Within budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recent expenses vs fetching the whole history.
+
+For each history size, loads that many expenses for one user into a scratch
+expenses table, then times two ways of getting the 20 most recent:
+
+- recent: `api.database.get_recent_expenses`, one query on the date index
+  with ScanIndexForward=False and Limit
+- full history: `get_expenses_by_user` and a slice, what the dashboard list
+  needed before (skipped above --full-max items, it gets slow)
+
+Reports p50/p99 latency and the read capacity each call consumed. The
+recent query should stay flat from 100 to 100k items.
+
+Needs a real DynamoDB: point DYNAMODB_ENDPOINT_URL at DynamoDB Local (an
+in-process mock scans the whole partition on every query and hides the
+difference). The scratch table is created with the production schema and
+deleted afterwards unless --keep is given.
+
+Usage:
+    DYNAMODB_ENDPOINT_URL=http://localhost:8001 \\
+        python benchmarks/bench_recent_expenses.py [--sizes 100 1000 10000 100000] [--calls 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The data layer must point at the scratch table before it is imported
+os.environ.setdefault('DYNAMODB_EXPENSES_TABLE', 'budgify-bench-recent-expenses')
+
+from api import database  # noqa: E402
+from setup_dynamodb import client, create_expenses_table  # noqa: E402
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+RECENT_COUNT = 20
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Other']
+
+
+def load_history(user_id, count, seed=42):
+    """Write count expenses for one user, spread over the last few years"""
+    rng = random.Random(seed)
+    with database.expenses_table.batch_writer() as batch:
+        for _ in range(count):
+            date = f"{rng.randint(2021, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            batch.put_item(Item=database.EXPENSE_CODEC.encode({
+                'id': database.generate_id(),
+                'user_id': user_id,
+                'amount': rng.randrange(100, 25000) / 100,
+                'category': rng.choice(CATEGORIES),
+                'description': 'Benchmark expense',
+                'date': date,
+                'created_at': '2025-01-01T00:00:00Z',
+                **database.date_attributes(date),
+            }))
+
+
+class CapacityMeter:
+    """Sums ConsumedCapacity from every query the data layer sends"""
+
+    def __init__(self):
+        self.units = 0.0
+        events = database.dynamodb.meta.client.meta.events
+        events.register('provide-client-params.dynamodb.Query', self.request_capacity)
+        events.register('after-call.dynamodb.Query', self.record)
+
+    def request_capacity(self, params, **kwargs):
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+    def record(self, parsed, **kwargs):
+        self.units += parsed.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+
+
+def measure(calls, func, meter):
+    """Return (p50 ms, p99 ms, capacity units per call)"""
+    meter.units = 0.0
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99, meter.units / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--calls', type=int, default=200, help='timed calls per size and path')
+    parser.add_argument('--full-max', type=int, default=10_000, help='largest history to time the full fetch on')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch table')
+    args = parser.parse_args()
+
+    if not os.getenv('DYNAMODB_ENDPOINT_URL'):
+        sys.exit("Set DYNAMODB_ENDPOINT_URL to a DynamoDB Local endpoint (this benchmark writes up to 100k items)")
+
+    table_name = database.TABLES['expenses']
+    create_expenses_table(table_name)
+    client.get_waiter('table_exists').wait(TableName=table_name)
+    meter = CapacityMeter()
+
+    try:
+        print(f"{'items':>8} {'path':<14} {'p50':>9} {'p99':>9} {'RCU/call':>9}")
+        for user_id, size in enumerate(args.sizes, start=1):
+            load_history(user_id, size)
+            paths = [('recent', lambda: database.get_recent_expenses(user_id, RECENT_COUNT))]
+            if size <= args.full_max:
+                paths.append(('full history', lambda: database.get_expenses_by_user(user_id)[:RECENT_COUNT]))
+
+            # Both paths must return the same expenses
+            if len(paths) == 2:
+                assert paths[0][1]() == paths[1][1]()
+
+            for name, func in paths:
+                calls = args.calls if name == 'recent' else max(5, args.calls * 100 // size)
+                p50, p99, units = measure(calls, func, meter)
+                print(f"{size:>8} {name:<14} {p50:>7.2f}ms {p99:>7.2f}ms {units:>9.1f}")
+    finally:
+        if not args.keep:
+            client.delete_table(TableName=table_name)
+
+
+if __name__ == '__main__':
+    main()
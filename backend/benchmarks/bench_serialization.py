@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response serialization for expense lists.
+
+Encodes N data-layer expense dicts to JSON bytes three ways:
+
+- response_model: what FastAPI does for `response_model=List[Expense]` when
+  a handler returns dicts (validate every item, dump to JSON-compatible
+  Python, then json.dumps in JSONResponse)
+- per-item pydantic: Expense.model_validate(item).model_dump_json() per item,
+  as the streaming export used to
+- fast path: `api.models.dump_many`, which projects the model's fields and
+  encodes with orjson, without validation
+
+Reports the best of --repeat runs and items/second at 100/10k/100k items.
+
+Usage:
+    python benchmarks/bench_serialization.py [--sizes 100 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from api.models import Expense, dump_many  # noqa: E402
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Other']
+
+
+def make_expenses(count, seed=42):
+    """Expense dicts as returned by api.database (including internal attributes)"""
+    rng = random.Random(seed)
+    expenses = []
+    for i in range(count):
+        date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        expenses.append({
+            'id': 1_700_000_000_000 + i,
+            'user_id': 1_700_000_000_000,
+            'amount': rng.randrange(100, 25000) / 100,
+            'category': rng.choice(CATEGORIES),
+            'description': 'Benchmark expense',
+            'date': date,
+            'created_at': '2025-01-01T00:00:00Z',
+            'date_key': f"{date}T00:00:00",
+            'date_ts': 1_735_689_600,
+        })
+    return expenses
+
+
+RESPONSE_FIELD = create_response_field(name='Response_list', type_=List[Expense], mode='serialization')
+
+
+def response_model_path(expenses):
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=expenses))
+    return JSONResponse(content).body
+
+
+def per_item_pydantic_path(expenses):
+    return ('[' + ','.join(Expense.model_validate(item).model_dump_json() for item in expenses) + ']').encode()
+
+
+def fast_path(expenses):
+    return dump_many(Expense, expenses)
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    paths = [
+        ('response_model', response_model_path),
+        ('per-item pydantic', per_item_pydantic_path),
+        ('fast path', fast_path),
+    ]
+
+    print(f"{'items':>8} {'path':<18} {'time':>10} {'items/s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        expenses = make_expenses(size)
+
+        # Every path must produce the same document
+        expected = json.loads(response_model_path(expenses))
+        for _, func in paths[1:]:
+            assert json.loads(func(expenses)) == expected
+
+        baseline = None
+        for name, func in paths:
+            seconds = best_of(args.repeat, func, expenses)
+            baseline = baseline or seconds
+            print(f"{size:>8} {name:<18} {seconds * 1000:>8.2f}ms {size / seconds:>12,.0f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
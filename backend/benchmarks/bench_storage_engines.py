@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite storage engine vs DynamoDB.
+
+Loads the same expense history for one user into each engine (through
+`batch_create_expenses`, so rollups and the change log are written too),
+checks both return the same data, then times the operations behind the
+busiest endpoints:
+
+- recent: `get_recent_expenses`, the dashboard list
+- page: `get_expense_page`, the first page of /expenses
+- month: `get_expense_records_by_date_range` for one month
+- rollup: `get_monthly_rollup`, the summary totals (a rollup item read on
+  DynamoDB, a GROUP BY on the date index on SQLite)
+- create: `create_expense` with its change log entry and data version bump
+
+The SQLite engine runs on a scratch file in a temporary directory. The
+DynamoDB engine needs DynamoDB Local (DYNAMODB_ENDPOINT_URL); without it,
+only SQLite is timed. Scratch tables are deleted afterwards unless --keep
+is given.
+
+Usage:
+    DYNAMODB_ENDPOINT_URL=http://localhost:8001 \\
+        python benchmarks/bench_storage_engines.py [--items 10000] [--calls 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Both engines must point at scratch storage before they are imported
+SCRATCH_DIR = tempfile.TemporaryDirectory()
+os.environ['SQLITE_PATH'] = os.path.join(SCRATCH_DIR.name, 'bench.db')
+for table in ('USERS', 'EXPENSES', 'ROLLUPS', 'CHANGES'):
+    os.environ.setdefault(f'DYNAMODB_{table}_TABLE', f'budgify-bench-storage-{table.lower()}')
+
+from api import database, sqlite_database  # noqa: E402
+
+USER_ID = 1
+YEAR, MONTH = 2024, 6
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Other']
+
+
+def history(count, seed=42):
+    """count expenses for one user, spread over 2021-2025"""
+    rng = random.Random(seed)
+    return [{
+        'id': database.generate_id(),
+        'user_id': USER_ID,
+        'amount': rng.randrange(100, 25000) / 100,
+        'category': rng.choice(CATEGORIES),
+        'description': 'Benchmark expense',
+        'date': f"{rng.randint(2021, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        'created_at': '2025-01-01T00:00:00Z',
+    } for _ in range(count)]
+
+
+def load(engine, expenses):
+    for start in range(0, len(expenses), database.BATCH_WRITE_SIZE):
+        engine.batch_create_expenses(expenses[start:start + database.BATCH_WRITE_SIZE])
+
+
+def operations(engine):
+    start_date, end_date = database.month_date_range(YEAR, MONTH)
+
+    def create():
+        engine.create_expense({
+            'id': database.generate_id(),
+            'user_id': USER_ID,
+            'amount': 12.5,
+            'category': 'Food',
+            'description': 'Benchmark write',
+            'date': f'{YEAR}-{MONTH:02d}-15',
+            'created_at': '2025-01-01T00:00:00Z',
+        })
+
+    return [
+        ('recent', lambda: engine.get_recent_expenses(USER_ID, 20)),
+        ('page', lambda: engine.get_expense_page(USER_ID, 50)),
+        ('month', lambda: engine.get_expense_records_by_date_range(USER_ID, start_date, end_date)),
+        ('rollup', lambda: engine.get_monthly_rollup(USER_ID, YEAR, MONTH)),
+        ('create', create),
+    ]
+
+
+def comparable(operation, result):
+    """Drop what legitimately differs between engines: page cursors are
+    engine-specific and ExpenseRecord compares by identity"""
+    if operation == 'page':
+        return result[0]
+    if operation == 'month':
+        return [(r.id, r.date_key, r.cents, r.category) for r in result]
+    return result
+
+
+def measure(calls, func):
+    """Return (p50 ms, p99 ms)"""
+    func()
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def create_dynamodb_tables():
+    from setup_dynamodb import (
+        client,
+        create_changes_table,
+        create_expenses_table,
+        create_rollups_table,
+        create_users_table,
+    )
+    create_users_table()
+    create_expenses_table(database.TABLES['expenses'])
+    create_rollups_table()
+    create_changes_table()
+    for name in ('users', 'expenses', 'rollups', 'changes'):
+        client.get_waiter('table_exists').wait(TableName=database.TABLES[name])
+
+
+def delete_dynamodb_tables():
+    from setup_dynamodb import client
+    for name in ('users', 'expenses', 'rollups', 'changes'):
+        client.delete_table(TableName=database.TABLES[name])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10_000, help='expenses in the user history')
+    parser.add_argument('--calls', type=int, default=200, help='timed calls per operation and engine')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch DynamoDB tables')
+    args = parser.parse_args()
+
+    engines = [('sqlite', sqlite_database)]
+    if os.getenv('DYNAMODB_ENDPOINT_URL'):
+        create_dynamodb_tables()
+        engines.append(('dynamodb', database))
+    else:
+        print("DYNAMODB_ENDPOINT_URL is not set: timing SQLite only\n")
+
+    try:
+        expenses = history(args.items)
+        for _, engine in engines:
+            load(engine, expenses)
+
+        # Every engine must return the same data before the writes start
+        reads = [
+            [comparable(name, func()) for name, func in operations(engine) if name != 'create']
+            for _, engine in engines
+        ]
+        assert all(result == reads[0] for result in reads[1:]), "engines returned different data"
+
+        print(f"{'operation':<10} {'engine':<10} {'p50':>9} {'p99':>9}")
+        for index in range(len(operations(database))):
+            for name, engine in engines:
+                operation, func = operations(engine)[index]
+                p50, p99 = measure(args.calls, func)
+                print(f"{operation:<10} {name:<10} {p50:>7.2f}ms {p99:>7.2f}ms")
+    finally:
+        if len(engines) > 1 and not args.keep:
+            delete_dynamodb_tables()
+        SCRATCH_DIR.cleanup()
+
+
+if __name__ == '__main__':
+    main()
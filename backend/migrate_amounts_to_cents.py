@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+One-time migration of stored amounts to integer cents.
+
+Expenses and recurring costs used to store `amount`, and budget settings
+`monthly_budget`, as DynamoDB decimals. They are now stored as integer cents
+(`amount_cents`, `monthly_budget_cents`), and monthly rollup counters are
+cents as well. This script converts every item that still holds a decimal
+amount; converted items are skipped, so it is safe to rerun.
+
+The API reads both forms of expense, recurring cost and budget items, but
+rollup counters are only correct once rebuilt. Deploy, run this script, then
+run `python reconcile_rollups.py --fix` to rebuild the rollups in cents.
+
+Usage:
+    python migrate_amounts_to_cents.py [--dry-run]
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables before the API modules read them
+load_dotenv()
+
+from botocore.exceptions import ClientError  # noqa: E402
+from api.database import (  # noqa: E402
+    expenses_table,
+    recurring_table,
+    budget_table,
+    EXPENSE_CODEC,
+    RECURRING_CODEC,
+    BUDGET_CODEC
+)
+from api.records import to_cents  # noqa: E402
+
+
+def scan_items(table):
+    """Yield every item in a table, following pagination"""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def convert_table(table, codec, dry_run):
+    """Replace decimal money attributes with integer cents on every item"""
+    key_names = [key['AttributeName'] for key in table.key_schema]
+    converted = skipped = 0
+    for item in scan_items(table):
+        legacy = sorted(name for name in codec.money if name in item)
+        if not legacy:
+            skipped += 1
+            continue
+
+        if not dry_run:
+            names = {f"#old{i}": name for i, name in enumerate(legacy)}
+            names.update({f"#new{i}": f"{name}_cents" for i, name in enumerate(legacy)})
+            values = {f":cents{i}": to_cents(item[name]) for i, name in enumerate(legacy)}
+            try:
+                table.update_item(
+                    Key={name: item[name] for name in key_names},
+                    UpdateExpression=(
+                        'SET ' + ', '.join(f"#new{i} = :cents{i}" for i in range(len(legacy))) +
+                        ' REMOVE ' + ', '.join(f"#old{i}" for i in range(len(legacy)))
+                    ),
+                    # Leave items alone that were rewritten since the scan
+                    ConditionExpression=' AND '.join(f"attribute_exists(#old{i})" for i in range(len(legacy))),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values
+                )
+            except ClientError as exc:
+                if exc.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                skipped += 1
+                continue
+        converted += 1
+    print(f"✓ {table.name}: converted {converted} items ({skipped} already in cents)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert stored amounts to integer cents')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print("(dry run - no changes will be written)")
+
+    convert_table(expenses_table, EXPENSE_CODEC, args.dry_run)
+    convert_table(recurring_table, RECURRING_CODEC, args.dry_run)
+    convert_table(budget_table, BUDGET_CODEC, args.dry_run)
+
+    print("\nNow rebuild the monthly rollups in cents: python reconcile_rollups.py --fix")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+One-time migration for the expenses date index.
+
+Expenses are range-queried through the `user-date-index` local secondary
+index, keyed on a normalized `date_key` attribute; `date_ts` holds the same
+instant as epoch seconds. Local secondary indexes can only be defined when a
+table is created, so:
+
+- If the expenses table already has the index, `date_key` and `date_ts` are
+  backfilled in place.
+- Otherwise a new table with the index is created (default: `<table>-v2`) and
+  every expense is copied into it with `date_key` and `date_ts` set. Point
+  DYNAMODB_EXPENSES_TABLE at the new table once the copy has finished.
+
+The copy is a single scan of the old table, so expenses created, edited or
+deleted while it runs, or before the API is switched to the new table, are
+lost or resurrected. Stop the API (no writes to the expenses table) before
+copying and keep it stopped until it is redeployed on the new table; the
+copy refuses to run without --writes-stopped. The in-place backfill is safe
+while the API runs.
+
+Usage:
+    python migrate_expenses_date_index.py [--target TABLE] [--dry-run] [--writes-stopped]
+"""
+
+import argparse
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables before the API modules read them
+load_dotenv()
+
+from api.database import (  # noqa: E402
+    dynamodb,
+    TABLES,
+    EXPENSES_DATE_INDEX,
+    date_attributes
+)
+from setup_dynamodb import client, create_expenses_table  # noqa: E402
+
+
+def scan_items(table):
+    """Yield every item in a table, following pagination"""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def has_date_index(table_name):
+    """Check whether a table already has the date index"""
+    description = client.describe_table(TableName=table_name)['Table']
+    indexes = description.get('LocalSecondaryIndexes', [])
+    return any(index['IndexName'] == EXPENSES_DATE_INDEX for index in indexes)
+
+
+def backfill_in_place(table_name, dry_run):
+    """Set date_key and date_ts on items of a table that already has the index"""
+    table = dynamodb.Table(table_name)
+    updated = skipped = 0
+    for item in scan_items(table):
+        attributes = date_attributes(item['date'])
+        if item.get('date_key') == attributes['date_key'] and item.get('date_ts') == attributes['date_ts']:
+            skipped += 1
+            continue
+        if not dry_run:
+            table.update_item(
+                Key={'user_id': item['user_id'], 'id': item['id']},
+                UpdateExpression='SET date_key = :date_key, date_ts = :date_ts',
+                ExpressionAttributeValues={
+                    ':date_key': attributes['date_key'],
+                    ':date_ts': attributes['date_ts']
+                }
+            )
+        updated += 1
+    print(f"✓ Backfilled {updated} expenses ({skipped} already up to date)")
+
+
+def copy_to_new_table(source_name, target_name, dry_run):
+    """Copy expenses into a new table that has the index"""
+    if not dry_run:
+        create_expenses_table(target_name)
+        client.get_waiter('table_exists').wait(TableName=target_name)
+
+    source = dynamodb.Table(source_name)
+    target = dynamodb.Table(target_name)
+    copied = 0
+    with target.batch_writer() as batch:
+        for item in scan_items(source):
+            item.update(date_attributes(item['date']))
+            if not dry_run:
+                batch.put_item(Item=item)
+            copied += 1
+    print(f"✓ Copied {copied} expenses from {source_name} to {target_name}")
+    print(f"\nSet DYNAMODB_EXPENSES_TABLE={target_name} and redeploy the API.")
+    print(f"Keep the API stopped until then: writes to {source_name} are not copied.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate expenses to the date-sorted index')
+    parser.add_argument('--target', help='table to create when the source lacks the index')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    parser.add_argument(
+        '--writes-stopped',
+        action='store_true',
+        help='confirm the API is stopped, so nothing writes to the expenses table during a copy'
+    )
+    args = parser.parse_args()
+
+    source_name = TABLES['expenses']
+    print(f"Migrating expenses table: {source_name}")
+    if args.dry_run:
+        print("(dry run - no changes will be written)")
+
+    if has_date_index(source_name):
+        backfill_in_place(source_name, args.dry_run)
+    else:
+        if not (args.dry_run or args.writes_stopped):
+            print(
+                f"{source_name} has no date index, so its expenses must be copied to a new table.\n"
+                "Writes made during the copy, or before the API is redeployed on the new table,\n"
+                "would be lost. Stop the API, then rerun with --writes-stopped."
+            )
+            sys.exit(1)
+        copy_to_new_table(source_name, args.target or f"{source_name}-v2", args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
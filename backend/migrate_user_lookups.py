@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+One-time migration to email/username uniqueness markers.
+
+Registration used to check the `email-index` and `username-index` GSIs on
+the users table before writing the user. It now writes the user together
+with `EMAIL#<email>` and `USERNAME#<username>` marker items in the user
+lookups table, in one transaction, and login reads the email marker. This
+script creates the lookups table and writes the markers for every existing
+user. Markers that already belong to the user are refreshed, so it is safe
+to rerun; a marker held by a different user (a duplicate that slipped past
+the old checks) is reported and left alone.
+
+Run it before deploying, and once more afterwards to pick up users who
+registered in between. With --drop-indexes the two GSIs are then deleted
+from the users table.
+
+Usage:
+    python migrate_user_lookups.py [--dry-run] [--drop-indexes]
+"""
+
+import argparse
+import time
+from dotenv import load_dotenv
+
+# Load environment variables before the API modules read them
+load_dotenv()
+
+from botocore.exceptions import ClientError  # noqa: E402
+from api.database import (  # noqa: E402
+    users_table,
+    user_lookups_table,
+    TABLES,
+    email_lookup_key,
+    username_lookup_key
+)
+from setup_dynamodb import client, create_user_lookups_table  # noqa: E402
+
+LEGACY_USER_INDEXES = ('email-index', 'username-index')
+INDEX_POLL_SECONDS = 5
+
+
+def scan_items(table):
+    """Yield every item in a table, following pagination"""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def put_marker(marker):
+    """Write a marker unless another user holds it; returns False on a conflict"""
+    try:
+        user_lookups_table.put_item(
+            Item=marker,
+            ConditionExpression='attribute_not_exists(#key) OR user_id = :user_id',
+            ExpressionAttributeNames={'#key': 'key'},
+            ExpressionAttributeValues={':user_id': marker['user_id']}
+        )
+    except ClientError as exc:
+        if exc.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+    return True
+
+
+def backfill_markers(dry_run):
+    """Write the email and username markers for every user"""
+    written = conflicts = 0
+    for user in scan_items(users_table):
+        markers = [
+            {
+                'key': email_lookup_key(user['email']),
+                'user_id': user['id'],
+                'username': user['username'],
+                'email': user['email'],
+                'password': user['password'],
+            },
+            {'key': username_lookup_key(user['username']), 'user_id': user['id']},
+        ]
+        for marker in markers:
+            if dry_run or put_marker(marker):
+                written += 1
+            else:
+                conflicts += 1
+                print(f"⚠ {marker['key']} already belongs to another user (user {user['id']} skipped)")
+    print(f"✓ {TABLES['user_lookups']}: wrote {written} markers ({conflicts} conflicts)")
+
+
+def user_indexes():
+    description = client.describe_table(TableName=TABLES['users'])['Table']
+    return {index['IndexName'] for index in description.get('GlobalSecondaryIndexes', [])}
+
+
+def drop_indexes(dry_run):
+    """Delete the legacy GSIs from the users table, one at a time"""
+    for index_name in LEGACY_USER_INDEXES:
+        if index_name not in user_indexes():
+            continue
+        if not dry_run:
+            client.update_table(
+                TableName=TABLES['users'],
+                GlobalSecondaryIndexUpdates=[{'Delete': {'IndexName': index_name}}]
+            )
+            # DynamoDB allows one index change in flight per table
+            while index_name in user_indexes():
+                time.sleep(INDEX_POLL_SECONDS)
+        print(f"✓ Dropped index {index_name} from {TABLES['users']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill email/username uniqueness markers')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    parser.add_argument('--drop-indexes', action='store_true', help='delete the old email/username GSIs afterwards')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print("(dry run - no changes will be written)")
+    else:
+        create_user_lookups_table()
+        client.get_waiter('table_exists').wait(TableName=TABLES['user_lookups'])
+
+    backfill_markers(args.dry_run)
+    if args.drop_indexes:
+        drop_indexes(args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
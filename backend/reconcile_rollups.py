@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Reconciliation job for the monthly rollups table.
+
+Rebuilds every user's monthly rollups from the raw expenses and reports any
+drift against the stored counters (e.g. from a write that updated an expense
+but failed before its rollup increment). Run with --fix to correct drifted
+rollups; this is also how rollups are backfilled for months written before
+the rollups table existed.
+
+The API keeps writing while the job runs, so a drifted month is fixed from
+a fresh consistent read of the rollup and of that month's expenses, and
+the difference is applied with ADD on condition that the rollup still
+holds the values read. A live write in between fails the condition and the
+month is re-read, so its increment is never overwritten.
+
+Usage:
+    python reconcile_rollups.py [--user-id ID] [--fix]
+"""
+
+import argparse
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+# Load environment variables before the API modules read them
+load_dotenv()
+
+from boto3.dynamodb.conditions import Key  # noqa: E402
+from api.database import (  # noqa: E402
+    EXPENSES_DATE_INDEX,
+    expenses_table,
+    rollups_table,
+    build_monthly_rollups,
+    bump_data_version,
+    month_date_range,
+    normalize_date_key,
+    rollup_update
+)
+from api.records import ExpenseRecord  # noqa: E402
+
+
+def scan_items(table, **kwargs):
+    """Yield every item from a scan or (with KeyConditionExpression) a query"""
+    operation = table.query if 'KeyConditionExpression' in kwargs else table.scan
+    while True:
+        response = operation(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def load_expenses(user_id=None):
+    """Group expense records by user"""
+    kwargs = {'KeyConditionExpression': Key('user_id').eq(user_id)} if user_id else {}
+    by_user = {}
+    for item in scan_items(expenses_table, **kwargs):
+        record = ExpenseRecord.from_item(item)
+        by_user.setdefault(record.user_id, []).append(record)
+    return by_user
+
+
+def load_rollups(user_id=None):
+    """Index stored rollup counters by (user_id, month)"""
+    kwargs = {'KeyConditionExpression': Key('user_id').eq(user_id)} if user_id else {}
+    stored = {}
+    for item in scan_items(rollups_table, **kwargs):
+        key = (int(item.pop('user_id')), item.pop('month'))
+        stored[key] = item
+    return stored
+
+
+def diff_counters(expected, actual):
+    """List counters whose stored value differs from the rebuilt one"""
+    drift = []
+    for attr in sorted(set(expected) | set(actual)):
+        want = expected.get(attr, Decimal(0))
+        have = actual.get(attr, Decimal(0))
+        if want != have:
+            drift.append(f"{attr}: stored {have}, expected {want}")
+    return drift
+
+
+def unchanged_condition(counters):
+    """Condition that a rollup still holds exactly the counters read"""
+    if not counters:
+        return 'attribute_not_exists(user_id)', {}, {}
+    names = {f"#cond{i}": attr for i, attr in enumerate(counters)}
+    values = {f":cond{i}": value for i, value in enumerate(counters.values())}
+    return ' AND '.join(f"#cond{i} = :cond{i}" for i in range(len(counters))), names, values
+
+
+def fix_rollup(user_id, month, max_attempts=5):
+    """Apply the difference between a month's expenses and its stored rollup"""
+    key = {'user_id': user_id, 'month': month}
+    start, end = month_date_range(*map(int, month.split('-')))
+    for _ in range(max_attempts):
+        # Rollup first: a write landing after this read changes it and fails the condition
+        item = rollups_table.get_item(Key=key, ConsistentRead=True).get('Item', {})
+        stored = {attr: value for attr, value in item.items() if attr not in key}
+        expenses = scan_items(
+            expenses_table,
+            IndexName=EXPENSES_DATE_INDEX,
+            KeyConditionExpression=Key('user_id').eq(user_id) &
+            Key('date_key').between(normalize_date_key(start), normalize_date_key(end)),
+            ConsistentRead=True
+        )
+        expected = build_monthly_rollups(map(ExpenseRecord.from_item, expenses)).get(month, {})
+        condition, names, values = unchanged_condition(stored)
+
+        try:
+            if not expected:
+                if stored:
+                    rollups_table.delete_item(
+                        Key=key, ConditionExpression=condition,
+                        ExpressionAttributeNames=names, ExpressionAttributeValues=values
+                    )
+                return
+            deltas = {attr: expected.get(attr, 0) - int(stored.get(attr, 0)) for attr in set(expected) | set(stored)}
+            params = rollup_update(user_id, month, deltas)
+            if params:
+                params['ConditionExpression'] = condition
+                params['ExpressionAttributeNames'].update(names)
+                params['ExpressionAttributeValues'].update(values)
+                rollups_table.update_item(**params)
+            return
+        except ClientError as exc:
+            if exc.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+    raise RuntimeError(f"Rollup for user {user_id} {month} kept changing; run the job again")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild monthly rollups and report drift')
+    parser.add_argument('--user-id', type=int, help='only reconcile this user')
+    parser.add_argument('--fix', action='store_true', help='overwrite drifted rollups')
+    args = parser.parse_args()
+
+    expected = {}
+    for user_id, expenses in load_expenses(args.user_id).items():
+        for month, counters in build_monthly_rollups(expenses).items():
+            expected[(user_id, month)] = counters
+    stored = load_rollups(args.user_id)
+
+    drifted = 0
+    fixed_users = set()
+    for key in sorted(set(expected) | set(stored)):
+        drift = diff_counters(expected.get(key, {}), stored.get(key, {}))
+        if not drift:
+            continue
+
+        drifted += 1
+        user_id, month = key
+        print(f"⚠ user {user_id} {month}:")
+        for line in drift:
+            print(f"    {line}")
+
+        if args.fix:
+            fix_rollup(user_id, month)
+            fixed_users.add(user_id)
+
+    # Summaries changed, so cached responses must be refetched
+    for user_id in fixed_users:
+        bump_data_version(user_id)
+
+    print(f"\nChecked {len(set(expected) | set(stored))} rollups, {drifted} drifted")
+    if drifted and args.fix:
+        print("✓ Drifted rollups rebuilt from raw expenses")
+
+
+if __name__ == '__main__':
+    main()
@@ -16,20 +16,25 @@ client = boto3.client(
     'dynamodb',
     region_name=os.getenv('AWS_REGION', 'us-east-1'),
     aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+    endpoint_url=os.getenv('DYNAMODB_ENDPOINT_URL')
 )
 
 # Table names
 TABLES = {
     'users': os.getenv('DYNAMODB_USERS_TABLE', 'budgify-users'),
+    'user_lookups': os.getenv('DYNAMODB_USER_LOOKUPS_TABLE', 'budgify-user-lookups'),
     'expenses': os.getenv('DYNAMODB_EXPENSES_TABLE', 'budgify-expenses'),
     'recurring': os.getenv('DYNAMODB_RECURRING_TABLE', 'budgify-recurring-costs'),
     'budget': os.getenv('DYNAMODB_BUDGET_TABLE', 'budgify-budget-settings'),
+    'rollups': os.getenv('DYNAMODB_ROLLUPS_TABLE', 'budgify-monthly-rollups'),
+    'changes': os.getenv('DYNAMODB_CHANGES_TABLE', 'budgify-changes'),
+    'revoked_tokens': os.getenv('DYNAMODB_REVOKED_TOKENS_TABLE', 'budgify-revoked-tokens'),
 }
 
 
 def create_users_table():
-    """Create the users table with email and username indexes"""
+    """Create the users table"""
     try:
         client.create_table(
             TableName=TABLES['users'],
@@ -37,33 +42,7 @@ def create_users_table():
                 {'AttributeName': 'id', 'KeyType': 'HASH'}
             ],
             AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'N'},
-                {'AttributeName': 'email', 'AttributeType': 'S'},
-                {'AttributeName': 'username', 'AttributeType': 'S'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'email-index',
-                    'KeySchema': [
-                        {'AttributeName': 'email', 'KeyType': 'HASH'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                },
-                {
-                    'IndexName': 'username-index',
-                    'KeySchema': [
-                        {'AttributeName': 'username', 'KeyType': 'HASH'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
+                {'AttributeName': 'id', 'AttributeType': 'N'}
             ],
             ProvisionedThroughput={
                 'ReadCapacityUnits': 5,
@@ -75,27 +54,59 @@ def create_users_table():
         print(f"⚠ Table already exists: {TABLES['users']}")
 
 
-def create_expenses_table():
-    """Create the expenses table"""
+def create_user_lookups_table():
+    """Create the table of EMAIL#/USERNAME# uniqueness markers"""
+    try:
+        client.create_table(
+            TableName=TABLES['user_lookups'],
+            KeySchema=[
+                {'AttributeName': 'key', 'KeyType': 'HASH'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'key', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print(f"✓ Created table: {TABLES['user_lookups']}")
+    except client.exceptions.ResourceInUseException:
+        print(f"⚠ Table already exists: {TABLES['user_lookups']}")
+
+
+def create_expenses_table(table_name=TABLES['expenses']):
+    """Create the expenses table with a date-sorted local secondary index"""
     try:
         client.create_table(
-            TableName=TABLES['expenses'],
+            TableName=table_name,
             KeySchema=[
                 {'AttributeName': 'user_id', 'KeyType': 'HASH'},
                 {'AttributeName': 'id', 'KeyType': 'RANGE'}
             ],
             AttributeDefinitions=[
                 {'AttributeName': 'user_id', 'AttributeType': 'N'},
-                {'AttributeName': 'id', 'AttributeType': 'N'}
+                {'AttributeName': 'id', 'AttributeType': 'N'},
+                {'AttributeName': 'date_key', 'AttributeType': 'S'}
+            ],
+            LocalSecondaryIndexes=[
+                {
+                    'IndexName': 'user-date-index',
+                    'KeySchema': [
+                        {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                        {'AttributeName': 'date_key', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             ProvisionedThroughput={
                 'ReadCapacityUnits': 5,
                 'WriteCapacityUnits': 5
             }
         )
-        print(f"✓ Created table: {TABLES['expenses']}")
+        print(f"✓ Created table: {table_name}")
     except client.exceptions.ResourceInUseException:
-        print(f"⚠ Table already exists: {TABLES['expenses']}")
+        print(f"⚠ Table already exists: {table_name}")
 
 
 def create_recurring_table():
@@ -142,15 +153,102 @@ def create_budget_table():
         print(f"⚠ Table already exists: {TABLES['budget']}")
 
 
+def create_rollups_table():
+    """Create the monthly rollups table (one item per user per YYYY-MM)"""
+    try:
+        client.create_table(
+            TableName=TABLES['rollups'],
+            KeySchema=[
+                {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'month', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'user_id', 'AttributeType': 'N'},
+                {'AttributeName': 'month', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print(f"✓ Created table: {TABLES['rollups']}")
+    except client.exceptions.ResourceInUseException:
+        print(f"⚠ Table already exists: {TABLES['rollups']}")
+
+
+def create_changes_table():
+    """Create the sync change log table (time-sortable seq per user, expired by TTL)"""
+    try:
+        client.create_table(
+            TableName=TABLES['changes'],
+            KeySchema=[
+                {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'seq', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'user_id', 'AttributeType': 'N'},
+                {'AttributeName': 'seq', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print(f"✓ Created table: {TABLES['changes']}")
+    except client.exceptions.ResourceInUseException:
+        print(f"⚠ Table already exists: {TABLES['changes']}")
+        return
+
+    client.get_waiter('table_exists').wait(TableName=TABLES['changes'])
+    client.update_time_to_live(
+        TableName=TABLES['changes'],
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'}
+    )
+    print(f"✓ Enabled TTL on {TABLES['changes']}.expires_at")
+
+
+def create_revoked_tokens_table():
+    """Create the logout denylist table (one item per revoked jti, expired by TTL)"""
+    try:
+        client.create_table(
+            TableName=TABLES['revoked_tokens'],
+            KeySchema=[
+                {'AttributeName': 'jti', 'KeyType': 'HASH'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'jti', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print(f"✓ Created table: {TABLES['revoked_tokens']}")
+    except client.exceptions.ResourceInUseException:
+        print(f"⚠ Table already exists: {TABLES['revoked_tokens']}")
+        return
+
+    client.get_waiter('table_exists').wait(TableName=TABLES['revoked_tokens'])
+    client.update_time_to_live(
+        TableName=TABLES['revoked_tokens'],
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'}
+    )
+    print(f"✓ Enabled TTL on {TABLES['revoked_tokens']}.expires_at")
+
+
 def main():
     """Main function to create all tables"""
     print("Setting up DynamoDB tables for Budgify...")
     print(f"Region: {os.getenv('AWS_REGION', 'us-east-1')}\n")
 
     create_users_table()
+    create_user_lookups_table()
     create_expenses_table()
     create_recurring_table()
     create_budget_table()
+    create_rollups_table()
+    create_changes_table()
+    create_revoked_tokens_table()
 
     print("\n✓ DynamoDB setup complete!")
     print("\nNote: Tables may take a few moments to become active.")
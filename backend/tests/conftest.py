@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+import pytest
+
+# The SQLite engine reads its path at import, so point it at scratch storage first
+_scratch = tempfile.TemporaryDirectory()
+os.environ['SQLITE_PATH'] = os.path.join(_scratch.name, 'test.db')
+
+from api import database, sqlite_database  # noqa: E402
+from api.database import generate_id  # noqa: E402
+
+
+@pytest.fixture(params=['sqlite', 'dynamodb'])
+def engine(request):
+    """The storage engine under test; every test works on its own user"""
+    if request.param == 'dynamodb':
+        return request.getfixturevalue('dynamodb')
+    return sqlite_database
+
+
+@pytest.fixture(scope='session')
+def dynamodb():
+    """The DynamoDB engine on moto's in-memory DynamoDB, with the tables from setup_dynamodb"""
+    moto = pytest.importorskip('moto')
+    with moto.mock_aws():
+        import setup_dynamodb
+        setup_dynamodb.main()
+        yield database
+
+
+@pytest.fixture
+def dynamodb_user_id(dynamodb):
+    user_id = generate_id()
+    dynamodb.create_user({
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'password': 'hash',
+        'created_at': '2024-01-01T00:00:00Z',
+    })
+    return user_id
+
+
+@pytest.fixture
+def user_id(engine):
+    user_id = generate_id()
+    engine.create_user({
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'password': 'hash',
+        'created_at': '2024-01-01T00:00:00Z',
+    })
+    return user_id
+
+
+@pytest.fixture(scope='session')
+def client(dynamodb):
+    """The API, on the DynamoDB engine"""
+    from fastapi.testclient import TestClient
+    from api.index import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers(client):
+    name = f'user{generate_id()}'
+    response = client.post('/auth/register', json={'username': name, 'email': f'{name}@example.com', 'password': 'pw'})
+    assert response.status_code == 200, response.text
+    return {'Authorization': f"Bearer {response.json()['token']}"}
@@ -0,0 +1,142 @@
+"""
+Conditional writes without read-before-write on the DynamoDB engine (moto):
+bulk edits, and updates that lose a race to a concurrent edit.
+"""
+
+import pytest
+
+from api import database
+from api.database import BULK_EDIT_MAX_EXPENSES, ItemNotFoundError, generate_id
+
+
+def expense(user_id, date='2024-05-10', amount=12.5, category='Food'):
+    return {
+        'id': generate_id(),
+        'user_id': user_id,
+        'amount': amount,
+        'category': category,
+        'description': 'Lunch',
+        'date': date,
+        'created_at': '2024-05-10T12:00:00Z',
+    }
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(database.time, 'sleep', lambda seconds: None)
+
+
+def test_a_missing_expense_cancels_the_whole_edit(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    kept = dynamodb.create_expense(expense(user_id))['id']
+    version = dynamodb.get_data_version(user_id)
+    rollup = dynamodb.get_monthly_rollup(user_id, 2024, 5)
+
+    with pytest.raises(ItemNotFoundError):
+        dynamodb.bulk_edit_expenses(user_id, {kept: {'amount': 1.0}}, [generate_id()])
+
+    assert dynamodb.get_expense(user_id, kept)['amount'] == 12.5
+    assert dynamodb.get_data_version(user_id) == version
+    assert dynamodb.get_monthly_rollup(user_id, 2024, 5) == rollup
+
+
+def test_an_edit_commits_its_rollups_change_log_and_version_together(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    moved, changed, deleted = (dynamodb.create_expense(expense(user_id))['id'] for _ in range(3))
+    version = dynamodb.get_data_version(user_id)
+    seq = dynamodb.get_changes(user_id, '0', 100)[0][-1]['seq']
+
+    updated = dynamodb.bulk_edit_expenses(
+        user_id, {moved: {'date': '2024-06-01'}, changed: {'amount': 2.0, 'category': 'Fun'}}, [deleted]
+    )
+
+    assert {item['id']: (item['date'], item['amount']) for item in updated} == {
+        moved: ('2024-06-01', 12.5), changed: ('2024-05-10', 2.0),
+    }
+    may, june = dynamodb.get_monthly_rollup(user_id, 2024, 5), dynamodb.get_monthly_rollup(user_id, 2024, 6)
+    assert (may['total_cents'], may['expense_count'], may['categories']) == (200, 1, {'Fun': 200})
+    assert (june['total_cents'], june['expense_count']) == (1250, 1)
+    assert dynamodb.get_data_version(user_id) == version + 1
+    changes, _ = dynamodb.get_changes(user_id, seq, 100)
+    assert sorted((change['id'], change['op']) for change in changes) == sorted(
+        [(moved, 'upsert'), (changed, 'upsert'), (deleted, 'delete')]
+    )
+
+
+def test_an_edit_that_loses_a_race_is_reread_and_retried(dynamodb, dynamodb_user_id, monkeypatch, no_backoff):
+    user_id = dynamodb_user_id
+    expense_id = dynamodb.create_expense(expense(user_id, amount=10.0))['id']
+    read = database._batch_get_expenses
+    reads = []
+
+    def read_then_concurrent_edit(user_id, expense_ids):
+        current = read(user_id, expense_ids)
+        reads.append(expense_ids)
+        if len(reads) == 1:
+            # Another request changes the amount between this read and the transaction
+            dynamodb.update_expense(user_id, expense_id, {'amount': 30.0})
+        return current
+
+    monkeypatch.setattr(database, '_batch_get_expenses', read_then_concurrent_edit)
+    dynamodb.bulk_edit_expenses(user_id, {expense_id: {'category': 'Fun'}}, [])
+
+    # The stale read, the concurrent edit's own read, then the re-read
+    assert len(reads) == 3
+    assert dynamodb.get_expense(user_id, expense_id)['amount'] == 30.0
+    # The rollup took out the 30.00 the edit replaced, not the stale 10.00
+    rollup = dynamodb.get_monthly_rollup(user_id, 2024, 5)
+    assert (rollup['total_cents'], rollup['categories']) == (3000, {'Fun': 3000})
+
+
+def test_a_recurring_cost_update_that_loses_a_race_is_retried(dynamodb, dynamodb_user_id, monkeypatch, no_backoff):
+    user_id = dynamodb_user_id
+    cost = dynamodb.create_recurring_cost({
+        'id': generate_id(), 'user_id': user_id, 'name': 'Rent', 'amount': 800.0, 'category': 'Housing',
+        'frequency': 'monthly', 'start_date': '2024-01-01', 'created_at': 'now',
+    })
+    transact_write = database._transact_write
+    attempts = []
+
+    def renamed_first(operations):
+        attempts.append(operations)
+        if len(attempts) == 1:
+            database.recurring_table.update_item(
+                Key={'user_id': user_id, 'id': cost['id']},
+                UpdateExpression='SET #name = :name',
+                ExpressionAttributeNames={'#name': 'name'},
+                ExpressionAttributeValues={':name': 'Mortgage'}
+            )
+        transact_write(operations)
+
+    monkeypatch.setattr(database, '_transact_write', renamed_first)
+    updated = dynamodb.update_recurring_cost(user_id, cost['id'], {'amount': 900.0})
+
+    assert len(attempts) == 2
+    # The change log and the response hold the concurrent rename, not the stale name
+    assert (updated['name'], updated['amount']) == ('Mortgage', 900.0)
+    assert dynamodb.get_changes(user_id, '0', 100)[0][-1]['data']['name'] == 'Mortgage'
+
+
+def test_bulk_edit_endpoint(client, auth_headers):
+    created = [
+        client.post('/expenses/', json={'amount': 5, 'category': 'Food', 'date': '2024-05-01'}, headers=auth_headers)
+        for _ in range(2)
+    ]
+    first, second = (response.json()['id'] for response in created)
+
+    missing = client.post('/expenses/bulk-edit', json={'deletes': [first, generate_id()]}, headers=auth_headers)
+    assert missing.status_code == 404
+    repeated = client.post('/expenses/bulk-edit', json={'deletes': [first, first]}, headers=auth_headers)
+    assert repeated.status_code == 400
+    too_many = client.post(
+        '/expenses/bulk-edit', json={'deletes': [generate_id() for _ in range(BULK_EDIT_MAX_EXPENSES + 1)]},
+        headers=auth_headers
+    )
+    assert too_many.status_code == 400
+
+    response = client.post(
+        '/expenses/bulk-edit', json={'updates': [{'id': first, 'amount': 7}], 'deletes': [second]}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [item['amount'] for item in response.json()['updated']] == [7]
+    assert [item['id'] for item in client.get('/expenses/', headers=auth_headers).json()] == [first]
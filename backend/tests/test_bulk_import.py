@@ -0,0 +1,53 @@
+import asyncio
+
+from botocore.exceptions import ClientError
+
+from api import expenses
+
+
+def csv_body(rows):
+    lines = ['amount,category,date,description']
+    lines.extend(f'{row + 1},Food,2024-05-{row % 28 + 1:02d},Row {row + 1}' for row in range(rows))
+    return '\n'.join(lines).encode()
+
+
+def post_csv(client, headers, body):
+    return client.post('/expenses/bulk', content=body, headers={**headers, 'Content-Type': 'text/csv'})
+
+
+def test_every_row_is_reported(client, auth_headers):
+    response = post_csv(client, auth_headers, csv_body(3) + b'\nnot-a-number,Food,2024-05-01,Bad')
+    assert response.status_code == 200
+    result = response.json()
+    assert (result['created'], result['failed']) == (3, 1)
+    assert [row['status'] for row in result['results']] == ['created', 'created', 'created', 'error']
+    assert len(client.get('/expenses/', headers=auth_headers).json()) == 3
+
+
+def test_a_failed_batch_is_reported_and_the_import_goes_on(client, auth_headers, monkeypatch):
+    write = expenses.batch_create_expenses
+    calls = []
+    # moto's TransactWriteItems is not thread-safe, so the batches take turns
+    one_at_a_time = asyncio.Lock()
+
+    async def throttled_second_batch(batch):
+        calls.append(len(batch))
+        if len(calls) == 2:
+            raise ClientError(
+                {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Slow down'}},
+                'TransactWriteItems'
+            )
+        async with one_at_a_time:
+            return await write(batch)
+
+    monkeypatch.setattr(expenses, 'batch_create_expenses', throttled_second_batch)
+    response = post_csv(client, auth_headers, csv_body(60))
+
+    assert response.status_code == 200
+    result = response.json()
+    assert calls == [25, 25, 10]
+    assert (result['created'], result['failed']) == (35, 25)
+    failed = [row for row in result['results'] if row['status'] == 'error']
+    assert [row['row'] for row in failed] == list(range(26, 51))
+    assert failed[0]['error'] == 'Write failed: ProvisionedThroughputExceededException'
+    assert len(client.get('/expenses/', headers=auth_headers).json()) == 35
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+import pytest
+
+from api.database import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    key = {'user_id': 42, 'id': 1234567890123, 'date_key': '2024-05-01'}
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+def test_decimals_from_dynamodb_become_ints():
+    assert decode_cursor(encode_cursor({'id': Decimal('17')})) == {'id': 17}
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor({'date_key': '????>>>>', 'id': 2 ** 52})
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    encode_cursor({'id': 1})[:-2] + '@@',
+    'W10',  # []
+    'eyJpZCI6dHJ1ZX0',  # {"id":true}
+    'eyJpZCI6eyJhIjoxfX0',  # {"id":{"a":1}}
+])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_pages_from_the_api_cover_every_expense_once(client, auth_headers):
+    created = {
+        client.post('/expenses/', json={'amount': day, 'category': 'Food', 'date': f'2024-02-{day:02d}'},
+                    headers=auth_headers).json()['id']
+        for day in range(1, 8)
+    }
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/expenses/', params=params, headers=auth_headers).json()
+        assert len(page['items']) <= 3
+        seen.extend(item['id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == len(created) and set(seen) == created
+    assert seen == [item['id'] for item in client.get('/expenses/', headers=auth_headers).json()]
+
+
+def test_the_api_rejects_a_bad_cursor(client, auth_headers):
+    response = client.get('/expenses/', params={'cursor': 'garbage'}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,122 @@
+"""
+The DynamoDB engine's transactional writes, on moto.
+"""
+
+import pytest
+from botocore.exceptions import ClientError
+
+from api import database
+from api.database import (
+    TRANSACT_WRITE_MAX_RETRIES,
+    DuplicateUserError,
+    ItemNotFoundError,
+    WriteConflictError,
+    generate_id
+)
+
+
+def expense(user_id, date='2024-05-10', amount=12.5, category='Food'):
+    return {
+        'id': generate_id(),
+        'user_id': user_id,
+        'amount': amount,
+        'category': category,
+        'description': 'Lunch',
+        'date': date,
+        'created_at': '2024-05-10T12:00:00Z',
+    }
+
+
+def cancelled(*reasons):
+    return ClientError(
+        {
+            'Error': {'Code': 'TransactionCanceledException', 'Message': 'Transaction cancelled'},
+            'CancellationReasons': [{'Code': reason} for reason in reasons],
+        },
+        'TransactWriteItems'
+    )
+
+
+@pytest.fixture
+def transact_failures(monkeypatch):
+    """Make the next transactions fail with the errors appended to the returned list"""
+    failures = []
+    transact_write = database._transact_write
+
+    def failing(operations):
+        if failures:
+            raise failures.pop(0)
+        transact_write(operations)
+
+    monkeypatch.setattr(database, '_transact_write', failing)
+    monkeypatch.setattr(database.time, 'sleep', lambda seconds: None)
+    return failures
+
+
+@pytest.mark.parametrize('reason', ['ThrottlingError', 'ProvisionedThroughputExceeded', 'TransactionConflict'])
+def test_throttled_and_conflicting_transactions_are_retried(dynamodb, dynamodb_user_id, transact_failures, reason):
+    transact_failures.extend([cancelled(reason, 'None', 'None', 'None'), cancelled('None', reason, 'None', 'None')])
+    created = dynamodb.create_expense(expense(dynamodb_user_id))
+
+    assert not transact_failures
+    assert dynamodb.get_expense(dynamodb_user_id, created['id'])['amount'] == 12.5
+
+
+def test_throttling_that_outlasts_the_retries_is_raised(dynamodb, dynamodb_user_id, transact_failures):
+    transact_failures.extend(cancelled('ThrottlingError') for _ in range(TRANSACT_WRITE_MAX_RETRIES + 1))
+    with pytest.raises(ClientError) as exc:
+        dynamodb.save_budget_settings({'user_id': dynamodb_user_id, 'monthly_limit': 10.0, 'updated_at': 'now'})
+    assert exc.value.response['CancellationReasons'] == [{'Code': 'ThrottlingError'}]
+
+
+def test_lost_races_that_outlast_the_retries_are_a_write_conflict(dynamodb, dynamodb_user_id, transact_failures):
+    transact_failures.extend(cancelled('TransactionConflict') for _ in range(TRANSACT_WRITE_MAX_RETRIES + 1))
+    with pytest.raises(WriteConflictError):
+        dynamodb.save_budget_settings({'user_id': dynamodb_user_id, 'monthly_limit': 10.0, 'updated_at': 'now'})
+
+
+def test_bad_requests_are_not_retried(dynamodb, dynamodb_user_id, transact_failures):
+    transact_failures.extend([cancelled('ValidationError'), cancelled('ValidationError')])
+    with pytest.raises(ClientError):
+        dynamodb.create_expense(expense(dynamodb_user_id))
+    assert len(transact_failures) == 1
+
+
+def test_reasons_map_to_the_operation_that_failed(dynamodb, dynamodb_user_id, transact_failures):
+    cost = dynamodb.create_recurring_cost({
+        'id': generate_id(), 'user_id': dynamodb_user_id, 'name': 'Rent', 'amount': 800.0, 'category': 'Housing',
+        'frequency': 'monthly', 'start_date': '2024-01-01', 'created_at': 'now',
+    })
+
+    # A conflict on the change log entry is a lost race, not a missing item
+    transact_failures.append(cancelled('None', 'TransactionConflict', 'None'))
+    dynamodb.delete_recurring_cost(dynamodb_user_id, cost['id'])
+    assert dynamodb.get_recurring_cost(dynamodb_user_id, cost['id']) is None
+
+    transact_failures.append(cancelled('ConditionalCheckFailed', 'None', 'None'))
+    with pytest.raises(ItemNotFoundError):
+        dynamodb.delete_recurring_cost(dynamodb_user_id, generate_id())
+
+
+@pytest.mark.parametrize('reasons, field', [
+    (('None', 'ConditionalCheckFailed', 'None'), 'email'),
+    (('None', 'None', 'ConditionalCheckFailed'), 'username'),
+])
+def test_user_marker_failures_name_the_taken_field(dynamodb, transact_failures, reasons, field):
+    user_id = generate_id()
+    transact_failures.append(cancelled(*reasons))
+    with pytest.raises(DuplicateUserError) as exc:
+        dynamodb.create_user({
+            'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com', 'password': 'hash',
+        })
+    assert exc.value.field == field
+
+
+def test_a_failed_user_put_is_retried_under_a_new_id(dynamodb, transact_failures):
+    user_id = generate_id()
+    transact_failures.append(cancelled('ConditionalCheckFailed', 'None', 'None'))
+    user = dynamodb.create_user({
+        'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com', 'password': 'hash',
+    })
+    assert user['id'] != user_id
+    assert dynamodb.get_user_by_email(f'user{user_id}@example.com')['id'] == user['id']
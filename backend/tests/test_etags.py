@@ -0,0 +1,46 @@
+import pytest
+
+from api.etags import etag_matches
+
+ETAG = 'W/"5-0123456789abcdef"'
+
+
+@pytest.mark.parametrize('if_none_match', [
+    ETAG,
+    '"5-0123456789abcdef"',
+    f'W/"4-0123456789abcdef", {ETAG}',
+    '*',
+])
+def test_matches(if_none_match):
+    assert etag_matches(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize('if_none_match', [
+    '',
+    'W/"4-0123456789abcdef"',
+    'W/"5-fedcba9876543210"',
+    '"5-0123456789abcdef-extra"',
+])
+def test_does_not_match(if_none_match):
+    assert not etag_matches(if_none_match, ETAG)
+
+
+def test_conditional_get_revalidates_until_the_data_changes(client, auth_headers):
+    first = client.get('/expenses/', headers=auth_headers)
+    etag = first.headers['ETag']
+
+    unchanged = client.get('/expenses/', headers={**auth_headers, 'If-None-Match': etag})
+    assert (unchanged.status_code, unchanged.content, unchanged.headers['ETag']) == (304, b'', etag)
+
+    client.post('/expenses/', json={'amount': 3, 'category': 'Food', 'date': '2024-05-01'}, headers=auth_headers)
+    changed = client.get('/expenses/', headers={**auth_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(changed.json()) == 1
+
+
+def test_etags_differ_per_endpoint(client, auth_headers):
+    expenses = client.get('/expenses/', headers=auth_headers).headers['ETag']
+    recurring = client.get('/recurring/', headers=auth_headers).headers['ETag']
+    assert expenses != recurring
+    assert client.get('/recurring/', headers={**auth_headers, 'If-None-Match': expenses}).status_code == 200
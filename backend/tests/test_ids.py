@@ -0,0 +1,132 @@
+import pytest
+
+from api import ids
+from api.database import generate_id
+from api.ids import MAX_SEQUENCE, MAX_WORKER_ID, SEQUENCE_BITS, WORKER_BITS, IdGenerator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.time() in api.ids; set clock.ms to move it"""
+    class Clock:
+        ms = ids.ID_EPOCH_MS + 1_000
+
+    monkeypatch.setattr(ids.time, 'time', lambda: Clock.ms / 1000)
+    return Clock
+
+
+def test_ids_increase_and_encode_time_and_worker(clock):
+    generator = IdGenerator(7)
+    first = generator.next_id()
+    clock.ms += 5
+    second = generator.next_id()
+
+    assert second > first
+    assert IdGenerator.timestamp_ms(first) == clock.ms - 5
+    assert IdGenerator.timestamp_ms(second) == clock.ms
+    assert (second >> SEQUENCE_BITS) & MAX_WORKER_ID == 7
+
+
+def test_ids_fit_in_53_bits(clock):
+    clock.ms = ids.ID_EPOCH_MS + (1 << 41) - 1
+    assert IdGenerator(MAX_WORKER_ID).next_id() < 2 ** 53
+
+
+def test_sequence_counts_within_a_millisecond(clock):
+    generator = IdGenerator(0)
+    values = [generator.next_id() for _ in range(MAX_SEQUENCE + 1)]
+
+    assert values == sorted(set(values))
+    assert [value & MAX_SEQUENCE for value in values] == list(range(MAX_SEQUENCE + 1))
+    assert {IdGenerator.timestamp_ms(value) for value in values} == {clock.ms}
+
+
+def test_sequence_overflow_borrows_the_next_millisecond(clock):
+    generator = IdGenerator(0)
+    values = [generator.next_id() for _ in range(MAX_SEQUENCE + 2)]
+
+    assert values[-1] > values[-2]
+    assert IdGenerator.timestamp_ms(values[-1]) == clock.ms + 1
+    assert values[-1] & MAX_SEQUENCE == 0
+
+
+def test_clock_going_backwards_keeps_ids_increasing(clock):
+    generator = IdGenerator(3)
+    before = generator.next_id()
+    clock.ms -= 1_000
+    after = [generator.next_id() for _ in range(MAX_SEQUENCE * 2)]
+
+    assert after == sorted(set(after))
+    assert after[0] > before
+
+
+def test_worker_id_out_of_range_is_rejected():
+    with pytest.raises(ValueError):
+        IdGenerator(MAX_WORKER_ID + 1)
+
+
+def test_default_worker_id_honours_the_environment(monkeypatch):
+    monkeypatch.setenv('ID_WORKER_ID', '12')
+    assert ids.default_worker_id() == 12
+
+    monkeypatch.setenv('ID_WORKER_ID', str(1 << WORKER_BITS))
+    with pytest.raises(ValueError):
+        ids.default_worker_id()
+
+
+# Collisions on the DynamoDB engine (moto): two workers that share a worker
+# ID can draw the same ID, and the conditional put must not overwrite
+def expense(user_id, expense_id, amount):
+    return {
+        'id': expense_id, 'user_id': user_id, 'amount': amount, 'category': 'Food',
+        'description': 'Lunch', 'date': '2024-05-10', 'created_at': '2024-05-10T12:00:00Z',
+    }
+
+
+def test_a_taken_expense_id_is_redrawn_without_double_counting(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    taken = dynamodb.create_expense(expense(user_id, generate_id(), 1.0))['id']
+
+    saved = dynamodb.create_expense(expense(user_id, taken, 2.0))
+
+    assert saved['id'] != taken
+    assert dynamodb.get_expense(user_id, taken)['amount'] == 1.0
+    assert dynamodb.get_expense(user_id, saved['id'])['amount'] == 2.0
+    # The cancelled attempt added nothing to the rollup
+    rollup = dynamodb.get_monthly_rollup(user_id, 2024, 5)
+    assert (rollup['total_cents'], rollup['expense_count']) == (300, 2)
+
+
+def test_only_the_colliding_ids_in_a_batch_are_redrawn(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    taken = dynamodb.create_expense(expense(user_id, generate_id(), 1.0))['id']
+    free = generate_id()
+
+    saved = dynamodb.batch_create_expenses([expense(user_id, free, 2.0), expense(user_id, taken, 3.0)])
+
+    assert saved[0] == free and saved[1] != taken
+    assert [dynamodb.get_expense(user_id, expense_id)['amount'] for expense_id in (taken, *saved)] == [1.0, 2.0, 3.0]
+
+
+def test_a_taken_recurring_cost_id_is_redrawn(dynamodb, dynamodb_user_id):
+    cost = {
+        'id': generate_id(), 'user_id': dynamodb_user_id, 'name': 'Rent', 'amount': 800.0, 'category': 'Housing',
+        'frequency': 'monthly', 'start_date': '2024-01-01', 'created_at': 'now',
+    }
+    first = dynamodb.create_recurring_cost(cost)
+    second = dynamodb.create_recurring_cost({**cost, 'name': 'Gym'})
+
+    assert second['id'] != first['id']
+    assert dynamodb.get_recurring_cost(dynamodb_user_id, first['id'])['name'] == 'Rent'
+
+
+def test_a_taken_user_id_is_redrawn_and_the_markers_follow(dynamodb, dynamodb_user_id):
+    user_id = generate_id()
+    user = dynamodb.create_user({
+        'id': dynamodb_user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+        'password': 'hash', 'created_at': '2024-01-01T00:00:00Z',
+    })
+
+    assert user['id'] != dynamodb_user_id
+    assert dynamodb.get_user_by_id(dynamodb_user_id)['username'] == f'user{dynamodb_user_id}'
+    assert dynamodb.get_user_by_email(f'user{user_id}@example.com')['id'] == user['id']
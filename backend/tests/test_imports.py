@@ -0,0 +1,82 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from api.imports import iter_import_rows
+
+
+def make_request(content_type: str, chunks: List[bytes]) -> Request:
+    """A request whose body arrives in the given chunks"""
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in chunks]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {'type': 'http', 'method': 'POST', 'headers': [(b'content-type', content_type.encode())]}
+    return Request(scope, receive)
+
+
+def parse(content_type: str, *chunks: bytes):
+    async def collect():
+        return [row async for row in iter_import_rows(make_request(content_type, list(chunks)))]
+    return asyncio.run(collect())
+
+
+def test_csv_rows_are_keyed_by_the_lowercased_header():
+    rows = parse('text/csv', b'Amount,Category,Date,Description\r\n12.50,Food,2024-05-01,Lunch\r\n')
+    assert rows == [(1, {'amount': '12.50', 'category': 'Food', 'date': '2024-05-01', 'description': 'Lunch'})]
+
+
+def test_csv_lines_split_across_chunks():
+    rows = parse('text/csv; charset=utf-8', b'amount,category,da', b'te\n1,A,2024-01-0', b'1\n2,B,2024-01-02')
+    assert rows == [
+        (1, {'amount': '1', 'category': 'A', 'date': '2024-01-01'}),
+        (2, {'amount': '2', 'category': 'B', 'date': '2024-01-02'}),
+    ]
+
+
+def test_csv_byte_order_mark_and_multibyte_characters_across_chunks():
+    body = '\ufeffamount,category,date\n3,Café,2024-01-01\n'.encode()
+    split = body.index('é'.encode()) + 1
+    rows = parse('text/csv', body[:split], body[split:])
+    assert rows == [(1, {'amount': '3', 'category': 'Café', 'date': '2024-01-01'})]
+
+
+def test_csv_quoted_fields_may_span_lines():
+    rows = parse('text/csv', b'amount,category,date,description\n4,A,2024-01-01,"two\nlines, one field"\n')
+    assert rows == [(1, {'amount': '4', 'category': 'A', 'date': '2024-01-01', 'description': 'two\nlines, one field'})]
+
+
+def test_csv_reports_bad_rows_and_skips_blank_ones():
+    rows = parse('text/csv', b'amount,category,date\n1,A\n\n , , \n2,B,2024-01-02,extra\n3,C,"open\n')
+    assert rows == [
+        (1, 'Expected 3 columns, got 2'),
+        (2, 'Expected 3 columns, got 4'),
+        (3, 'Unterminated quoted field'),
+    ]
+
+
+def test_ndjson_rows_and_invalid_lines():
+    rows = parse('application/x-ndjson', b'{"amount": 1}\n\nnot json\n{"amount": 2}')
+    assert rows == [(1, {'amount': 1}), (2, 'Invalid JSON'), (3, {'amount': 2})]
+
+
+def test_json_array():
+    assert parse('application/json', b'[{"amount": 1}, {"amount": 2}]') == [(1, {'amount': 1}), (2, {'amount': 2})]
+
+
+@pytest.mark.parametrize('body, status', [(b'{"amount": 1}', 400), (b'[', 400)])
+def test_json_body_must_be_an_array(body, status):
+    with pytest.raises(HTTPException) as exc:
+        parse('application/json', body)
+    assert exc.value.status_code == status
+
+
+def test_unsupported_content_type():
+    with pytest.raises(HTTPException) as exc:
+        parse('application/xml', b'<expenses/>')
+    assert exc.value.status_code == 415
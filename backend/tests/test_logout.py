@@ -0,0 +1,41 @@
+"""
+Logout revokes the one token it is called with, on the DynamoDB engine.
+"""
+
+from api import middleware
+from api.database import generate_id
+
+
+def sign_in(client, path, email):
+    body = {'email': email, 'password': 'pw', 'username': email.split('@')[0]}
+    response = client.post(path, json=body)
+    assert response.status_code == 200, response.text
+    return {'Authorization': f"Bearer {response.json()['token']}"}
+
+
+def forget_revocations():
+    """Act as another worker, which only knows what is in storage"""
+    middleware._token_cache.clear()
+    middleware._valid_after_cache.clear()
+    middleware._revoked_jti_cache.clear()
+
+
+def test_logout_ends_only_its_own_session(client):
+    email = f'user{generate_id()}@example.com'
+    session = sign_in(client, '/auth/register', email)
+    other_session = sign_in(client, '/auth/login', email)
+
+    assert client.post('/auth/logout', headers=session).status_code == 200
+    assert client.get('/expenses/', headers=session).status_code == 401
+    assert client.get('/expenses/', headers=other_session).status_code == 200
+
+    forget_revocations()
+    assert client.get('/expenses/', headers=session).status_code == 401
+    assert client.get('/expenses/', headers=other_session).status_code == 200
+
+
+def test_tokens_carry_distinct_ids(client):
+    email = f'user{generate_id()}@example.com'
+    tokens = [sign_in(client, path, email)['Authorization'].split()[1] for path in ('/auth/register', '/auth/login')]
+    first, second = (middleware.decode_token(token) for token in tokens)
+    assert first['jti'] != second['jti']
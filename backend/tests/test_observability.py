@@ -0,0 +1,23 @@
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import EndpointConnectionError
+
+from api.observability import instrument_dynamodb, metrics
+
+
+def test_calls_that_never_get_a_response_are_counted(dynamodb):
+    client = boto3.client('dynamodb', region_name='us-east-1', config=Config(retries={'total_max_attempts': 1}))
+    instrument_dynamodb(client)
+
+    def unreachable(**kwargs):
+        raise EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com')
+
+    client.meta.events.register('before-send.dynamodb', unreachable)
+    before = metrics.snapshot()['dynamodb_calls'].get(('GetItem', 'EndpointConnectionError'), 0)
+
+    # The connection error itself reaches the caller, not one from the instrumentation
+    with pytest.raises(EndpointConnectionError):
+        client.get_item(TableName=dynamodb.TABLES['users'], Key={'id': {'N': '1'}})
+
+    assert metrics.snapshot()['dynamodb_calls'][('GetItem', 'EndpointConnectionError')] == before + 1
@@ -0,0 +1,78 @@
+"""
+Registration with email/username markers on the DynamoDB engine (moto).
+"""
+
+import pytest
+
+from api import database
+from api.database import DuplicateUserError, email_lookup_key, generate_id, username_lookup_key
+
+
+def new_user(**fields):
+    user_id = generate_id()
+    return {
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'password': 'hash',
+        'created_at': '2024-01-01T00:00:00Z',
+        **fields,
+    }
+
+
+def marker(key):
+    return database.user_lookups_table.get_item(Key={'key': key}, ConsistentRead=True).get('Item')
+
+
+def test_the_user_and_both_markers_are_written(dynamodb):
+    user = dynamodb.create_user(new_user())
+
+    assert dynamodb.get_user_by_id(user['id'])['email'] == user['email']
+    assert marker(username_lookup_key(user['username'])) == {
+        'key': username_lookup_key(user['username']), 'user_id': user['id'],
+    }
+    # Login reads only the email marker
+    assert dynamodb.get_user_by_email(user['email']) == {
+        'id': user['id'], 'username': user['username'], 'email': user['email'], 'password': 'hash',
+    }
+
+
+@pytest.mark.parametrize('field', ['email', 'username'])
+def test_a_taken_email_or_username_writes_nothing(dynamodb, dynamodb_user_id, field):
+    taken = dynamodb.get_user_by_id(dynamodb_user_id)[field]
+    user = new_user(**{field: taken})
+
+    with pytest.raises(DuplicateUserError) as exc:
+        dynamodb.create_user(user)
+
+    assert exc.value.field == field
+    assert dynamodb.get_user_by_id(user['id']) is None
+    other = 'username' if field == 'email' else 'email'
+    lookup_key = username_lookup_key if other == 'username' else email_lookup_key
+    assert marker(lookup_key(user[other])) is None
+
+
+def test_when_both_are_taken_the_email_is_reported(dynamodb, dynamodb_user_id):
+    existing = dynamodb.get_user_by_id(dynamodb_user_id)
+    with pytest.raises(DuplicateUserError) as exc:
+        dynamodb.create_user(new_user(email=existing['email'], username=existing['username']))
+    assert exc.value.field == 'email'
+
+
+def test_a_password_change_reaches_the_email_marker(dynamodb, dynamodb_user_id):
+    email = dynamodb.get_user_by_id(dynamodb_user_id)['email']
+    dynamodb.update_user_password(dynamodb_user_id, email, 'new-hash')
+
+    assert dynamodb.get_user_by_email(email)['password'] == 'new-hash'
+    assert dynamodb.get_user_by_id(dynamodb_user_id)['password'] == 'new-hash'
+
+
+def test_register_endpoint_reports_the_taken_field(client):
+    user = new_user()
+    body = {'username': user['username'], 'email': user['email'], 'password': 'pw'}
+    assert client.post('/auth/register', json=body).status_code == 200
+
+    same_email = client.post('/auth/register', json={**body, 'username': f"{user['username']}x"})
+    assert (same_email.status_code, same_email.json()['error']) == (400, 'User already exists')
+    same_username = client.post('/auth/register', json={**body, 'email': f"x{user['email']}"})
+    assert (same_username.status_code, same_username.json()['error']) == (400, 'Username already taken')
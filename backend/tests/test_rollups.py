@@ -0,0 +1,81 @@
+"""
+Monthly rollups on the DynamoDB engine (moto): the deltas each write adds,
+and the reconciliation job's repair of drifted months.
+"""
+
+import reconcile_rollups
+from api import database
+from api.database import generate_id
+
+
+def expense(user_id, date, amount, category='Food'):
+    return {
+        'id': generate_id(),
+        'user_id': user_id,
+        'amount': amount,
+        'category': category,
+        'description': 'Lunch',
+        'date': date,
+        'created_at': '2024-05-10T12:00:00Z',
+    }
+
+
+def stored_rollup(user_id, month):
+    item = database.rollups_table.get_item(Key={'user_id': user_id, 'month': month}, ConsistentRead=True).get('Item', {})
+    return {attr: int(value) for attr, value in item.items() if attr not in ('user_id', 'month') and value}
+
+
+def test_moving_an_expense_to_another_month_moves_its_contribution(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    created = dynamodb.create_expense(expense(user_id, '2024-06-10', 10.0))
+    dynamodb.create_expense(expense(user_id, '2024-06-11', 2.5, 'Transport'))
+
+    dynamodb.update_expense(user_id, created['id'], {'date': '2024-07-02', 'amount': 4.0, 'category': 'Fun'})
+
+    assert stored_rollup(user_id, '2024-06') == {
+        'total': 250, 'expense_count': 1, 'category#Transport': 250, 'day#11': 250,
+    }
+    assert stored_rollup(user_id, '2024-07') == {
+        'total': 400, 'expense_count': 1, 'category#Fun': 400, 'day#02': 400,
+    }
+
+    dynamodb.delete_expense(user_id, created['id'])
+    assert stored_rollup(user_id, '2024-07') == {}
+    assert dynamodb.get_monthly_rollup(user_id, 2024, 7)['total_cents'] == 0
+
+
+def test_a_batch_adds_one_increment_per_month(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    dynamodb.batch_create_expenses([
+        expense(user_id, '2024-01-05', 1.0),
+        expense(user_id, '2024-01-05', 2.0),
+        expense(user_id, '2024-02-29T23:30:00', 3.0, 'Rent'),
+    ])
+
+    assert stored_rollup(user_id, '2024-01') == {'total': 300, 'expense_count': 2, 'category#Food': 300, 'day#05': 300}
+    assert stored_rollup(user_id, '2024-02') == {'total': 300, 'expense_count': 1, 'category#Rent': 300, 'day#29': 300}
+
+
+def test_reconciliation_repairs_a_drifted_month(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    dynamodb.create_expense(expense(user_id, '2024-03-15', 7.0))
+    expected = stored_rollup(user_id, '2024-03')
+    database.rollups_table.update_item(
+        Key={'user_id': user_id, 'month': '2024-03'},
+        UpdateExpression='ADD #total :drift, #stray :drift',
+        ExpressionAttributeNames={'#total': 'total', '#stray': 'category#Gone'},
+        ExpressionAttributeValues={':drift': 999}
+    )
+
+    reconcile_rollups.fix_rollup(user_id, '2024-03')
+
+    assert stored_rollup(user_id, '2024-03') == expected
+
+
+def test_reconciliation_removes_a_month_without_expenses(dynamodb, dynamodb_user_id):
+    user_id = dynamodb_user_id
+    database.rollups_table.put_item(Item={'user_id': user_id, 'month': '2023-11', 'total': 500, 'expense_count': 1})
+
+    reconcile_rollups.fix_rollup(user_id, '2023-11')
+
+    assert 'Item' not in database.rollups_table.get_item(Key={'user_id': user_id, 'month': '2023-11'})
@@ -0,0 +1,205 @@
+"""
+The storage engine contract (api.storage.StorageEngine), run on the SQLite
+engine and on the DynamoDB engine over moto.
+"""
+
+import pytest
+
+from api.database import DuplicateUserError, InvalidCursorError, ItemNotFoundError, generate_id
+from api.storage import StorageEngine
+
+
+def expense(user_id, date='2024-05-10', amount=12.5, category='Food', **fields):
+    return {
+        'id': generate_id(),
+        'user_id': user_id,
+        'amount': amount,
+        'category': category,
+        'description': 'Lunch',
+        'date': date,
+        'created_at': '2024-05-10T12:00:00Z',
+        **fields,
+    }
+
+
+def test_implements_the_protocol(engine):
+    assert isinstance(engine, StorageEngine)
+
+
+def test_users_are_found_by_email_and_id(engine, user_id):
+    user = engine.get_user_by_email(f'user{user_id}@example.com')
+    assert user == {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com', 'password': 'hash'}
+    assert engine.get_user_by_id(user_id)['username'] == f'user{user_id}'
+    assert engine.get_user_by_email('nobody@example.com') is None
+
+
+@pytest.mark.parametrize('field', ['email', 'username'])
+def test_duplicate_email_or_username_is_rejected(engine, user_id, field):
+    new_id = generate_id()
+    user = {'id': new_id, 'username': f'other{new_id}', 'email': f'other{new_id}@example.com', 'password': 'hash'}
+    user[field] = engine.get_user_by_id(user_id)[field]
+    with pytest.raises(DuplicateUserError) as exc:
+        engine.create_user(user)
+    assert exc.value.field == field
+
+
+def test_taken_ids_are_replaced(engine, user_id):
+    first = engine.create_expense(expense(user_id))
+    second = engine.create_expense({**expense(user_id), 'id': first['id']})
+    assert second['id'] != first['id']
+    assert engine.get_expense(user_id, first['id'])['description'] == 'Lunch'
+    assert engine.get_expense(user_id, second['id']) is not None
+
+    saved = engine.batch_create_expenses([{**expense(user_id), 'id': first['id']}, expense(user_id)])
+    assert len(set(saved) | {first['id'], second['id']}) == 4
+
+
+def test_password_update(engine, user_id):
+    engine.update_user_password(user_id, f'user{user_id}@example.com', 'new-hash')
+    assert engine.get_user_by_email(f'user{user_id}@example.com')['password'] == 'new-hash'
+
+
+def test_token_revocation(engine, user_id):
+    assert engine.get_tokens_valid_after(user_id) == 0
+    engine.revoke_user_tokens(user_id, 1_700_000_000.5)
+    assert engine.get_tokens_valid_after(user_id) == 1_700_000_000.5
+
+
+def test_single_token_revocation(engine):
+    jti = f'jti-{generate_id()}'
+    assert not engine.is_token_revoked(jti)
+    engine.revoke_token(jti, 4_000_000_000)
+    engine.revoke_token(jti, 4_000_000_000)
+    assert engine.is_token_revoked(jti)
+    assert not engine.is_token_revoked(f'jti-{generate_id()}')
+
+
+def test_every_write_bumps_the_data_version(engine, user_id):
+    versions = [engine.get_data_version(user_id)]
+    created = engine.create_expense(expense(user_id))
+    versions.append(engine.get_data_version(user_id))
+    engine.update_expense(user_id, created['id'], {'amount': 3.0})
+    versions.append(engine.get_data_version(user_id))
+    engine.delete_expense(user_id, created['id'])
+    versions.append(engine.get_data_version(user_id))
+    engine.save_budget_settings({'user_id': user_id, 'monthly_limit': 100.0, 'updated_at': 'now'})
+    versions.append(engine.get_data_version(user_id))
+
+    assert versions == sorted(set(versions))
+
+
+def test_expense_round_trip(engine, user_id):
+    created = engine.create_expense(expense(user_id))
+    stored = engine.get_expense(user_id, created['id'])
+    assert {key: stored[key] for key in ('id', 'user_id', 'amount', 'category', 'description', 'date')} == {
+        'id': created['id'], 'user_id': user_id, 'amount': 12.5, 'category': 'Food', 'description': 'Lunch',
+        'date': '2024-05-10',
+    }
+    assert engine.get_expense(user_id + 1, created['id']) is None
+
+
+def test_expenses_are_listed_newest_date_first(engine, user_id):
+    dates = ['2024-03-01', '2024-05-01', '2023-12-31', '2024-05-01T08:30:00']
+    engine.batch_create_expenses([expense(user_id, date) for date in dates])
+
+    listed = [item['date'] for item in engine.get_expenses_by_user(user_id)]
+    assert listed == ['2024-05-01T08:30:00', '2024-05-01', '2024-03-01', '2023-12-31']
+    assert [item['date'] for item in engine.get_recent_expenses(user_id, 2)] == listed[:2]
+    assert [item['date'] for item in engine.get_expenses_by_date_range(user_id, '2024-03-01', '2024-04-30')] == ['2024-03-01']
+    records = engine.get_expense_records_by_date_range(user_id, '2024-05-01', '2024-05-31')
+    assert [record.cents for record in records] == [1250, 1250]
+
+
+def test_pages_cover_every_expense_once(engine, user_id):
+    created = engine.batch_create_expenses([expense(user_id, f'2024-01-{day:02d}') for day in range(1, 8)])
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = engine.get_expense_page(user_id, 3, cursor)
+        seen.extend(item['id'] for item in items)
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(created)
+
+    streamed = [item['id'] for page in engine.iter_expense_pages(user_id, page_size=2) for item in page]
+    assert streamed == seen
+
+
+def test_bad_page_cursor(engine, user_id):
+    with pytest.raises(InvalidCursorError):
+        engine.get_expense_page(user_id, 10, 'garbage')
+
+
+def test_missing_expenses(engine, user_id):
+    with pytest.raises(ItemNotFoundError):
+        engine.update_expense(user_id, generate_id(), {'amount': 1.0})
+    with pytest.raises(ItemNotFoundError):
+        engine.delete_expense(user_id, generate_id())
+
+
+def test_bulk_edit_is_all_or_nothing(engine, user_id):
+    first, second = (engine.create_expense(expense(user_id))['id'] for _ in range(2))
+
+    with pytest.raises(ItemNotFoundError):
+        engine.bulk_edit_expenses(user_id, {first: {'amount': 1.0}}, [generate_id()])
+    assert engine.get_expense(user_id, first)['amount'] == 12.5
+
+    updated = engine.bulk_edit_expenses(user_id, {first: {'amount': 1.0}}, [second])
+    assert [item['amount'] for item in updated] == [1.0]
+    assert engine.get_expense(user_id, second) is None
+
+
+def test_monthly_rollup_follows_writes(engine, user_id):
+    food = engine.create_expense(expense(user_id, '2024-06-03', 10.0, 'Food'))
+    engine.create_expense(expense(user_id, '2024-06-03', 2.5, 'Transport'))
+    engine.create_expense(expense(user_id, '2024-07-01', 99.0, 'Food'))
+    engine.update_expense(user_id, food['id'], {'amount': 4.0, 'date': '2024-06-20'})
+
+    rollup = engine.get_monthly_rollup(user_id, 2024, 6)
+    assert rollup['total_cents'] == 650
+    assert rollup['expense_count'] == 2
+    assert rollup['categories'] == {'Food': 400, 'Transport': 250}
+    assert rollup['daily'] == {3: 250, 20: 400}
+
+
+def test_recurring_costs(engine, user_id):
+    cost = engine.create_recurring_cost({
+        'id': generate_id(), 'user_id': user_id, 'name': 'Rent', 'amount': 800.0, 'category': 'Housing',
+        'frequency': 'monthly', 'start_date': '2024-01-01', 'created_at': 'now',
+    })
+    assert engine.update_recurring_cost(user_id, cost['id'], {'amount': 850.0})['amount'] == 850.0
+    assert [item['amount'] for item in engine.get_recurring_costs_by_user(user_id)] == [850.0]
+    assert engine.get_recurring_cost(user_id, cost['id'])['name'] == 'Rent'
+
+    engine.delete_recurring_cost(user_id, cost['id'])
+    assert engine.get_recurring_costs_by_user(user_id) == []
+    with pytest.raises(ItemNotFoundError):
+        engine.delete_recurring_cost(user_id, cost['id'])
+    with pytest.raises(ItemNotFoundError):
+        engine.update_recurring_cost(user_id, cost['id'], {'amount': 1.0})
+
+
+def test_budget_settings(engine, user_id):
+    assert engine.get_budget_settings(user_id) is None
+    engine.save_budget_settings({'user_id': user_id, 'monthly_limit': 500.0, 'updated_at': 'now'})
+    assert engine.get_budget_settings(user_id)['monthly_limit'] == 500.0
+
+
+def test_change_log_records_every_write(engine, user_id):
+    created = engine.create_expense(expense(user_id))
+    engine.update_expense(user_id, created['id'], {'amount': 1.0})
+    engine.delete_expense(user_id, created['id'])
+    engine.save_budget_settings({'user_id': user_id, 'monthly_limit': 50.0, 'updated_at': 'now'})
+
+    # Writes in the same millisecond have no defined order (see api.sync)
+    changes, has_more = engine.get_changes(user_id, '0', 10)
+    assert not has_more
+    assert sorted((change['entity'], change['op']) for change in changes) == [
+        ('budget', 'upsert'), ('expense', 'delete'), ('expense', 'upsert'), ('expense', 'upsert'),
+    ]
+    assert sorted(change['data']['amount'] for change in changes if change['entity'] == 'expense' and change['data']) == [1.0, 12.5]
+    assert [change['seq'] for change in changes] == sorted(change['seq'] for change in changes)
+
+    first_page, has_more = engine.get_changes(user_id, '0', 2)
+    assert has_more and first_page == changes[:2]
+    assert engine.get_changes(user_id, changes[1]['seq'], 10)[0] == changes[2:]
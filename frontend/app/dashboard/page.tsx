@@ -3,8 +3,9 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import { api } from '@/lib/api';
+import { localStore } from '@/lib/store';
 import { Expense, RecurringCost, SpendingSummary } from '@/types';
-import { format, startOfMonth, endOfMonth, subMonths } from 'date-fns';
+import { format, subMonths } from 'date-fns';
 import { SpendingChart } from '@/components/dashboard/SpendingChart';
 import { CategoryChart } from '@/components/dashboard/CategoryChart';
 import { ExpenseList } from '@/components/dashboard/ExpenseList';
@@ -45,18 +46,16 @@ export default function Dashboard() {
       const year = currentDate.getFullYear();
       const month = currentDate.getMonth() + 1;
 
-      const [expensesData, recurringData, summaryData] = await Promise.all([
-        api.getExpensesByRange(
-          format(startOfMonth(currentDate), 'yyyy-MM-dd'),
-          format(endOfMonth(currentDate), 'yyyy-MM-dd')
-        ),
-        api.getRecurringCosts(),
+      // Expenses and recurring costs come from the local store, which only
+      // downloads what changed since the last sync
+      const [monthSummary] = await Promise.all([
         api.getSpendingSummary(year, month),
+        localStore.sync(),
       ]);
 
-      setExpenses(expensesData);
-      setRecurringCosts(recurringData);
-      setSummary(summaryData);
+      setExpenses(localStore.expensesInMonth(year, month));
+      setRecurringCosts(localStore.recurringCosts);
+      setSummary(monthSummary);
     } catch (error) {
       console.error('Failed to load data:', error);
     } finally {
@@ -3,6 +3,7 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import { User } from '@/types';
 import { api } from '@/lib/api';
+import { localStore } from '@/lib/store';
 import { useRouter } from 'next/navigation';
 
 interface AuthContextType {
@@ -37,6 +38,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
 
   const login = async (email: string, password: string) => {
     const response = await api.login(email, password);
+    localStore.clear();
     setToken(response.token);
     setUser(response.user);
     localStorage.setItem('token', response.token);
@@ -46,6 +48,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
 
   const register = async (username: string, email: string, password: string) => {
     const response = await api.register(username, email, password);
+    localStore.clear();
     setToken(response.token);
     setUser(response.user);
     localStorage.setItem('token', response.token);
@@ -54,6 +57,9 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = () => {
+    // Revoke this session's token server-side; local state is cleared regardless
+    api.logout().catch(() => {});
+    localStore.clear();
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
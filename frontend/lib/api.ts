@@ -1,8 +1,11 @@
-import { User, Expense, RecurringCost, BudgetSetting, SpendingSummary, AuthResponse } from '@/types';
+import { User, Expense, ExpensePage, ExpenseBulkEdit, ExpenseBulkEditResult, RecurringCost, BudgetSetting, SpendingSummary, DashboardData, SyncResponse, AuthResponse } from '@/types';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:3000/api';
 
 class ApiService {
+  // Last response body and ETag per GET path, revalidated with If-None-Match
+  private etagCache = new Map<string, { etag: string; data: unknown }>();
+
   private getAuthHeader(): HeadersInit {
     const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null;
     return {
@@ -11,6 +14,39 @@ class ApiService {
     };
   }
 
+  private async getCached<T>(path: string, errorMessage: string): Promise<T> {
+    const cached = this.etagCache.get(path);
+    const response = await fetch(`${API_URL}${path}`, {
+      headers: {
+        ...this.getAuthHeader(),
+        ...(cached && { 'If-None-Match': cached.etag }),
+      },
+      // Revalidation is handled here, not by the browser cache
+      cache: 'no-store',
+    });
+
+    if (response.status === 304 && cached) {
+      return cached.data as T;
+    }
+
+    if (!response.ok) {
+      throw new Error(errorMessage);
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      this.etagCache.set(path, { etag, data });
+    } else {
+      this.etagCache.delete(path);
+    }
+    return data;
+  }
+
+  clearCache(): void {
+    this.etagCache.clear();
+  }
+
   // Auth
   async register(username: string, email: string, password: string): Promise<AuthResponse> {
     const response = await fetch(`${API_URL}/auth/register`, {
@@ -24,6 +60,7 @@ class ApiService {
       throw new Error(error.error || 'Registration failed');
     }
 
+    this.clearCache();
     return response.json();
   }
 
@@ -39,32 +76,38 @@ class ApiService {
       throw new Error(error.error || 'Login failed');
     }
 
+    this.clearCache();
     return response.json();
   }
 
-  // Expenses
-  async getExpenses(): Promise<Expense[]> {
-    const response = await fetch(`${API_URL}/expenses`, {
+  async logout(): Promise<void> {
+    this.clearCache();
+    await fetch(`${API_URL}/auth/logout`, {
+      method: 'POST',
       headers: this.getAuthHeader(),
     });
+  }
 
-    if (!response.ok) {
-      throw new Error('Failed to fetch expenses');
+  // Expenses
+  async getExpenses(): Promise<Expense[]> {
+    return this.getCached('/expenses', 'Failed to fetch expenses');
+  }
+
+  async getExpensePage(limit: number, cursor?: string | null): Promise<ExpensePage> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) {
+      params.set('cursor', cursor);
     }
 
-    return response.json();
+    return this.getCached(`/expenses?${params}`, 'Failed to fetch expenses');
   }
 
-  async getExpensesByRange(startDate: string, endDate: string): Promise<Expense[]> {
-    const response = await fetch(`${API_URL}/expenses/range?start_date=${startDate}&end_date=${endDate}`, {
-      headers: this.getAuthHeader(),
-    });
-
-    if (!response.ok) {
-      throw new Error('Failed to fetch expenses');
-    }
+  async getRecentExpenses(n = 20, by: 'date' | 'created' = 'date'): Promise<Expense[]> {
+    return this.getCached(`/expenses/recent?n=${n}&by=${by}`, 'Failed to fetch expenses');
+  }
 
-    return response.json();
+  async getExpensesByRange(startDate: string, endDate: string): Promise<Expense[]> {
+    return this.getCached(`/expenses/range?start_date=${startDate}&end_date=${endDate}`, 'Failed to fetch expenses');
   }
 
   async createExpense(expense: Omit<Expense, 'id' | 'user_id' | 'created_at'>): Promise<Expense> {
@@ -109,19 +152,26 @@ class ApiService {
     }
   }
 
-  // Recurring Costs
-  async getRecurringCosts(): Promise<RecurringCost[]> {
-    const response = await fetch(`${API_URL}/recurring`, {
+  async bulkEditExpenses(edit: ExpenseBulkEdit): Promise<ExpenseBulkEditResult> {
+    const response = await fetch(`${API_URL}/expenses/bulk-edit`, {
+      method: 'POST',
       headers: this.getAuthHeader(),
+      body: JSON.stringify(edit),
     });
 
     if (!response.ok) {
-      throw new Error('Failed to fetch recurring costs');
+      const error = await response.json();
+      throw new Error(error.error || 'Failed to update expenses');
     }
 
     return response.json();
   }
 
+  // Recurring Costs
+  async getRecurringCosts(): Promise<RecurringCost[]> {
+    return this.getCached('/recurring', 'Failed to fetch recurring costs');
+  }
+
   async createRecurringCost(cost: Omit<RecurringCost, 'id' | 'user_id' | 'created_at'>): Promise<RecurringCost> {
     const response = await fetch(`${API_URL}/recurring`, {
       method: 'POST',
@@ -166,15 +216,7 @@ class ApiService {
 
   // Budget
   async getBudgetSettings(): Promise<BudgetSetting> {
-    const response = await fetch(`${API_URL}/budget`, {
-      headers: this.getAuthHeader(),
-    });
-
-    if (!response.ok) {
-      throw new Error('Failed to fetch budget settings');
-    }
-
-    return response.json();
+    return this.getCached('/budget', 'Failed to fetch budget settings');
   }
 
   async updateBudgetSettings(monthlyLimit: number): Promise<BudgetSetting> {
@@ -193,12 +235,24 @@ class ApiService {
   }
 
   async getSpendingSummary(year: number, month: number): Promise<SpendingSummary> {
-    const response = await fetch(`${API_URL}/budget/summary/${year}/${month}`, {
+    return this.getCached(`/budget/summary/${year}/${month}`, 'Failed to fetch spending summary');
+  }
+
+  // Dashboard
+  async getDashboard(year: number, month: number): Promise<DashboardData> {
+    return this.getCached(`/dashboard/${year}/${month}`, 'Failed to fetch dashboard');
+  }
+
+  // Sync
+  async sync(since?: string | null): Promise<SyncResponse> {
+    const params = since ? `?${new URLSearchParams({ since })}` : '';
+    const response = await fetch(`${API_URL}/sync${params}`, {
       headers: this.getAuthHeader(),
+      cache: 'no-store',
     });
 
     if (!response.ok) {
-      throw new Error('Failed to fetch spending summary');
+      throw new Error('Failed to sync');
     }
 
     return response.json();
@@ -0,0 +1,100 @@
+import { Expense, RecurringCost, BudgetSetting, SyncChange } from '@/types';
+import { api } from '@/lib/api';
+
+const STORAGE_KEY = 'budgify-sync';
+
+interface StoreState {
+  token: string | null;
+  expenses: Record<number, Expense>;
+  recurring: Record<number, RecurringCost>;
+  budget: BudgetSetting | null;
+}
+
+const emptyState = (): StoreState => ({ token: null, expenses: {}, recurring: {}, budget: null });
+
+// Local copy of the user's data, kept current with GET /sync
+class LocalStore {
+  private state: StoreState = emptyState();
+  private loaded = false;
+
+  private load(): void {
+    if (this.loaded || typeof window === 'undefined') {
+      return;
+    }
+    this.loaded = true;
+    const stored = localStorage.getItem(STORAGE_KEY);
+    if (stored) {
+      try {
+        this.state = JSON.parse(stored);
+      } catch {
+        this.state = emptyState();
+      }
+    }
+  }
+
+  private save(): void {
+    if (typeof window !== 'undefined') {
+      localStorage.setItem(STORAGE_KEY, JSON.stringify(this.state));
+    }
+  }
+
+  private apply(change: SyncChange): void {
+    if (change.entity === 'budget') {
+      this.state.budget = change.op === 'delete' ? null : (change.data as BudgetSetting);
+      return;
+    }
+
+    const items = change.entity === 'expense' ? this.state.expenses : this.state.recurring;
+    if (change.op === 'delete') {
+      delete items[change.id];
+    } else {
+      (items as Record<number, Expense | RecurringCost>)[change.id] = change.data as Expense | RecurringCost;
+    }
+  }
+
+  // Pull changes since the last sync; the first sync downloads everything
+  async sync(): Promise<void> {
+    this.load();
+    let hasMore = true;
+    while (hasMore) {
+      const response = await api.sync(this.state.token);
+      if (response.reset) {
+        this.state = emptyState();
+      }
+      response.changes.forEach((change) => this.apply(change));
+      this.state.token = response.token;
+      hasMore = response.has_more;
+      this.save();
+    }
+  }
+
+  get expenses(): Expense[] {
+    this.load();
+    return Object.values(this.state.expenses).sort((a, b) => b.date.localeCompare(a.date));
+  }
+
+  // Expenses dated in the given month (1-12), newest first
+  expensesInMonth(year: number, month: number): Expense[] {
+    const prefix = `${year}-${String(month).padStart(2, '0')}`;
+    return this.expenses.filter((expense) => expense.date.startsWith(prefix));
+  }
+
+  get recurringCosts(): RecurringCost[] {
+    this.load();
+    return Object.values(this.state.recurring);
+  }
+
+  get budget(): BudgetSetting | null {
+    this.load();
+    return this.state.budget;
+  }
+
+  clear(): void {
+    this.state = emptyState();
+    if (typeof window !== 'undefined') {
+      localStorage.removeItem(STORAGE_KEY);
+    }
+  }
+}
+
+export const localStore = new LocalStore();
@@ -14,6 +14,21 @@ export interface Expense {
   created_at: string;
 }
 
+export interface ExpensePage {
+  items: Expense[];
+  next_cursor: string | null;
+}
+
+export interface ExpenseBulkEdit {
+  updates?: (Partial<Omit<Expense, 'id' | 'user_id' | 'created_at'>> & { id: number })[];
+  deletes?: number[];
+}
+
+export interface ExpenseBulkEditResult {
+  updated: Expense[];
+  deleted: number[];
+}
+
 export interface RecurringCost {
   id: number;
   user_id: number;
@@ -43,6 +58,28 @@ export interface SpendingSummary {
   is_over_budget: boolean;
 }
 
+export interface DashboardData {
+  expenses: Expense[];
+  recurring_costs: RecurringCost[];
+  summary: SpendingSummary;
+}
+
+export type SyncEntity = 'expense' | 'recurring' | 'budget';
+
+export interface SyncChange {
+  entity: SyncEntity;
+  id: number;
+  op: 'upsert' | 'delete';
+  data: Expense | RecurringCost | BudgetSetting | null;
+}
+
+export interface SyncResponse {
+  token: string;
+  reset: boolean;
+  has_more: boolean;
+  changes: SyncChange[];
+}
+
 export interface AuthResponse {
   message: string;
   token: string;